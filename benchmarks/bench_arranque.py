@@ -0,0 +1,93 @@
+# benchmarks/bench_arranque.py
+#
+# Arranque real de la aplicación (MainApplication, con pantalla): tiempo hasta la
+# primera pantalla y hasta tener todas construidas, leído de las líneas "Arranque:"
+# que imprime main_app.
+#   diferido: como ahora, cada pantalla se construye al abrirla o en la precarga
+#   todo    : como antes, todas las pantallas construidas antes de mostrar la ventana
+# Cada corrida es un proceso nuevo con la base en una carpeta temporal (nunca la de
+# la tienda): vacía, o una copia de --db para medir con historial real.
+# Necesita pantalla (no corre en un servidor sin X).
+#
+# Uso:  python benchmarks/bench_arranque.py [--corridas 5] [--db ruta/darklord.db]
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+MODOS = ("todo", "diferido")
+
+
+def medir(modo, carpeta):
+    """Corre en un proceso hijo: abre la app, espera a que termine de arrancar y la cierra."""
+    import utils
+    utils.get_db_folder_path = lambda: carpeta
+
+    import main_app
+    if modo == "todo":
+        main_app.PREWARM_ORDER = ()
+
+    app = main_app.MainApplication()
+    if modo == "todo":
+        for page_name in main_app.FRAME_CLASSES:
+            app.get_frame(page_name)
+
+    def cerrar():
+        if app._prewarm_pending:
+            app.after(100, cerrar)
+            return
+        utils.close_db()
+        app.destroy()
+
+    app.after(100, cerrar)
+    app.mainloop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque de la app: pantallas diferidas vs. todas al inicio.")
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--db", help="Base a copiar para la medición (por defecto, una vacía)")
+    parser.add_argument("--medir", nargs=2, metavar=("MODO", "CARPETA"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    # La consulta de la tasa al arrancar no debe salir a internet durante la medición
+    env = dict(os.environ, TIENDA_BCV_URL="http://127.0.0.1:9/", TIENDA_TASA_ALTERNA_URL="http://127.0.0.1:9/")
+    resultados = {modo: {"primera": [], "todas": []} for modo in MODOS}
+    for _ in range(args.corridas):
+        for modo in MODOS:
+            carpeta = tempfile.mkdtemp(prefix="bench_arranque_")
+            try:
+                if args.db:
+                    import utils
+                    shutil.copyfile(args.db, os.path.join(carpeta, utils.DB_NAME))
+                salida = subprocess.run([sys.executable, os.path.abspath(__file__), "--medir", modo, carpeta],
+                                        cwd=RAIZ, env=env, capture_output=True, text=True, timeout=300)
+            finally:
+                shutil.rmtree(carpeta, ignore_errors=True)
+            if salida.returncode != 0:
+                raise SystemExit(f"La app no arrancó ({modo}):\n{salida.stderr[-2000:]}")
+            primera = re.search(r"Arranque: primera pantalla lista en (\d+) ms", salida.stdout)
+            todas = re.search(r"Arranque: todas las pantallas listas en (\d+) ms", salida.stdout)
+            resultados[modo]["primera"].append(int(primera.group(1)))
+            # Sin precarga, todas las pantallas ya estaban listas al primer dibujo
+            resultados[modo]["todas"].append(int((todas or primera).group(1)))
+
+    print(f"{'modo':>9} | {'primera pantalla':>17} | {'todas las pantallas':>20}   (mediana de {args.corridas})")
+    for modo in MODOS:
+        r = resultados[modo]
+        print(f"{modo:>9} | {statistics.median(r['primera']):14.0f} ms | {statistics.median(r['todas']):17.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
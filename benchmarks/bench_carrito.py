@@ -0,0 +1,131 @@
+# benchmarks/bench_carrito.py
+#
+# Costo por escaneo a medida que crece el carrito:
+#   antes : update_cart_display() borraba y reinsertaba todas las filas + sum() del carrito
+#   ahora : CarritoModel emite un evento de una fila y patch_cart_tree() la parchea en el lugar
+#
+# Con pantalla disponible se mide contra un ttk.Treeview real. Sin pantalla (servidor,
+# CI) se usa un árbol que solo cuenta llamadas, para comparar el número de llamadas a Tk.
+#
+# Uso:  python benchmarks/bench_carrito.py [--lineas 10 50 200 500]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from carrito import CarritoModel, cart_row_values, patch_cart_tree
+
+
+class ArbolContador:
+    """Reemplazo sin pantalla de ttk.Treeview: registra cuántas llamadas se harían a Tk."""
+
+    def __init__(self):
+        self.llamadas = 0
+        self._filas = {}
+
+    def get_children(self):
+        self.llamadas += 1
+        return tuple(self._filas)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.llamadas += 1
+        self._filas[iid] = values
+
+    def item(self, iid, values=None):
+        self.llamadas += 1
+        self._filas[iid] = values
+
+    def delete(self, *iids):
+        self.llamadas += 1
+        for iid in iids:
+            del self._filas[iid]
+
+
+def crear_arbol():
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        root.withdraw()
+        tree = ttk.Treeview(root, columns=("ID", "Producto", "Precio", "Cant", "Subtotal"), show="headings")
+        return tree, root, "ttk.Treeview"
+    except Exception:
+        return ArbolContador(), None, "contador (sin pantalla)"
+
+
+def escaneo_antes(tree, cart, product_id):
+    """Réplica del flujo anterior: dict + reconstrucción completa + sum()."""
+    if product_id in cart:
+        cart[product_id]['cantidad'] += 1
+    else:
+        cart[product_id] = {'nombre': f"Producto {product_id}", 'precio': 1.25, 'costo': 1.0, 'cantidad': 1, 'id_db': product_id}
+    for item in tree.get_children():
+        tree.delete(item)
+    for id_db, item in cart.items():
+        tree.insert('', 'end', iid=id_db, values=cart_row_values(item), tags=(id_db,))
+    return sum(item['precio'] * item['cantidad'] for item in cart.values())
+
+
+def escaneo_ahora(cart, product_id):
+    cart.add(product_id, f"Producto {product_id}", 1.25, 1.0)
+    return cart.subtotal
+
+
+def medir(lineas, tree, root, repeticiones=50):
+    # Antes: carrito con 'lineas' líneas y luego 'repeticiones' escaneos de un producto ya presente
+    cart = {}
+    for pid in range(1, lineas + 1):
+        escaneo_antes(tree, cart, pid)
+    llamadas_base = getattr(tree, "llamadas", 0)
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        escaneo_antes(tree, cart, lineas)
+        if root is not None:
+            root.update_idletasks()
+    antes_ms = (time.perf_counter() - t0) * 1000 / repeticiones
+    antes_llamadas = (getattr(tree, "llamadas", 0) - llamadas_base) / repeticiones
+    for item in tree.get_children():
+        tree.delete(item)
+
+    # Ahora
+    modelo = CarritoModel()
+    modelo.add_listener(lambda evento, pid, item: patch_cart_tree(tree, evento, pid, item))
+    for pid in range(1, lineas + 1):
+        escaneo_ahora(modelo, pid)
+    llamadas_base = getattr(tree, "llamadas", 0)
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        escaneo_ahora(modelo, lineas)
+        if root is not None:
+            root.update_idletasks()
+    ahora_ms = (time.perf_counter() - t0) * 1000 / repeticiones
+    ahora_llamadas = (getattr(tree, "llamadas", 0) - llamadas_base) / repeticiones
+    modelo.clear()
+
+    return antes_ms, antes_llamadas, ahora_ms, ahora_llamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo por escaneo del carrito: reconstrucción completa vs. parche por fila.")
+    parser.add_argument("--lineas", type=int, nargs="+", default=[10, 50, 200, 500])
+    args = parser.parse_args()
+
+    tree, root, tipo = crear_arbol()
+    cuenta_llamadas = isinstance(tree, ArbolContador)
+    print(f"Árbol: {tipo}")
+    print(f"{'líneas':>7} | {'antes ms/escaneo':>16} | {'ahora ms/escaneo':>16}" + (" | llamadas Tk antes/ahora" if cuenta_llamadas else ""))
+    for lineas in args.lineas:
+        antes_ms, antes_llamadas, ahora_ms, ahora_llamadas = medir(lineas, tree, root)
+        fila = f"{lineas:>7} | {antes_ms:>16.3f} | {ahora_ms:>16.4f}"
+        if cuenta_llamadas:
+            fila += f" | {antes_llamadas:.0f} / {ahora_llamadas:.0f}"
+        print(fila)
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
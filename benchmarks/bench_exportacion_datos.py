@@ -0,0 +1,101 @@
+# benchmarks/bench_exportacion_datos.py
+#
+# Exportación de los movimientos del período en CSV / JSON Lines (con y sin gzip)
+# frente al PDF del reporte ejecutivo, sobre un año sintético (benchmarks/datos_anio.py):
+#   pdf       : exportadores.exportar_reporte_pdf() (detalle de ventas, avances y recargas)
+#   csv, jsonl: exportadores.exportar_datos_periodo() (ventas, detalle de ventas, avances,
+#               recargas y tasas BCV), cada uno también comprimido
+# Cada medición corre en un proceso aparte para que el pico de memoria (ru_maxrss) sea
+# el de ese formato solamente.
+#
+# Uso:  python benchmarks/bench_exportacion_datos.py [--ventas-dia 150]
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PERIODOS = (
+    ("Mes", "2024-06-01", "2024-06-30"),
+    ("Año", "2024-01-01", "2024-12-31"),
+)
+
+# Etiqueta -> (formato, comprimido); "pdf" es el reporte ejecutivo
+FORMATOS = {
+    "pdf": ("pdf", False),
+    "csv": ("csv", False),
+    "csv.gz": ("csv", True),
+    "jsonl": ("jsonl", False),
+    "jsonl.gz": ("jsonl", True),
+}
+
+RESUMEN = {
+    "totals": {}, "grand_total": ("TOTAL GENERAL", "Bs. 0.00", "$ 0.00"),
+    "date_range_str": "benchmark", "tasa_general": 1.0, "tasa_fecha": "-",
+}
+
+
+def medir(etiqueta, db, a, b, carpeta):
+    """Corre en un proceso hijo: exporta una vez e imprime el resultado como JSON."""
+    import sqlite3
+    from exportadores import exportar_datos_periodo, exportar_reporte_pdf
+
+    conn = sqlite3.connect(db)
+    formato, comprimir = FORMATOS[etiqueta]
+    destino = os.path.join(carpeta, etiqueta.replace(".", "_"))
+    os.makedirs(destino, exist_ok=True)
+    t0 = time.perf_counter()
+    if formato == "pdf":
+        path = os.path.join(destino, "reporte.pdf")
+        filas = exportar_reporte_pdf(conn, path, RESUMEN, a, b)["filas"]
+        archivos = [path]
+    else:
+        resultados = exportar_datos_periodo(conn, destino, formato, a, b, comprimir)
+        filas = sum(stats["filas"] for stats in resultados.values())
+        archivos = list(resultados)
+    print(json.dumps({
+        "segundos": time.perf_counter() - t0,
+        "filas": filas,
+        "mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes": sum(os.path.getsize(path) for path in archivos),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación: CSV / JSON Lines (gzip) vs. PDF.")
+    parser.add_argument("--ventas-dia", type=int, default=150)
+    parser.add_argument("--medir", nargs=5, metavar=("FORMATO", "DB", "DESDE", "HASTA", "CARPETA"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    from datos_anio import crear_base_anio
+
+    carpeta = tempfile.mkdtemp(prefix="bench_exportacion_datos_")
+    try:
+        db = os.path.join(carpeta, "anio.db")
+        crear_base_anio(db, ventas_dia=args.ventas_dia).close()
+        print(f"{'período':>8} | {'formato':>9} | {'tiempo':>9} | {'filas':>8} | {'filas/s':>9} | {'memoria':>9} | {'archivos':>9}")
+        for nombre, a, b in PERIODOS:
+            for etiqueta in FORMATOS:
+                salida = subprocess.run([sys.executable, os.path.abspath(__file__), "--medir", etiqueta, db, a, b, carpeta],
+                                        capture_output=True, text=True, check=True).stdout
+                r = json.loads(salida.strip().splitlines()[-1])
+                print(f"{nombre:>8} | {etiqueta:>9} | {r['segundos']:7.2f} s | {r['filas']:8,} | "
+                      f"{r['filas'] / r['segundos']:9,.0f} | {r['mb']:6.0f} MB | {r['bytes'] / 1e6:6.1f} MB")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/bench_exportacion_pdf.py
+#
+# Exportación del reporte ejecutivo a PDF sobre un año sintético (benchmarks/datos_anio.py),
+# para un mes y el año completo:
+#   fpdf     : como antes, todo el detalle en listas y todo el documento FPDF en memoria
+#              hasta output()
+#   streaming: exportadores.exportar_reporte_pdf(), filas por bloques desde el cursor y
+#              cada página al disco al completarse
+# Cada medición corre en un proceso aparte para que el pico de memoria (ru_maxrss) sea
+# el de ese método solamente.
+#
+# Uso:  python benchmarks/bench_exportacion_pdf.py [--ventas-dia 150]
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PERIODOS = (
+    ("Mes", "2024-06-01", "2024-06-30"),
+    ("Año", "2024-01-01", "2024-12-31"),
+)
+
+RESUMEN = {
+    "totals": {}, "grand_total": ("TOTAL GENERAL", "Bs. 0.00", "$ 0.00"),
+    "date_range_str": "benchmark", "tasa_general": 1.0, "tasa_fecha": "-",
+}
+
+TABLAS = (
+    ("Ventas", ["ID Venta", "Fecha/Hora", "Estado", "Monto Total (Bs)", "Monto Total (USD)"],
+     [20, 40, 30, 50, 50]),
+    ("Avances", ["ID", "Fecha/Hora", "Estado", "Entregado (Bs)", "Comisión (Bs)", "Entregado (USD)",
+                 "Comisión (USD)"], [10, 30, 20, 30, 30, 30, 30]),
+    ("Recargas", ["ID", "Fecha/Hora", "Número", "Estado", "Monto Base", "Comisión", "Total Bs."],
+     [10, 35, 25, 20, 30, 25, 30]),
+)
+
+
+def exportar_fpdf(conn, path, a, b):
+    """Réplica de la exportación anterior: listas completas + FPDF en memoria."""
+    from fpdf import FPDF
+    from consultas_reportes import (LineaTasas, iter_detalle_ventas, iter_detalle_avances,
+                                    iter_detalle_recargas)
+
+    rates = LineaTasas.cargar(conn)
+    detalle = {
+        "Ventas": list(iter_detalle_ventas(conn, a, b)),
+        "Avances": list(iter_detalle_avances(conn, a, b, rates)),
+        "Recargas": list(iter_detalle_recargas(conn, a, b)),
+    }
+
+    class Reporte(FPDF):
+        def header(self):
+            self.set_font('helvetica', 'B', 15)
+            self.cell(0, 5, 'INVERSIONES MARTINEZ', 0, 1, 'L')
+            self.ln(5)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('helvetica', 'I', 8)
+            self.cell(0, 10, f'Página {self.page_no()}/{{nb}}', 0, 0, 'C')
+
+    pdf = Reporte('P', 'mm', 'A4')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    for clave, header, widths in TABLAS:
+        pdf.set_font('helvetica', 'B', 9)
+        for i, h in enumerate(header):
+            pdf.cell(widths[i], 7, h, 1, 0, 'C', 1)
+        pdf.ln()
+        pdf.set_font('helvetica', '', 9)
+        fill = False
+        for row in detalle[clave]:
+            pdf.set_fill_color(*((236, 240, 241) if fill else (255, 255, 255)))
+            for i, item in enumerate(row):
+                pdf.cell(widths[i], 6, str(item), 'LR', 0, 'R' if i >= len(row) - 2 else 'L', fill)
+            pdf.ln()
+            fill = not fill
+    pdf.output(path)
+    return pdf.page_no()
+
+
+def exportar_streaming(conn, path, a, b):
+    from exportadores import exportar_reporte_pdf
+    return exportar_reporte_pdf(conn, path, RESUMEN, a, b)["paginas"]
+
+
+def medir(metodo, db, a, b, carpeta):
+    """Corre en un proceso hijo: exporta una vez e imprime el resultado como JSON."""
+    import sqlite3
+    conn = sqlite3.connect(db)
+    path = os.path.join(carpeta, f"{metodo}.pdf")
+    fn = exportar_fpdf if metodo == "fpdf" else exportar_streaming
+    t0 = time.perf_counter()
+    paginas = fn(conn, path, a, b)
+    print(json.dumps({
+        "segundos": time.perf_counter() - t0,
+        "paginas": paginas,
+        "mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes": os.path.getsize(path),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación PDF: FPDF en memoria vs. escritura por páginas.")
+    parser.add_argument("--ventas-dia", type=int, default=150)
+    parser.add_argument("--medir", nargs=5, metavar=("METODO", "DB", "DESDE", "HASTA", "CARPETA"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    from datos_anio import crear_base_anio
+
+    carpeta = tempfile.mkdtemp(prefix="bench_exportacion_pdf_")
+    try:
+        db = os.path.join(carpeta, "anio.db")
+        crear_base_anio(db, ventas_dia=args.ventas_dia).close()
+        print(f"{'período':>8} | {'método':>10} | {'tiempo':>9} | {'páginas':>8} | {'pág/s':>7} | {'memoria':>9} | {'archivo':>9}")
+        for nombre, a, b in PERIODOS:
+            for metodo in ("fpdf", "streaming"):
+                salida = subprocess.run([sys.executable, os.path.abspath(__file__), "--medir", metodo, db, a, b, carpeta],
+                                        capture_output=True, text=True, check=True).stdout
+                r = json.loads(salida.strip().splitlines()[-1])
+                print(f"{nombre:>8} | {metodo:>10} | {r['segundos']:7.2f} s | {r['paginas']:8,} | "
+                      f"{r['paginas'] / r['segundos']:7.1f} | {r['mb']:6.0f} MB | {r['bytes'] / 1e6:6.1f} MB")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_importacion.py
+#
+# Tiempo de importación al arrancar: corre `python -X importtime -c "import main_app"`
+# varias veces (cada una en un proceso nuevo), toma la mediana del tiempo acumulado de
+# main_app y lista los módulos de primer nivel que más tardan.
+#
+# También sirve de prueba de regresión: termina con código 1 si alguna de las
+# dependencias pesadas que sólo hacen falta al exportar el PDF (fpdf), al abrir el
+# calendario (tkcalendar) o en la consulta de la tasa BCV (requests, bs4, urllib3)
+# vuelve a cargarse al importar main_app.
+#
+# Uso:  python benchmarks/bench_importacion.py [--corridas 5] [--top 15] [--modulo main_app]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DIFERIDAS = ("requests", "bs4", "urllib3", "fpdf", "tkcalendar")
+
+
+def importar(modulo):
+    """Importa 'modulo' en un proceso nuevo.
+
+    Devuelve (acumulado_us, {importación directa de 'modulo': acumulado_us}, {todos los módulos cargados}).
+    """
+    # HOME temporal: algunos módulos crean sus carpetas de datos al importarse
+    with tempfile.TemporaryDirectory(prefix="bench_importacion_") as home:
+        salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                                cwd=RAIZ, env=dict(os.environ, HOME=home), capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise SystemExit(f"No se pudo importar {modulo}:\n{salida.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package"; cada módulo se informa
+    # después de sus dependencias, con dos espacios de sangría por nivel
+    total, directas, pendientes, cargados = 0, {}, {}, set()
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        nombre = nombre.strip()
+        cargados.add(nombre)
+        if nivel == 1:
+            pendientes[nombre] = int(acumulado)
+        elif nivel == 0:
+            if nombre == modulo:
+                total, directas = int(acumulado), pendientes
+            pendientes = {}
+    return total, directas, cargados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación al arrancar (-X importtime).")
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--modulo", default="main_app")
+    args = parser.parse_args()
+
+    importar(args.modulo)  # calienta la caché de bytecode y la del sistema de archivos
+    corridas = [importar(args.modulo) for _ in range(args.corridas)]
+
+    totales = [total / 1000 for total, _, _ in corridas]
+    print(f"import {args.modulo}: mediana {statistics.median(totales):.0f} ms "
+          f"(mín. {min(totales):.0f} ms, máx. {max(totales):.0f} ms, {args.corridas} corridas)")
+
+    # Importaciones directas del módulo medido, por tiempo acumulado mediano
+    nombres = {n for _, directas, _ in corridas for n in directas}
+    filas = sorted(((statistics.median(d[n] for _, d, _ in corridas if n in d) / 1000, n) for n in nombres),
+                   reverse=True)
+    print(f"\n{'acumulado':>10} | módulo")
+    for ms, nombre in filas[:args.top]:
+        print(f"{ms:7.1f} ms | {nombre}")
+
+    cargadas = sorted({n.split(".")[0] for _, _, cargados in corridas for n in cargados} & set(DIFERIDAS))
+    if cargadas:
+        print(f"\nREGRESIÓN: se importan al arrancar: {', '.join(cargadas)}")
+        sys.exit(1)
+    print(f"\nOK: no se importan al arrancar: {', '.join(DIFERIDAS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/bench_journal_mode.py
+#
+# Compara el modo de journal por defecto (DELETE, synchronous=FULL) contra el perfil
+# WAL de utils.DB_PRAGMAS:
+#   1. Latencia de commit de un cobro (misma secuencia que VentasModule.finalize_sale).
+#   2. Cobros mientras otro hilo lee reportes sin parar (como ReportesModule).
+#
+# Uso:  python benchmarks/bench_journal_mode.py [--ventas 300] [--historial 20000]
+# Trabaja sobre bases temporales; no toca la base de datos real de la tienda.
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+
+PERFIL_DEFECTO = (
+    ("journal_mode", "DELETE"),
+    ("synchronous", "FULL"),
+)
+
+REPORTE_SQL = """
+    SELECT v.id, v.fecha, v.total_venta,
+           (SELECT group_concat(d.nombre || ' (' || d.cantidad || ')', ', ')
+            FROM VentaDetalle d WHERE d.venta_id = v.id)
+    FROM Ventas v WHERE v.estado = 'Completada' ORDER BY v.id DESC LIMIT 500
+"""
+
+
+def crear_base(ruta, pragmas, historial):
+    conn = sqlite3.connect(ruta)
+    utils.apply_pragmas(conn, pragmas)
+    cursor = conn.cursor()
+    utils._create_schema(cursor)
+    conn.commit()
+    utils.run_migrations(conn)
+
+    cursor.executemany(
+        "INSERT INTO Productos (codigo_barras, nombre, precio_compra, precio_venta, stock, "
+        "stock_bultos, unidades_por_bulto, precio_bulto, porcentaje_ganancia) "
+        "VALUES (?, ?, 1.0, 1.5, 1000000, 100000, 10, 10.0, 50)",
+        [(f"750{i:06d}", f"Producto {i}") for i in range(500)]
+    )
+    for i in range(historial):
+        cursor.execute(
+            "INSERT INTO Ventas (fecha, hora, total_venta, metodo_pago, estado) "
+            "VALUES ('2025-01-01', '10:00:00', 4.5, 'Efectivo', 'Completada')"
+        )
+        utils.insert_sale_lines(cursor, cursor.lastrowid, [
+            {'id': 1, 'nombre': 'Producto 1', 'cantidad': 3, 'precio_u': 1.5, 'costo_u': 1.0, 'subtotal': 4.5}
+        ])
+    conn.commit()
+    return conn
+
+
+def cobrar(conn, rng):
+    """Reproduce la transacción de finalize_sale: stock por línea + venta + líneas."""
+    cursor = conn.cursor()
+    detalle = []
+    for producto_id in rng.sample(range(1, 501), 3):
+        cursor.execute("SELECT nombre, stock, stock_bultos, unidades_por_bulto FROM Productos WHERE id = ?", (producto_id,))
+        nombre, stock, bultos, unidades = cursor.fetchone()
+        cursor.execute("UPDATE Productos SET stock = ?, stock_bultos = ? WHERE id = ?",
+                       (stock - 2, bultos - 2 / unidades, producto_id))
+        detalle.append({'id': producto_id, 'nombre': nombre, 'cantidad': 2,
+                        'precio_u': 1.5, 'costo_u': 1.0, 'subtotal': 3.0})
+    cursor.execute(
+        "INSERT INTO Ventas (fecha, hora, total_venta, monto_total_bs, tasa_bcv, metodo_pago, estado) "
+        "VALUES ('2025-01-02', '10:00:00', 9.0, 360.0, 40.0, 'Efectivo', 'Completada')"
+    )
+    utils.insert_sale_lines(cursor, cursor.lastrowid, detalle)
+    conn.commit()
+
+
+def medir_cobros(conn, ventas, seed=7):
+    rng = random.Random(seed)
+    tiempos = []
+    for _ in range(ventas):
+        t0 = time.perf_counter()
+        cobrar(conn, rng)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return tiempos
+
+
+def medir_con_lector(ruta, conn, pragmas, ventas):
+    detener = threading.Event()
+    lecturas = [0]
+    errores_lector = [0]
+
+    def lector():
+        lconn = sqlite3.connect(ruta, timeout=5)
+        utils.apply_pragmas(lconn, [p for p in pragmas if p[0] != "journal_mode"])
+        while not detener.is_set():
+            try:
+                lconn.execute(REPORTE_SQL).fetchall()
+                lecturas[0] += 1
+            except sqlite3.OperationalError:
+                errores_lector[0] += 1
+        lconn.close()
+
+    hilo = threading.Thread(target=lector)
+    hilo.start()
+    t0 = time.perf_counter()
+    tiempos = medir_cobros(conn, ventas, seed=11)
+    duracion = time.perf_counter() - t0
+    detener.set()
+    hilo.join()
+    return tiempos, lecturas[0] / duracion, errores_lector[0]
+
+
+def resumen(tiempos):
+    ordenados = sorted(tiempos)
+    p95 = ordenados[int(len(ordenados) * 0.95) - 1]
+    return f"p50={statistics.median(ordenados):7.3f} ms  p95={p95:7.3f} ms  max={ordenados[-1]:7.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara DELETE vs WAL en cobros y lecturas de reportes.")
+    parser.add_argument("--ventas", type=int, default=300, help="cobros a medir por escenario")
+    parser.add_argument("--historial", type=int, default=20000, help="ventas previas en la base")
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix="bench_journal_")
+    try:
+        for etiqueta, pragmas in (("DELETE + FULL (antes)", PERFIL_DEFECTO), ("WAL + perfil utils", utils.DB_PRAGMAS)):
+            ruta = os.path.join(carpeta, f"{pragmas[0][1].lower()}.db")
+            conn = crear_base(ruta, pragmas, args.historial)
+            modo = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+            solo = medir_cobros(conn, args.ventas)
+            concurrente, lecturas_s, errores = medir_con_lector(ruta, conn, pragmas, args.ventas)
+            conn.close()
+
+            print(f"== {etiqueta} (journal_mode={modo})")
+            print(f"   cobro sin lectores : {resumen(solo)}")
+            print(f"   cobro con lector   : {resumen(concurrente)}")
+            print(f"   lector de reportes : {lecturas_s:8.1f} consultas/s, {errores} bloqueos")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_parseo_tasa.py
+#
+# Costo por consulta de la tasa BCV:
+#   antes : requests.get nuevo (conexión nueva) + BeautifulSoup(html.parser) de la página completa
+#   ahora : sesión persistente + If-None-Match/If-Modified-Since + regex sobre div#dolar
+#
+# Mide por separado:
+#   1. Solo el parseo de la página (~190 KB): BeautifulSoup vs. regex.
+#   2. La consulta completa contra benchmarks/servidor_tasa_local.py (en otro proceso, para
+#      que el CPU medido sea solo el del cliente):
+#        - antes
+#        - ahora, página sin cambios con validadores (304, sin cuerpo)
+#        - ahora, servidor sin validadores (200 completo; la huella evita volver a parsear)
+#
+# Uso:  python benchmarks/bench_parseo_tasa.py [--consultas 30]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(AQUI))
+sys.path.insert(0, AQUI)
+import requests
+import proveedores_tasa as pt
+import servidor_tasa_local
+
+PUERTO = 8765
+
+
+def medir(fn, repeticiones):
+    """Devuelve (p50 ms reloj, promedio ms CPU) por llamada."""
+    reloj = []
+    cpu_inicio = time.process_time()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        reloj.append((time.perf_counter() - inicio) * 1000)
+    cpu_ms = (time.process_time() - cpu_inicio) * 1000 / repeticiones
+    return statistics.median(reloj), cpu_ms
+
+
+def consulta_antes(url):
+    response = requests.get(url, headers=pt._HEADERS, timeout=10, verify=False)
+    response.raise_for_status()
+    return pt.extraer_tasa_bcv_soup(response.text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo por consulta de la tasa BCV (descarga + parseo).")
+    parser.add_argument("--consultas", type=int, default=30)
+    args = parser.parse_args()
+
+    html = servidor_tasa_local.pagina_bcv().decode("utf-8")
+    print(f"Página de prueba: {len(html) / 1024:.0f} KB")
+
+    print("\n1. Solo parseo")
+    bs4_ms, _ = medir(lambda: pt.extraer_tasa_bcv_soup(html), max(5, args.consultas // 3))
+    regex_ms, _ = medir(lambda: pt.extraer_tasa_bcv(html), args.consultas * 10)
+    print(f"   BeautifulSoup(html.parser): {bs4_ms:8.2f} ms")
+    print(f"   regex div#dolar           : {regex_ms:8.3f} ms   ({bs4_ms / regex_ms:.0f}x)")
+
+    servidor = subprocess.Popen(
+        [sys.executable, os.path.join(AQUI, "servidor_tasa_local.py"), "--puerto", str(PUERTO)],
+        stdout=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{PUERTO}"
+    try:
+        for _ in range(50):
+            try:
+                requests.get(base + "/alterna", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+
+        print(f"\n2. Consulta completa ({args.consultas} consultas)      p50 reloj   CPU cliente")
+        p50, cpu = medir(lambda: consulta_antes(base + "/bcv-sin-cache"), args.consultas)
+        print(f"   antes (conexión nueva + bs4)        {p50:8.2f} ms  {cpu:8.2f} ms")
+
+        proveedor = pt.ProveedorBCVHtml(base + "/bcv")
+        proveedor.obtener()  # primera consulta: descarga completa y guarda ETag/Last-Modified
+        p50, cpu = medir(proveedor.obtener, args.consultas)
+        print(f"   ahora, sin cambios (304)            {p50:8.2f} ms  {cpu:8.2f} ms")
+
+        proveedor = pt.ProveedorBCVHtml(base + "/bcv-sin-cache")
+        proveedor.obtener()
+        p50, cpu = medir(proveedor.obtener, args.consultas)
+        print(f"   ahora, servidor sin validadores     {p50:8.2f} ms  {cpu:8.2f} ms")
+
+        proveedor = pt.ProveedorBCVHtml(base + "/bcv-sin-cache")
+        def cambiada():
+            proveedor._cliente.olvidar()
+            proveedor._ultima_tasa = None
+            return proveedor.obtener()
+        p50, cpu = medir(cambiada, args.consultas)
+        print(f"   ahora, página cambiada (regex)      {p50:8.2f} ms  {cpu:8.2f} ms")
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
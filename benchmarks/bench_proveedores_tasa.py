@@ -0,0 +1,90 @@
+# benchmarks/bench_proveedores_tasa.py
+#
+# Recorre PipelineTasas (proveedores_tasa.py) contra benchmarks/servidor_tasa_local.py,
+# sin internet, en los escenarios que más importan en la tienda:
+#   - BCV responde normal
+#   - BCV inestable (503 un par de veces, luego responde): reintentos con espera
+#   - BCV caído (500): pasa a la fuente alterna
+#   - BCV con otro diseño y alterna caída: termina en la tasa manual
+#   - BCV caído en varias consultas seguidas: el cortacircuitos deja de insistir
+# Para cada escenario muestra la tasa, el proveedor que respondió, el tiempo total
+# y cada intento registrado (latencia y resultado).
+#
+# Uso:  python benchmarks/bench_proveedores_tasa.py [--repeticiones 20]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import proveedores_tasa as pt
+import servidor_tasa_local
+
+# Esperas cortas para que el benchmark no tarde lo que tardaría en producción
+ESPERA_BASE = 0.05
+ESPERA_MAX = 0.4
+
+
+def crear_pipeline(base, ruta_bcv, ruta_alterna, tasa_manual=None, **kwargs):
+    manual = pt.ProveedorManual()
+    if tasa_manual is not None:
+        manual.fijar(tasa_manual)
+    return pt.PipelineTasas(
+        [pt.ProveedorBCVHtml(base + ruta_bcv, timeout=2),
+         pt.ProveedorJSON(base + ruta_alterna, timeout=2),
+         manual],
+        espera_base=ESPERA_BASE, espera_max=ESPERA_MAX, **kwargs
+    )
+
+
+def mostrar_intentos(pipeline):
+    for intento in pipeline.historial():
+        detalle = f"tasa {intento.tasa}" if intento.tasa is not None else (intento.error or "")
+        print(f"      {intento.proveedor:<8} #{intento.intento}  {intento.latencia_ms:8.2f} ms  {intento.resultado:<8} {detalle[:70]}")
+
+
+def escenario(nombre, pipeline, consultas=1):
+    print(f"\n== {nombre}")
+    for n in range(1, consultas + 1):
+        inicio = time.perf_counter()
+        tasa = pipeline.obtener_tasa()
+        total_ms = (time.perf_counter() - inicio) * 1000
+        print(f"   consulta {n}: tasa={tasa} proveedor={pipeline.ultimo_proveedor if tasa else '-'} "
+              f"total={total_ms:.1f} ms cortacircuitos={pipeline.estado_cortacircuitos()}")
+    mostrar_intentos(pipeline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline de proveedores de tasa contra un servidor local.")
+    parser.add_argument("--repeticiones", type=int, default=20, help="consultas para medir la latencia del caso normal")
+    args = parser.parse_args()
+
+    servidor, base = servidor_tasa_local.iniciar(fallos_iniciales=2)
+    print(f"Servidor local: {base}")
+
+    # Latencia del caso normal (descarga ~190 KB + parseo)
+    pipeline = crear_pipeline(base, "/bcv", "/alterna")
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        pipeline.obtener_tasa()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    print(f"\nBCV normal, {args.repeticiones} consultas: p50 {statistics.median(tiempos):.1f} ms, "
+          f"p95 {tiempos[int(len(tiempos) * 0.95) - 1]:.1f} ms")
+
+    escenario("BCV inestable (2 x 503 y luego OK)", crear_pipeline(base, "/bcv-inestable", "/alterna"))
+    escenario("BCV caído (500) -> fuente alterna", crear_pipeline(base, "/bcv-error", "/alterna"))
+    escenario("BCV con otro diseño y alterna caída -> manual",
+              crear_pipeline(base, "/bcv-rota", "/alterna-error", tasa_manual=36.0))
+    escenario("BCV y alterna caídos en 4 consultas seguidas (cortacircuitos, umbral 2)",
+              crear_pipeline(base, "/bcv-error", "/alterna-error", umbral=2), consultas=4)
+
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
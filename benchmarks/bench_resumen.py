@@ -0,0 +1,120 @@
+# benchmarks/bench_resumen.py
+#
+# Tiempo del resumen ejecutivo (ExportacionReportesModule.load_summary_data) sobre un
+# año sintético (benchmarks/datos_anio.py), para un día, un mes y el año completo:
+#   original : tres consultas + suma fila por fila en Python + una consulta de tasa por
+#              cada avance/recarga
+#   LineaTasas: igual, pero con el historial de tasas en memoria
+#   agregada : consultas_reportes.resumen_ejecutivo_movimientos(), una sola consulta
+#              agregada sobre los movimientos
+#   ahora    : consultas_reportes.resumen_ejecutivo(), lectura de ResumenDiario
+# También verifica que todos los métodos den los mismos totales.
+#
+# Uso:  python benchmarks/bench_resumen.py [--ventas-dia 150] [--repeticiones 5]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from consultas_reportes import (CONCEPTOS_RESUMEN, LineaTasas, resumen_ejecutivo,
+                                resumen_ejecutivo_movimientos, tasa_vigente)
+from datos_anio import crear_base_anio
+
+PERIODOS = (
+    ("Día", "2024-06-15", "2024-06-15"),
+    ("Mes", "2024-06-01", "2024-06-30"),
+    ("Año", "2024-01-01", "2024-12-31"),
+)
+
+
+def resumen_por_filas(conn, date_start, date_end, tasa_de):
+    """Réplica del cálculo anterior: tres consultas y acumulación en Python."""
+    totals = {concepto: {"Bs": 0.0, "USD": 0.0} for concepto in CONCEPTOS_RESUMEN}
+    query_date_filter = "fecha BETWEEN ? AND ?" if date_start != date_end else "fecha = ?"
+    params = (date_start, date_end) if date_start != date_end else (date_start,)
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT estado, monto_total_bs, total_venta FROM Ventas "
+                   f"WHERE {query_date_filter} AND estado IN ('Completada', 'Devolucion')", params)
+    for estado, monto_bs, monto_usd in cursor.fetchall():
+        clave, signo = ("Ventas (Neto)", 1) if estado == 'Completada' else ("Devoluciones", -1)
+        totals[clave]["Bs"] += signo * (monto_bs or 0.0)
+        totals[clave]["USD"] += signo * (monto_usd or 0.0)
+
+    for tabla, columna, monto_key, comision_key in (
+            ("AvancesEfectivo", "monto_entregado", "Avances de Efectivo (Monto Entregado)", "Ganancia Avances (Comisión)"),
+            ("RecargasTelefonicas", "monto_base", "Recargas Telefónicas (Monto Base)", "Ganancia Recargas (Comisión)")):
+        cursor.execute(f"SELECT fecha_hora, {columna}, comision FROM {tabla} "
+                       f"WHERE {query_date_filter} AND estado = 'Concretado'", params)
+        for fecha_hora, monto, comision in cursor.fetchall():
+            tasa = tasa_de(fecha_hora)
+            totals[monto_key]["Bs"] += monto
+            totals[monto_key]["USD"] += (monto / tasa) if tasa > 0 else 0.0
+            totals[comision_key]["Bs"] += comision
+            totals[comision_key]["USD"] += (comision / tasa) if tasa > 0 else 0.0
+    return totals
+
+
+def original(conn, a, b):
+    return resumen_por_filas(conn, a, b, lambda fh: tasa_vigente(conn, fh)[0])
+
+
+def con_linea(conn, a, b):
+    linea = LineaTasas.cargar(conn)
+    return resumen_por_filas(conn, a, b, linea.tasa)
+
+
+def medir(fn, conn, a, b, repeticiones):
+    consultas = [0]
+    conn.set_trace_callback(lambda _: consultas.__setitem__(0, consultas[0] + 1))
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = fn(conn, a, b)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    conn.set_trace_callback(None)
+    return min(tiempos), consultas[0] // repeticiones, resultado
+
+
+def iguales(x, y):
+    return all(abs(x[c][k] - y[c][k]) <= 1e-6 * max(1.0, abs(x[c][k])) for c in CONCEPTOS_RESUMEN for k in ("Bs", "USD"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen ejecutivo: suma por filas vs. consulta agregada vs. ResumenDiario.")
+    parser.add_argument("--ventas-dia", type=int, default=150)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix="bench_resumen_")
+    try:
+        t0 = time.perf_counter()
+        conn = crear_base_anio(os.path.join(carpeta, "anio.db"), ventas_dia=args.ventas_dia)
+        n = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+             for t in ("Ventas", "AvancesEfectivo", "RecargasTelefonicas", "TasasBCV")}
+        print(f"Base sintética en {time.perf_counter() - t0:.1f} s: {n}")
+
+        metodos = (("original", original), ("LineaTasas", con_linea),
+                   ("agregada", resumen_ejecutivo_movimientos), ("ahora", resumen_ejecutivo))
+        print("\n" + " | ".join([f"{'período':>8}"] + [f"{m:>22}" for m, _ in metodos] + ["iguales"]))
+        for nombre, a, b in PERIODOS:
+            columnas = []
+            resultados = []
+            for _, fn in metodos:
+                ms, consultas, resultado = medir(fn, conn, a, b, args.repeticiones)
+                columnas.append(f"{ms:9.2f} ms {consultas:6d} cons.")
+                resultados.append(resultado)
+            ok = all(iguales(resultados[0], r) for r in resultados[1:])
+            print(" | ".join([f"{nombre:>8}"] + [f"{c:>22}" for c in columnas] + ["sí" if ok else "NO"]))
+        conn.close()
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
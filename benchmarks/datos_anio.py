@@ -0,0 +1,92 @@
+# benchmarks/datos_anio.py
+#
+# Genera una base temporal con un año sintético de operación de la tienda, para
+# los benchmarks de reportes y exportación:
+#   - Ventas completadas (con sus líneas en VentaDetalle), algunas canceladas y devoluciones
+#   - Avances de efectivo y recargas telefónicas
+#   - Historial de TasasBCV (entre uno y tres cambios por día)
+# Los volúmenes por día se pueden ajustar; con los valores por defecto son ~55.000
+# ventas, ~7.300 avances y ~7.300 recargas.
+
+import datetime
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+
+ANIO = 2024
+
+
+def crear_base_anio(ruta, ventas_dia=150, avances_dia=20, recargas_dia=20, seed=42, pragmas=None):
+    """Crea (o reemplaza) la base en 'ruta' con un año de datos y devuelve la conexión."""
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    conn = sqlite3.connect(ruta)
+    utils.apply_pragmas(conn, pragmas if pragmas is not None else utils.DB_PRAGMAS)
+    cursor = conn.cursor()
+    utils._create_schema(cursor)
+    conn.commit()
+    utils.run_migrations(conn)
+
+    rng = random.Random(seed)
+    cursor.executemany(
+        "INSERT INTO Productos (codigo_barras, nombre, precio_compra, precio_venta, stock, "
+        "stock_bultos, unidades_por_bulto, precio_bulto, porcentaje_ganancia) "
+        "VALUES (?, ?, ?, ?, 1000000, 100000, 10, 10.0, 50)",
+        [(f"750{i:06d}", f"Producto {i}", 1.0 + i % 7, 1.5 + i % 7) for i in range(1, 501)]
+    )
+
+    tasa = 36.0
+    dia = datetime.date(ANIO, 1, 1)
+    while dia.year == ANIO:
+        fecha = dia.isoformat()
+
+        for _ in range(rng.randint(1, 3)):
+            tasa = round(tasa * rng.uniform(0.995, 1.01), 4)
+            cursor.execute("INSERT INTO TasasBCV (tasa, fecha_registro) VALUES (?, ?)",
+                           (tasa, f"{fecha} {rng.randint(7, 20):02d}:{rng.randint(0, 59):02d}:00"))
+
+        for _ in range(ventas_dia):
+            hora = f"{rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+            lineas = []
+            for producto_id in rng.sample(range(1, 501), rng.randint(1, 4)):
+                cantidad = rng.randint(1, 3)
+                precio = 1.5 + producto_id % 7
+                lineas.append({'id': producto_id, 'nombre': f"Producto {producto_id}", 'cantidad': cantidad,
+                               'precio_u': precio, 'costo_u': precio - 0.5, 'subtotal': precio * cantidad})
+            total = sum(l['subtotal'] for l in lineas)
+            estado = rng.choices(("Completada", "Cancelada", "Devolucion"), (94, 3, 3))[0]
+            cursor.execute(
+                "INSERT INTO Ventas (fecha, hora, total_venta, metodo_pago, estado, monto_total_bs, tasa_bcv) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fecha, hora, total, rng.choice(("Efectivo", "Punto de Venta", "Pago Móvil")), estado, total * tasa, tasa)
+            )
+            utils.insert_sale_lines(cursor, cursor.lastrowid, lineas)
+
+        for tabla, n in (("AvancesEfectivo", avances_dia), ("RecargasTelefonicas", recargas_dia)):
+            filas = []
+            for _ in range(n):
+                hora = f"{rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+                fecha_hora = f"{fecha} {hora}"
+                epoch = int(datetime.datetime.fromisoformat(fecha_hora).replace(tzinfo=datetime.timezone.utc).timestamp())
+                monto = rng.choice((100, 200, 300, 500, 1000))
+                comision = monto * 0.1
+                estado = rng.choices(("Concretado", "Cancelado"), (95, 5))[0]
+                filas.append((monto, comision, monto + comision, fecha_hora, fecha, epoch, estado))
+            if tabla == "AvancesEfectivo":
+                cursor.executemany(
+                    "INSERT INTO AvancesEfectivo (monto_entregado, comision, monto_total, metodo_pago, "
+                    "fecha_hora, fecha, fecha_epoch, estado) VALUES (?, ?, ?, 'Punto de Venta', ?, ?, ?, ?)", filas)
+            else:
+                cursor.executemany(
+                    "INSERT INTO RecargasTelefonicas (numero, monto_base, comision, monto_total, "
+                    "fecha_hora, fecha, fecha_epoch, estado) VALUES ('04141234567', ?, ?, ?, ?, ?, ?, ?)", filas)
+
+        dia += datetime.timedelta(days=1)
+
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
@@ -0,0 +1,165 @@
+# benchmarks/servidor_tasa_local.py
+#
+# Servidor HTTP local que imita las fuentes de tasa con respuestas fijas, para probar
+# y medir proveedores_tasa.PipelineTasas sin internet.
+#
+# Rutas:
+#   /bcv            página tipo BCV (~190 KB) con div#dolar strong; envía ETag y
+#                   Last-Modified y responde 304 a peticiones condicionales
+#   /bcv-sin-cache  la misma página, sin validadores (siempre 200 con cuerpo completo)
+#   /bcv-lenta      igual, pero responde tras 'retraso' segundos
+#   /bcv-error      HTTP 500
+#   /bcv-rota       HTML sin div#dolar (cambio de diseño de la página)
+#   /bcv-inestable  falla con 503 las primeras 'fallos_iniciales' peticiones y luego responde
+#   /alterna        JSON {"tasa": ...}
+#   /alterna-error  HTTP 502
+#
+# Uso independiente:  python benchmarks/servidor_tasa_local.py [--puerto 8000]
+# y luego, por ejemplo:  TIENDA_BCV_URL=http://127.0.0.1:8000/bcv python main_app.py
+
+import argparse
+import email.utils
+import functools
+import hashlib
+import http.server
+import json
+import threading
+import time
+
+TASA_BCV = 36.5123
+TASA_ALTERNA = 36.6001
+
+# Relleno para que la página tenga un tamaño parecido a la real (menús, noticias, scripts)
+_FILAS_RELLENO = [
+    f'<div class="views-row"><span class="date-display-single">{i:02d}/01/2024</span>'
+    f'<a href="/noticia/{i}">Comunicado oficial número {i} del Banco Central</a></div>\n'
+    for i in range(1200)
+]
+_RELLENO_ANTES = "".join(_FILAS_RELLENO[:600])
+_RELLENO_DESPUES = "".join(_FILAS_RELLENO[600:])
+
+
+@functools.lru_cache(maxsize=8)
+def pagina_bcv(tasa=TASA_BCV, con_tasa=True):
+    # El BCV publica la tasa con coma decimal: "36,51230000"
+    tasa_txt = f"{tasa:.8f}".replace('.', ',')
+    if con_tasa:
+        bloque = (
+            '<div id="dolar" class="col-sm-12 col-xs-12"><div class="field-content">'
+            '<div class="row recuadrotsmc"><div class="col-sm-6 col-xs-6"><span> USD</span></div>'
+            f'<div class="col-sm-6 col-xs-6 centrado"><strong> {tasa_txt} </strong></div></div></div></div>'
+        )
+    else:
+        bloque = '<div id="euro"><strong> 0,00 </strong></div>'
+    return (
+        "<!DOCTYPE html><html><head><title>Banco Central de Venezuela</title>"
+        "<script>var drupal = {};</script></head><body><div id=\"page\">"
+        f"{_RELLENO_ANTES}{bloque}{_RELLENO_DESPUES}"
+        "</div></body></html>"
+    ).encode("utf-8")
+
+
+_ULTIMA_MODIFICACION = email.utils.formatdate(usegmt=True)
+
+
+class _Manejador(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 para que el cliente pueda reutilizar la conexión (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # Configuración compartida (la fija iniciar())
+    tasa_bcv = TASA_BCV
+    tasa_alterna = TASA_ALTERNA
+    retraso = 2.0
+    fallos_iniciales = 2
+    contador_inestable = 0
+    peticiones = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls._lock:
+            cls.peticiones += 1
+        ruta = self.path.split("?")[0]
+
+        if ruta == "/bcv":
+            self._responder_condicional(pagina_bcv(cls.tasa_bcv), "text/html; charset=utf-8")
+        elif ruta == "/bcv-sin-cache":
+            self._responder(200, pagina_bcv(cls.tasa_bcv), "text/html; charset=utf-8")
+        elif ruta == "/bcv-lenta":
+            time.sleep(cls.retraso)
+            self._responder(200, pagina_bcv(cls.tasa_bcv), "text/html; charset=utf-8")
+        elif ruta == "/bcv-error":
+            self._responder(500, b"Internal Server Error", "text/plain")
+        elif ruta == "/bcv-rota":
+            self._responder(200, pagina_bcv(con_tasa=False), "text/html; charset=utf-8")
+        elif ruta == "/bcv-inestable":
+            with cls._lock:
+                cls.contador_inestable += 1
+                falla = cls.contador_inestable <= cls.fallos_iniciales
+            if falla:
+                self._responder(503, b"Service Unavailable", "text/plain")
+            else:
+                self._responder(200, pagina_bcv(cls.tasa_bcv), "text/html; charset=utf-8")
+        elif ruta == "/alterna":
+            self._responder_condicional(json.dumps({"tasa": cls.tasa_alterna}).encode(), "application/json")
+        elif ruta == "/alterna-error":
+            self._responder(502, b"Bad Gateway", "text/plain")
+        else:
+            self._responder(404, b"Not Found", "text/plain")
+
+    def _responder(self, codigo, cuerpo, tipo, extra=()):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in extra:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _responder_condicional(self, cuerpo, tipo):
+        etag = '"' + hashlib.sha1(cuerpo).hexdigest()[:16] + '"'
+        validadores = (("ETag", etag), ("Last-Modified", _ULTIMA_MODIFICACION))
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers
+                and self.headers.get("If-Modified-Since") == _ULTIMA_MODIFICACION):
+            self.send_response(304)
+            for nombre, valor in validadores:
+                self.send_header(nombre, valor)
+            self.end_headers()
+            return
+        self._responder(200, cuerpo, tipo, validadores)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar(puerto=0, retraso=2.0, fallos_iniciales=2):
+    """Inicia el servidor en un hilo. Devuelve (servidor, url_base). puerto=0 elige uno libre."""
+    manejador = type("Manejador", (_Manejador,), {
+        "retraso": retraso, "fallos_iniciales": fallos_iniciales,
+        "contador_inestable": 0, "peticiones": 0, "_lock": threading.Lock(),
+    })
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="servidor-tasa", daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local con respuestas fijas de fuentes de tasa.")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--retraso", type=float, default=2.0, help="segundos de espera de /bcv-lenta")
+    args = parser.parse_args()
+
+    servidor, base = iniciar(args.puerto, args.retraso)
+    print(f"Sirviendo en {base} (Ctrl+C para salir)")
+    for ruta in ("/bcv", "/bcv-sin-cache", "/bcv-lenta", "/bcv-error", "/bcv-rota", "/bcv-inestable", "/alterna", "/alterna-error"):
+        print(f"  {base}{ruta}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
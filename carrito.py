@@ -0,0 +1,108 @@
+# carrito.py (MODELO DE CARRITO CON SUBTOTAL ACUMULADO Y EVENTOS POR FILA)
+#
+# Lo usan Ventas y Devolución. Cada cambio emite un evento de una sola fila
+# ('insert', 'update', 'delete') o 'clear', y el módulo parchea su Treeview en el
+# lugar en vez de borrar y reinsertar todo el carrito en cada escaneo. El subtotal
+# se mantiene acumulado, así que update_totals() ya no recorre el carrito.
+
+
+class CarritoModel:
+    """Carrito indexado por id de producto.
+
+    Cada línea es un dict {'nombre', 'precio', 'costo', 'cantidad', 'id_db'} (el mismo
+    formato que usaban los módulos). Para modificarlo se usan add/remove/clear.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._listeners = []
+        self.subtotal = 0.0
+
+    # -----------------------------------------------------------------
+    # Eventos
+    # -----------------------------------------------------------------
+    def add_listener(self, callback):
+        """Registra callback(evento, product_id, item) para cada cambio de fila."""
+        self._listeners.append(callback)
+
+    def _emit(self, evento, product_id, item):
+        for callback in self._listeners:
+            callback(evento, product_id, item)
+
+    # -----------------------------------------------------------------
+    # Modificación
+    # -----------------------------------------------------------------
+    def add(self, product_id, nombre, precio, costo=None, cantidad=1):
+        """Suma 'cantidad' unidades del producto (crea la línea si no existe)."""
+        item = self._items.get(product_id)
+        if item is None:
+            item = {'nombre': nombre, 'precio': precio, 'costo': costo, 'cantidad': cantidad, 'id_db': product_id}
+            self._items[product_id] = item
+            evento = 'insert'
+        else:
+            item['cantidad'] += cantidad
+            evento = 'update'
+
+        self.subtotal += precio * cantidad
+        self._emit(evento, product_id, item)
+        return item
+
+    def remove(self, product_id):
+        """Elimina la línea completa del producto."""
+        item = self._items.pop(product_id)
+        if self._items:
+            self.subtotal -= item['precio'] * item['cantidad']
+        else:
+            # Sin líneas el subtotal vuelve a cero exacto (evita arrastrar error de redondeo)
+            self.subtotal = 0.0
+        self._emit('delete', product_id, item)
+        return item
+
+    def clear(self):
+        self._items = {}
+        self.subtotal = 0.0
+        self._emit('clear', None, None)
+
+    # -----------------------------------------------------------------
+    # Lectura (misma interfaz que el dict que reemplaza)
+    # -----------------------------------------------------------------
+    def __getitem__(self, product_id):
+        return self._items[product_id]
+
+    def __contains__(self, product_id):
+        return product_id in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def get(self, product_id, default=None):
+        return self._items.get(product_id, default)
+
+    def items(self):
+        return self._items.items()
+
+    def values(self):
+        return self._items.values()
+
+
+def cart_row_values(item):
+    """Valores de la fila del Treeview para una línea del carrito."""
+    subtotal = item['precio'] * item['cantidad']
+    return (item['id_db'], item['nombre'], f"{item['precio']:.2f}", item['cantidad'], f"{subtotal:.2f}")
+
+
+def patch_cart_tree(tree, evento, product_id, item):
+    """Aplica un evento de CarritoModel a un ttk.Treeview (una sola llamada de Tk por evento)."""
+    if evento == 'insert':
+        tree.insert('', 'end', iid=product_id, values=cart_row_values(item), tags=(product_id,))
+    elif evento == 'update':
+        tree.item(product_id, values=cart_row_values(item))
+    elif evento == 'delete':
+        tree.delete(product_id)
+    elif evento == 'clear':
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
@@ -0,0 +1,133 @@
+# catalogo.py (CACHÉ EN MEMORIA DEL CATÁLOGO POR CÓDIGO DE BARRAS)
+#
+# Ventas, Devolución y Consulta de Precio buscan cada escaneo aquí en lugar de
+# consultar Productos. La caché se carga completa una vez y luego solo aplica los
+# cambios registrados en CambiosCatalogo (triggers de la migración 3):
+#   - Escrituras de otras conexiones (hilo DBExecutor, otra instancia de la app):
+#     se detectan porque cambia PRAGMA data_version en la conexión compartida.
+#   - Escrituras de la propia conexión compartida (módulo de Inventario): no cambian
+#     data_version, por eso Inventario llama a invalidate() después de cada commit.
+
+import sqlite3
+
+from utils import get_connection
+
+
+class ProductoCatalogo:
+    """Registro compacto de un producto (solo lo que necesita un escaneo)."""
+    __slots__ = ("id", "codigo_barras", "nombre", "precio_venta", "precio_compra", "stock")
+
+    def __init__(self, id, codigo_barras, nombre, precio_venta, precio_compra, stock):
+        self.id = id
+        self.codigo_barras = codigo_barras
+        self.nombre = nombre
+        self.precio_venta = precio_venta
+        self.precio_compra = precio_compra
+        self.stock = stock
+
+
+_PRODUCT_COLUMNS = "id, codigo_barras, nombre, precio_venta, precio_compra, stock"
+
+
+class CatalogoProductos:
+    """Catálogo de productos en memoria indexado por código de barras."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._by_barcode = {}
+        self._by_id = {}
+        self._last_seq = 0
+        self._data_version = None
+        self._dirty = True
+        self.reload()
+
+    def reload(self):
+        """Carga completa del catálogo (al iniciar o si la caché quedó muy atrasada)."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM CambiosCatalogo")
+        last_seq = cursor.fetchone()[0]
+        cursor.execute(f"SELECT {_PRODUCT_COLUMNS} FROM Productos")
+
+        self._by_barcode = {}
+        self._by_id = {}
+        for row in cursor:
+            self._store(ProductoCatalogo(*row))
+
+        self._last_seq = last_seq
+        self._data_version = self._read_data_version()
+        self._dirty = False
+
+    def invalidate(self):
+        """Marca la caché para revisar el registro de cambios en la próxima búsqueda."""
+        self._dirty = True
+
+    def get(self, barcode: str):
+        """Devuelve el ProductoCatalogo del código o None si no existe."""
+        self._refresh_if_stale()
+        return self._by_barcode.get(barcode)
+
+    # -----------------------------------------------------------------
+    # Sincronización
+    # -----------------------------------------------------------------
+    def _read_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh_if_stale(self):
+        try:
+            data_version = self._read_data_version()
+            if not self._dirty and data_version == self._data_version:
+                return
+            self._apply_changes()
+            self._data_version = data_version
+            self._dirty = False
+        except sqlite3.Error as e:
+            # Si la base está ocupada se sirve la copia actual y se reintenta en el próximo escaneo
+            print(f"Catálogo: no se pudo sincronizar la caché: {e}")
+
+    def _apply_changes(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(seq), MAX(seq) FROM CambiosCatalogo")
+        min_seq, max_seq = cursor.fetchone()
+        if max_seq is None or max_seq <= self._last_seq:
+            return
+        if min_seq > self._last_seq + 1:
+            # Los cambios pendientes ya fueron podados: recarga completa
+            self.reload()
+            return
+
+        cursor.execute(
+            "SELECT DISTINCT producto_id FROM CambiosCatalogo WHERE seq > ? AND seq <= ?",
+            (self._last_seq, max_seq)
+        )
+        changed_ids = [row[0] for row in cursor.fetchall()]
+
+        for product_id in changed_ids:
+            self._discard(product_id)
+        for i in range(0, len(changed_ids), 500):
+            chunk = changed_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"SELECT {_PRODUCT_COLUMNS} FROM Productos WHERE id IN ({placeholders})", chunk)
+            for row in cursor.fetchall():
+                self._store(ProductoCatalogo(*row))
+
+        self._last_seq = max_seq
+
+    def _store(self, product):
+        self._by_barcode[product.codigo_barras] = product
+        self._by_id[product.id] = product
+
+    def _discard(self, product_id):
+        product = self._by_id.pop(product_id, None)
+        if product is not None and self._by_barcode.get(product.codigo_barras) is product:
+            del self._by_barcode[product.codigo_barras]
+
+
+_catalogo = None
+
+
+def get_catalog() -> CatalogoProductos:
+    """[API Pública] Catálogo compartido (solo para el hilo de Tk, usa la conexión compartida)."""
+    global _catalogo
+    if _catalogo is None:
+        _catalogo = CatalogoProductos(get_connection())
+    return _catalogo
@@ -0,0 +1,296 @@
+# cli_app.py (LÍNEA DE COMANDOS SIN INTERFAZ GRÁFICA)
+#
+# main_app.start_app() necesita pantalla, la ventana de licencia y construir todos
+# los módulos de Tk antes de poder hacer nada. Para tareas programadas (cron, el
+# Programador de tareas de Windows) este punto de entrada usa la misma capa de base
+# de datos (utils.setup_db, migraciones, PRAGMAs) sin importar customtkinter:
+#
+#   python cli_app.py export --desde 2024-01-01 --hasta 2024-01-31 --formato csv --gzip
+#   python cli_app.py export --desde 2024-01-01 --hasta 2024-12-31 --formato pdf --salida anual.pdf
+#   python cli_app.py rebuild-summary [--desde ...] [--hasta ...]
+#   python cli_app.py import-products productos.csv [--actualizar]
+#   python cli_app.py fetch-rate [--solo-consultar]
+#   python cli_app.py backup [--destino carpeta] [--conservar 7]
+#   python cli_app.py check [--rapido]
+#
+# Requiere que la licencia ya esté activada (se activa abriendo la aplicación).
+# Devuelve 0 si todo salió bien y 1 si hubo un error, para que el programador de
+# tareas lo detecte.
+
+import argparse
+import datetime
+import glob
+import os
+import sqlite3
+import sys
+import time
+
+from utils import (setup_db, close_db, check_license_file, get_db_folder_path, rebuild_daily_summary,
+                   get_schema_version, SCHEMA_VERSION, DB_NAME)
+
+# Prefijo de los archivos de respaldo (darklord_20240131_230000.db)
+BACKUP_PREFIX = os.path.splitext(DB_NAME)[0]
+
+# Páginas copiadas por paso de la API de respaldo (entre pasos la base queda libre)
+BACKUP_PAGES_PER_STEP = 1024
+
+# Diferencia tolerada al comparar ResumenDiario con los movimientos
+SUMMARY_TOLERANCE = 0.005
+
+
+def _fecha(texto: str) -> str:
+    """Tipo de argparse para fechas YYYY-MM-DD."""
+    try:
+        return datetime.datetime.strptime(texto, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida '{texto}' (formato YYYY-MM-DD)")
+
+
+def _entero_positivo(texto: str) -> int:
+    """Tipo de argparse para cantidades mayores que cero."""
+    try:
+        valor = int(texto)
+    except ValueError:
+        valor = 0
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un entero mayor que cero")
+    return valor
+
+
+# ===================================================================
+# --- COMANDOS ---
+# ===================================================================
+
+def cmd_export(conn, args) -> int:
+    """Exporta el período a PDF (reporte ejecutivo) o a CSV / JSON Lines (un archivo por conjunto)."""
+    from exportadores import exportar_reporte_pdf, exportar_datos_periodo, resumen_para_pdf, CONJUNTOS_DATOS
+
+    if args.hasta < args.desde:
+        print("Error: --hasta es anterior a --desde.")
+        return 1
+
+    if args.formato == "pdf":
+        path = args.salida or f"Reporte_Ejecutivo_{args.desde}_{args.hasta}.pdf"
+        summary = resumen_para_pdf(conn, args.desde, args.hasta)
+        stats = exportar_reporte_pdf(conn, path, summary, args.desde, args.hasta)
+        print(f"PDF exportado en {path}: {stats['paginas']} páginas, {stats['filas']} filas "
+              f"en {stats['segundos']:.1f} s ({stats['paginas_por_segundo']:.0f} páginas/s)")
+        return 0
+
+    carpeta = args.salida or "."
+    os.makedirs(carpeta, exist_ok=True)
+    conjuntos = args.conjuntos or list(CONJUNTOS_DATOS)
+    resultados = exportar_datos_periodo(conn, carpeta, args.formato, args.desde, args.hasta,
+                                        args.gzip, conjuntos)
+    for path, stats in resultados.items():
+        print(f"{path}: {stats['filas']:,} filas, {stats['bytes'] / 1024:,.0f} KiB en {stats['segundos']:.2f} s")
+    return 0
+
+
+def cmd_rebuild_summary(conn, args) -> int:
+    """Reconstruye ResumenDiario a partir de los movimientos."""
+    rebuild_daily_summary(conn, args.desde, args.hasta)
+    filas = conn.execute("SELECT COUNT(*) FROM ResumenDiario").fetchone()[0]
+    print(f"ResumenDiario reconstruido ({filas} renglones).")
+    return 0
+
+
+def cmd_import_products(conn, args) -> int:
+    """Importa productos desde un CSV (todo o nada)."""
+    from importacion_productos import ErrorImportacion, importar_productos_csv
+
+    try:
+        resultado = importar_productos_csv(conn, args.archivo, args.actualizar)
+    except ErrorImportacion as e:
+        print(f"No se importó ningún producto: {e}")
+        for linea, mensaje in e.errores:
+            print(f"  línea {linea}: {mensaje}")
+        return 1
+    print(f"Productos insertados: {resultado['insertados']}, actualizados: {resultado['actualizados']}, "
+          f"omitidos (ya existían): {resultado['omitidos']}")
+    return 0
+
+
+def cmd_fetch_rate(conn, args) -> int:
+    """Consulta la tasa BCV con el pipeline de proveedores y la registra si cambió."""
+    from proveedores_tasa import get_rate_pipeline
+    from servicio_tasa import misma_tasa, registrar_tasa, ultima_tasa_registrada
+
+    pipeline = get_rate_pipeline()
+    tasa = pipeline.obtener_tasa()
+    if tasa is None:
+        print("No se pudo obtener la tasa BCV de ningún proveedor.")
+        return 1
+
+    proveedor = pipeline.ultimo_proveedor or "BCV"
+    print(f"Tasa BCV ({proveedor}): 1$ = Bs. {tasa:,.4f}")
+    if args.solo_consultar:
+        return 0
+
+    # Igual que la actualización horaria de la app: una tasa sin cambio no se registra
+    if misma_tasa(tasa, ultima_tasa_registrada(conn)):
+        print("Tasa sin cambio; no se registró.")
+        return 0
+
+    fecha_registro = registrar_tasa(conn, tasa)
+    conn.commit()
+    print(f"Tasa guardada ({fecha_registro}).")
+    return 0
+
+
+def cmd_backup(conn, args) -> int:
+    """Copia la base en caliente con la API de respaldo de SQLite y verifica la copia."""
+    carpeta = args.destino or os.path.join(get_db_folder_path(), "respaldos")
+    os.makedirs(carpeta, exist_ok=True)
+    sello = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(carpeta, f"{BACKUP_PREFIX}_{sello}.db")
+    temp_path = f"{path}.part"
+
+    inicio = time.perf_counter()
+    destino = sqlite3.connect(temp_path)
+    try:
+        # Por pasos: la app puede seguir escribiendo mientras se copia
+        conn.backup(destino, pages=BACKUP_PAGES_PER_STEP)
+        resultado = destino.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        destino.close()
+    if resultado != "ok":
+        os.remove(temp_path)
+        print(f"La copia no pasó la verificación: {resultado}")
+        return 1
+    os.replace(temp_path, path)
+    print(f"Respaldo creado: {path} ({os.path.getsize(path) / 1024 / 1024:,.1f} MiB "
+          f"en {time.perf_counter() - inicio:.1f} s)")
+
+    if args.conservar:
+        respaldos = sorted(glob.glob(os.path.join(carpeta, f"{BACKUP_PREFIX}_*.db")))
+        for viejo in respaldos[:-args.conservar]:
+            os.remove(viejo)
+            print(f"Respaldo antiguo eliminado: {viejo}")
+    return 0
+
+
+def cmd_check(conn, args) -> int:
+    """Verifica la integridad de la base, las claves foráneas y el resumen diario."""
+    from consultas_reportes import resumen_ejecutivo, resumen_ejecutivo_movimientos
+
+    problemas = 0
+
+    pragma = "quick_check" if args.rapido else "integrity_check"
+    resultados = [fila[0] for fila in conn.execute(f"PRAGMA {pragma}")]
+    if resultados == ["ok"]:
+        print(f"{pragma}: ok")
+    else:
+        problemas += len(resultados)
+        print(f"{pragma}: {len(resultados)} problema(s)")
+        for linea in resultados[:20]:
+            print(f"  {linea}")
+
+    huerfanos = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if huerfanos:
+        problemas += len(huerfanos)
+        print(f"foreign_key_check: {len(huerfanos)} fila(s) sin su registro padre")
+        for tabla, rowid, padre, _ in huerfanos[:20]:
+            print(f"  {tabla} rowid={rowid} -> {padre}")
+    else:
+        print("foreign_key_check: ok")
+
+    version = get_schema_version(conn)
+    if version != SCHEMA_VERSION:
+        problemas += 1
+        print(f"Versión del esquema: {version} (se esperaba {SCHEMA_VERSION})")
+    else:
+        print(f"Versión del esquema: {version}")
+
+    # ResumenDiario debe coincidir con los movimientos (lo mantienen los triggers)
+    desde = args.desde or "0000-01-01"
+    hasta = args.hasta or "9999-12-31"
+    guardado = resumen_ejecutivo(conn, desde, hasta)
+    calculado = resumen_ejecutivo_movimientos(conn, desde, hasta)
+    diferencias = [
+        (concepto, moneda, guardado[concepto][moneda], calculado[concepto][moneda])
+        for concepto in calculado for moneda in ("Bs", "USD")
+        if abs(guardado[concepto][moneda] - calculado[concepto][moneda]) > SUMMARY_TOLERANCE
+    ]
+    if diferencias:
+        problemas += len(diferencias)
+        print("ResumenDiario no coincide con los movimientos (corregir con 'rebuild-summary'):")
+        for concepto, moneda, a, b in diferencias:
+            print(f"  {concepto} [{moneda}]: {a:,.2f} guardado vs {b:,.2f} calculado")
+    else:
+        print("ResumenDiario: coincide con los movimientos")
+
+    return 1 if problemas else 0
+
+
+# ===================================================================
+# --- PUNTO DE ENTRADA ---
+# ===================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Operaciones por lotes de la tienda, sin interfaz gráfica.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    exportar = subcomandos.add_parser("export", help="Exporta movimientos (CSV/JSON Lines) o el reporte ejecutivo (PDF)")
+    exportar.add_argument("--desde", type=_fecha, required=True, help="Fecha inicial YYYY-MM-DD")
+    exportar.add_argument("--hasta", type=_fecha, required=True, help="Fecha final YYYY-MM-DD")
+    exportar.add_argument("--formato", choices=("csv", "jsonl", "pdf"), default="csv")
+    exportar.add_argument("--gzip", action="store_true", help="Comprime los archivos CSV/JSON Lines")
+    exportar.add_argument("--salida", help="Archivo (PDF) o carpeta (CSV/JSON Lines); por defecto, la actual")
+    exportar.add_argument("--conjuntos", nargs="+",
+                          choices=("ventas", "venta_detalle", "avances", "recargas", "tasas_bcv"),
+                          help="Conjuntos a exportar (por defecto, todos)")
+    exportar.set_defaults(funcion=cmd_export)
+
+    reconstruir = subcomandos.add_parser("rebuild-summary", help="Reconstruye la tabla ResumenDiario")
+    reconstruir.add_argument("--desde", type=_fecha, help="Fecha inicial YYYY-MM-DD (por defecto, todo)")
+    reconstruir.add_argument("--hasta", type=_fecha, help="Fecha final YYYY-MM-DD (por defecto, todo)")
+    reconstruir.set_defaults(funcion=cmd_rebuild_summary)
+
+    importar = subcomandos.add_parser("import-products", help="Importa productos desde un archivo CSV")
+    importar.add_argument("archivo", help="CSV con codigo_barras, nombre, descripcion, stock_bultos, "
+                                          "unidades_por_bulto, precio_bulto, porcentaje_ganancia")
+    importar.add_argument("--actualizar", action="store_true",
+                          help="Actualiza precios y suma el stock de los productos que ya existen")
+    importar.set_defaults(funcion=cmd_import_products)
+
+    tasa = subcomandos.add_parser("fetch-rate", help="Consulta la tasa BCV y la registra si cambió")
+    tasa.add_argument("--solo-consultar", action="store_true", help="Muestra la tasa sin guardarla")
+    tasa.set_defaults(funcion=cmd_fetch_rate)
+
+    respaldo = subcomandos.add_parser("backup", help="Crea una copia verificada de la base de datos")
+    respaldo.add_argument("--destino", help="Carpeta de respaldos (por defecto, MDB/respaldos)")
+    respaldo.add_argument("--conservar", type=_entero_positivo, help="Cantidad de respaldos a conservar en la carpeta")
+    respaldo.set_defaults(funcion=cmd_backup)
+
+    verificar = subcomandos.add_parser("check", help="Verifica la integridad de la base de datos")
+    verificar.add_argument("--rapido", action="store_true", help="Usa quick_check en vez de integrity_check")
+    verificar.add_argument("--desde", type=_fecha, help="Inicio del rango a comparar en ResumenDiario")
+    verificar.add_argument("--hasta", type=_fecha, help="Fin del rango a comparar en ResumenDiario")
+    verificar.set_defaults(funcion=cmd_check)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if not check_license_file():
+        print("La licencia no está activada. Abra la aplicación una vez para activarla.")
+        return 1
+
+    conn = setup_db()
+    if conn is None:
+        print("No se pudo abrir la base de datos.")
+        return 1
+    try:
+        return args.funcion(conn, args)
+    except (sqlite3.Error, OSError, ValueError, RuntimeError) as e:
+        print(f"Error en '{args.comando}': {e}")
+        return 1
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
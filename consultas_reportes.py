@@ -0,0 +1,285 @@
+# consultas_reportes.py (CONSULTAS COMPARTIDAS DE REPORTES Y EXPORTACIÓN)
+#
+# Funciones sin Tk: reciben una conexión y devuelven datos. Las usan el resumen
+# ejecutivo / exportación a PDF (desde el hilo de Tk o desde DBExecutor).
+#
+# La tasa de un avance o recarga es la vigente en su fecha_hora: la última de
+# TasasBCV con fecha_registro <= fecha_hora (en empates, la de mayor id) o, si no
+# hay ninguna anterior, la última registrada. LineaTasas (en memoria), la
+# subconsulta utils.RATE_ASOF_SQL y los triggers de ResumenDiario aplican el mismo criterio.
+
+import bisect
+
+from utils import RATE_ASOF_SQL
+
+
+# ===================================================================
+# --- LÍNEA DE TIEMPO DE TASAS BCV ---
+# ===================================================================
+
+class LineaTasas:
+    """Historial de TasasBCV en memoria para buscar "la tasa vigente a tal fecha/hora".
+
+    Antes cada avance y cada recarga del reporte hacía su propia consulta a TasasBCV
+    (y una segunda si no había tasa anterior). Ahora el historial se carga una vez
+    por reporte con una sola consulta y cada búsqueda es una búsqueda binaria.
+    """
+
+    def __init__(self, filas):
+        # 'filas': (fecha_registro, tasa) ordenadas por fecha_registro (y por id en empates)
+        self._fechas = [fecha for fecha, _ in filas]
+        self._tasas = [tasa for _, tasa in filas]
+        self._mas_reciente = None
+
+    @classmethod
+    def cargar(cls, conn):
+        """Carga todo el historial de tasas con una sola consulta."""
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, fecha_registro, tasa
+            FROM TasasBCV
+            ORDER BY fecha_registro, id
+        """)
+        filas = cursor.fetchall()
+
+        linea = cls([(fecha, tasa) for _, fecha, tasa in filas])
+        if filas:
+            # Respaldo cuando no hay tasa anterior: la última registrada (mayor id)
+            _, fecha, tasa = max(filas)
+            linea._mas_reciente = (tasa, fecha)
+        return linea
+
+    def __len__(self):
+        return len(self._fechas)
+
+    def tasa_en(self, fecha_hora: str) -> tuple[float, str]:
+        """Tasa vigente en 'fecha_hora' ("YYYY-MM-DD HH:MM:SS") y la fecha en que se registró.
+
+        Mismo criterio que la consulta anterior: la última tasa con fecha_registro <=
+        fecha_hora; si no hay ninguna, la más reciente registrada.
+        """
+        if not isinstance(fecha_hora, str):
+            return 0.0, "ERROR"
+
+        i = bisect.bisect_right(self._fechas, fecha_hora)
+        if i:
+            return float(self._tasas[i - 1]), str(self._fechas[i - 1])
+
+        if self._mas_reciente and self._mas_reciente[0]:
+            tasa, fecha = self._mas_reciente
+            return float(tasa), f"{fecha} (Más Reciente)"
+
+        return 0.0, "N/A (Sin tasa en DB)"
+
+    def tasa(self, fecha_hora: str) -> float:
+        """Solo el valor de la tasa (0.0 si no hay ninguna)."""
+        return self.tasa_en(fecha_hora)[0]
+
+
+def tasa_vigente(conn, fecha_hora: str) -> tuple[float, str]:
+    """Tasa vigente en una sola fecha/hora (dos consultas como máximo, sin cargar el historial)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT tasa, fecha_registro
+        FROM TasasBCV
+        WHERE fecha_registro <= ?
+        ORDER BY fecha_registro DESC, id DESC
+        LIMIT 1
+    """, (fecha_hora,))
+    result = cursor.fetchone()
+    if result:
+        return float(result[0]), str(result[1])
+
+    cursor.execute("SELECT tasa, fecha_registro FROM TasasBCV ORDER BY id DESC LIMIT 1")
+    latest = cursor.fetchone()
+    if latest and latest[0]:
+        return float(latest[0]), f"{latest[1]} (Más Reciente)"
+    return 0.0, "N/A (Sin tasa en DB)"
+
+
+# ===================================================================
+# --- RESUMEN EJECUTIVO ---
+# ===================================================================
+
+# Conceptos del resumen, en el orden en que se muestran
+CONCEPTOS_RESUMEN = (
+    "Ventas (Neto)",
+    "Devoluciones",
+    "Avances de Efectivo (Monto Entregado)",
+    "Ganancia Avances (Comisión)",
+    "Recargas Telefónicas (Monto Base)",
+    "Ganancia Recargas (Comisión)",
+)
+
+# Una fila por tipo de movimiento: (tipo, bs, usd, comision_bs, comision_usd).
+# Las ventas ya guardan ambos montos; avances y recargas se convierten con la tasa
+# vigente en su fecha_hora (sin tasa válida, el monto en USD cuenta como 0).
+# El "LIMIT -1" de las subconsultas evita que SQLite las aplane: sin él, la búsqueda
+# de la tasa se repetiría por cada vez que se usa 'tasa' (4 por fila en vez de 1).
+_RESUMEN_SQL = """
+    SELECT tipo, TOTAL(bs), TOTAL(usd), TOTAL(comision_bs), TOTAL(comision_usd)
+    FROM (
+        SELECT CASE estado WHEN 'Completada' THEN 'venta' ELSE 'devolucion' END AS tipo,
+               monto_total_bs AS bs, total_venta AS usd,
+               NULL AS comision_bs, NULL AS comision_usd
+        FROM Ventas
+        WHERE {filtro} AND estado IN ('Completada', 'Devolucion')
+
+        UNION ALL
+
+        SELECT 'avance', monto_entregado,
+               CASE WHEN tasa > 0 THEN monto_entregado / tasa END,
+               comision,
+               CASE WHEN tasa > 0 THEN comision / tasa END
+        FROM (SELECT monto_entregado, comision, {tasa_avance} AS tasa
+              FROM AvancesEfectivo
+              WHERE {filtro} AND estado = 'Concretado' LIMIT -1)
+
+        UNION ALL
+
+        SELECT 'recarga', monto_base,
+               CASE WHEN tasa > 0 THEN monto_base / tasa END,
+               comision,
+               CASE WHEN tasa > 0 THEN comision / tasa END
+        FROM (SELECT monto_base, comision, {tasa_recarga} AS tasa
+              FROM RecargasTelefonicas
+              WHERE {filtro} AND estado = 'Concretado' LIMIT -1)
+    )
+    GROUP BY tipo
+"""
+
+
+def _totales_por_concepto(filas) -> dict:
+    """Convierte filas (tipo, bs, usd, comision_bs, comision_usd) al diccionario del resumen."""
+    totals = {concepto: {"Bs": 0.0, "USD": 0.0} for concepto in CONCEPTOS_RESUMEN}
+    for tipo, bs, usd, comision_bs, comision_usd in filas:
+        if tipo == 'venta':
+            totals["Ventas (Neto)"] = {"Bs": bs, "USD": usd}
+        elif tipo == 'devolucion':
+            # Las devoluciones restan montos
+            totals["Devoluciones"] = {"Bs": -bs, "USD": -usd}
+        elif tipo == 'avance':
+            totals["Avances de Efectivo (Monto Entregado)"] = {"Bs": bs, "USD": usd}
+            totals["Ganancia Avances (Comisión)"] = {"Bs": comision_bs, "USD": comision_usd}
+        elif tipo == 'recarga':
+            totals["Recargas Telefónicas (Monto Base)"] = {"Bs": bs, "USD": usd}
+            totals["Ganancia Recargas (Comisión)"] = {"Bs": comision_bs, "USD": comision_usd}
+    return totals
+
+
+def _filtro_fechas(date_start: str, date_end: str):
+    if date_start != date_end:
+        return "fecha BETWEEN ? AND ?", (date_start, date_end)
+    return "fecha = ?", (date_start,)
+
+
+def resumen_ejecutivo(conn, date_start: str, date_end: str) -> dict:
+    """Totales del resumen ejecutivo por concepto: {concepto: {"Bs": x, "USD": y}}.
+
+    Lee la tabla ResumenDiario (un renglón por día, concepto y método de pago, que los
+    triggers mantienen al día en cada escritura): un mes son unos cientos de renglones
+    en vez de miles de movimientos, y la tasa de cada avance/recarga ya está aplicada.
+    """
+    filtro, params = _filtro_fechas(date_start, date_end)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT concepto, TOTAL(total_bs), TOTAL(total_usd), TOTAL(comision_bs), TOTAL(comision_usd)
+        FROM ResumenDiario
+        WHERE {filtro}
+        GROUP BY concepto
+    """, params)
+    return _totales_por_concepto(cursor.fetchall())
+
+
+def resumen_ejecutivo_movimientos(conn, date_start: str, date_end: str) -> dict:
+    """Igual que resumen_ejecutivo(), pero calculado directamente sobre los movimientos.
+
+    Una sola consulta agregada (UNION ALL + GROUP BY) sobre Ventas, AvancesEfectivo y
+    RecargasTelefonicas, con la conversión a USD en SQL. Sirve para verificar
+    ResumenDiario (utils.rebuild_daily_summary la reconstruye si hiciera falta).
+    """
+    filtro, params = _filtro_fechas(date_start, date_end)
+    sql = _RESUMEN_SQL.format(
+        filtro=filtro,
+        tasa_avance=RATE_ASOF_SQL.format(col="AvancesEfectivo.fecha_hora"),
+        tasa_recarga=RATE_ASOF_SQL.format(col="RecargasTelefonicas.fecha_hora"),
+    )
+    cursor = conn.cursor()
+    cursor.execute(sql, params * 3)
+    return _totales_por_concepto(cursor.fetchall())
+
+
+# ===================================================================
+# --- DETALLE DE TRANSACCIONES (POR BLOQUES) ---
+# ===================================================================
+
+# Filas que se traen del cursor por vuelta al recorrer el detalle
+DETALLE_FILAS_POR_BLOQUE = 500
+
+
+def _filas_por_bloques(cursor, bloque):
+    while True:
+        filas = cursor.fetchmany(bloque)
+        if not filas:
+            return
+        yield from filas
+
+
+def contar_detalle(conn, date_start: str, date_end: str) -> dict:
+    """Cantidad de filas de cada sección del detalle: {"Ventas": n, "Avances": n, "Recargas": n}."""
+    filtro, params = _filtro_fechas(date_start, date_end)
+    cursor = conn.cursor()
+    cuentas = {}
+    for seccion, tabla in (("Ventas", "Ventas"), ("Avances", "AvancesEfectivo"), ("Recargas", "RecargasTelefonicas")):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla} WHERE {filtro}", params)
+        cuentas[seccion] = cursor.fetchone()[0]
+    return cuentas
+
+
+def iter_detalle_ventas(conn, date_start: str, date_end: str, bloque=DETALLE_FILAS_POR_BLOQUE):
+    """Ventas y devoluciones del período ya formateadas para el reporte, leídas por bloques."""
+    filtro, params = _filtro_fechas(date_start, date_end)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, fecha, hora, estado, monto_total_bs, total_venta
+        FROM Ventas
+        WHERE {filtro}
+        ORDER BY fecha DESC, hora DESC
+    """, params)
+    for id, fecha, hora, estado, monto_bs, monto_usd in _filas_por_bloques(cursor, bloque):
+        yield (id, f"{fecha} {hora}", estado, f"Bs. {monto_bs:,.2f}", f"$ {monto_usd:,.2f}")
+
+
+def iter_detalle_avances(conn, date_start: str, date_end: str, rates: LineaTasas,
+                         bloque=DETALLE_FILAS_POR_BLOQUE):
+    """Avances de efectivo del período con sus montos en USD (tasa vigente de cada uno)."""
+    filtro, params = _filtro_fechas(date_start, date_end)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, fecha_hora, monto_entregado, comision, estado
+        FROM AvancesEfectivo
+        WHERE {filtro}
+        ORDER BY fecha_hora DESC
+    """, params)
+    for id, fecha_hora, monto_entregado, comision, estado in _filas_por_bloques(cursor, bloque):
+        rate = rates.tasa(fecha_hora)
+        monto_usd = (monto_entregado / rate) if rate > 0 and monto_entregado else 0.0
+        comision_usd = (comision / rate) if rate > 0 and comision else 0.0
+        yield (id, fecha_hora, estado,
+               f"Bs. {monto_entregado:,.2f}", f"Bs. {comision:,.2f}",
+               f"$ {monto_usd:,.2f}", f"$ {comision_usd:,.2f}")
+
+
+def iter_detalle_recargas(conn, date_start: str, date_end: str, bloque=DETALLE_FILAS_POR_BLOQUE):
+    """Recargas telefónicas del período ya formateadas para el reporte, leídas por bloques."""
+    filtro, params = _filtro_fechas(date_start, date_end)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, fecha_hora, numero, monto_base, comision, monto_total, estado
+        FROM RecargasTelefonicas
+        WHERE {filtro}
+        ORDER BY fecha_hora DESC
+    """, params)
+    for id, fecha_hora, numero, monto_base, comision, monto_total, estado in _filas_por_bloques(cursor, bloque):
+        yield (id, fecha_hora, numero, estado,
+               f"Bs. {monto_base:,.2f}", f"Bs. {comision:,.2f}", f"Bs. {monto_total:,.2f}")
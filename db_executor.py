@@ -0,0 +1,165 @@
+# db_executor.py (HILO DEDICADO DE BASE DE DATOS)
+#
+# Todas las transacciones de escritura (cobros, devoluciones, avances, recargas, tasas)
+# y las consultas pesadas de exportación se ejecutan aquí, fuera del hilo de Tk.
+# Un disco lento o un bloqueo de SQLite ya no congela la caja: la interfaz sigue
+# respondiendo y el resultado llega como callback en el hilo de Tk vía after().
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+# Cada cuánto el hilo de Tk revisa si hay resultados listos (ms)
+TK_POLL_INTERVAL_MS = 25
+
+
+class DBExecutor:
+    """Ejecuta trabajos de base de datos en un único hilo con su propia conexión.
+
+    Un trabajo es una función fn(conn, *args). Si termina sin excepción se hace
+    commit; si lanza una excepción se hace rollback y la excepción llega al Future.
+    """
+
+    def __init__(self, connect):
+        # 'connect' es una función sin argumentos que abre la conexión del hilo
+        self._connect = connect
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = None
+        self._tk_root = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enviados": 0, "completados": 0, "fallidos": 0,
+            "espera_total_ms": 0.0, "ejecucion_total_ms": 0.0, "ejecucion_max_ms": 0.0,
+            "profundidad_max": 0,
+        }
+
+    # -----------------------------------------------------------------
+    # Ciclo de vida
+    # -----------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-executor", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout=10):
+        """Procesa los trabajos pendientes y detiene el hilo."""
+        if self._thread is None:
+            return
+        self._jobs.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def attach_tk(self, widget):
+        """Conecta el despacho de callbacks al bucle de Tk (una sola vez por proceso)."""
+        if self._tk_root is not None:
+            return
+        self._tk_root = widget.winfo_toplevel()
+        self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+
+    # -----------------------------------------------------------------
+    # API de envío
+    # -----------------------------------------------------------------
+    def submit(self, fn, *args, on_success=None, on_error=None) -> Future:
+        """Encola un trabajo. Los callbacks se ejecutan en el hilo de Tk."""
+        future = Future()
+        self._jobs.put((fn, args, future, time.perf_counter()))
+
+        with self._stats_lock:
+            self._stats["enviados"] += 1
+            self._stats["profundidad_max"] = max(self._stats["profundidad_max"], self._jobs.qsize())
+
+        if on_success is not None or on_error is not None:
+            future.add_done_callback(lambda f: self._results.put((f, on_success, on_error)))
+        return future
+
+    def run_sync(self, fn, *args, timeout=10):
+        """Ejecuta un trabajo y espera su resultado (solo para el cierre de la app)."""
+        return self.submit(fn, *args).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        """Profundidad de la cola y latencias (espera en cola y ejecución) en ms."""
+        with self._stats_lock:
+            s = dict(self._stats)
+        terminados = s["completados"] + s["fallidos"]
+        s["profundidad_actual"] = self._jobs.qsize()
+        s["espera_promedio_ms"] = s["espera_total_ms"] / terminados if terminados else 0.0
+        s["ejecucion_promedio_ms"] = s["ejecucion_total_ms"] / terminados if terminados else 0.0
+        return s
+
+    # -----------------------------------------------------------------
+    # Hilo de trabajo
+    # -----------------------------------------------------------------
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            print(f"DBExecutor: no se pudo abrir la base de datos: {e}")
+            conn = None
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, args, future, encolado = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                if conn is None:
+                    raise sqlite3.OperationalError("Base de datos no disponible")
+                result = fn(conn, *args)
+                conn.commit()
+            except Exception as e:
+                if conn is not None:
+                    conn.rollback()
+                self._record(encolado, inicio, ok=False)
+                future.set_exception(e)
+            else:
+                self._record(encolado, inicio, ok=True)
+                future.set_result(result)
+
+        if conn is not None:
+            conn.close()
+
+    def _record(self, encolado, inicio, ok):
+        fin = time.perf_counter()
+        ejecucion_ms = (fin - inicio) * 1000
+        with self._stats_lock:
+            self._stats["completados" if ok else "fallidos"] += 1
+            self._stats["espera_total_ms"] += (inicio - encolado) * 1000
+            self._stats["ejecucion_total_ms"] += ejecucion_ms
+            self._stats["ejecucion_max_ms"] = max(self._stats["ejecucion_max_ms"], ejecucion_ms)
+
+    # -----------------------------------------------------------------
+    # Despacho en el hilo de Tk
+    # -----------------------------------------------------------------
+    def _drain_results(self):
+        while True:
+            try:
+                future, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                error = future.exception()
+                if error is None:
+                    if on_success is not None:
+                        on_success(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"Error en trabajo de base de datos: {error}")
+            except Exception as e:
+                print(f"Error en callback de base de datos: {e}")
+
+    def _poll_tk(self):
+        self._drain_results()
+        try:
+            self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+        except Exception:
+            # La ventana principal ya fue destruida
+            self._tk_root = None
@@ -0,0 +1,662 @@
+# exportadores.py (EXPORTACIÓN EN STREAMING DE REPORTES GRANDES)
+#
+# El exportador armaba todo el detalle como texto en memoria y luego todo el
+# documento FPDF antes de escribir un solo byte: un año de transacciones eran
+# ~1.600 páginas y más de 100 MB en memoria. Aquí el PDF se escribe mientras se
+# recorre el cursor: cada página se comprime y va al disco al llenarse, y en
+# memoria solo quedan la página en curso y la tabla de offsets (xref).
+#
+# PDFStreamWriter es un escritor PDF mínimo (fuentes Helvetica estándar, texto,
+# rellenos y líneas) con la misma semántica de cell()/ln() que FPDF, para que el
+# reporte se vea igual que el generado con PDFReportGenerator. Como el total de
+# páginas no se conoce hasta el final, "Página n/total" dibuja el total con un
+# XObject que se escribe al cerrar el documento.
+#
+# Para contabilidad, los movimientos del período también se exportan en CSV o
+# JSON Lines (opcionalmente comprimidos con gzip): valores sin formato, una fila
+# por registro, leídos del cursor por bloques y escritos a medida que llegan.
+
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import time
+import zlib
+
+from consultas_reportes import (LineaTasas, contar_detalle, iter_detalle_ventas,
+                                iter_detalle_avances, iter_detalle_recargas,
+                                DETALLE_FILAS_POR_BLOQUE, resumen_ejecutivo, tasa_vigente)
+from utils import RATE_ASOF_SQL
+
+# Los anchos de caracteres de las fuentes estándar vienen con fpdf2. Importar fpdf
+# cuesta ~250 ms (carga todo el paquete), así que se hace al exportar el primer PDF.
+PDF_STREAMING_AVAILABLE = importlib.util.find_spec("fpdf") is not None
+_core_fonts_charwidths = None
+
+
+def _anchos_fuentes() -> dict:
+    global _core_fonts_charwidths
+    if _core_fonts_charwidths is None:
+        from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+        _core_fonts_charwidths = CORE_FONTS_CHARWIDTHS
+    return _core_fonts_charwidths
+
+# A4 vertical, en mm (como PDFReportGenerator)
+PAGE_WIDTH_MM = 210
+PAGE_HEIGHT_MM = 297
+MARGIN_MM = 10
+BOTTOM_MARGIN_MM = 15
+_PT_PER_MM = 72 / 25.4
+
+# Fuentes: estilo -> (recurso, BaseFont, clave de anchos en fpdf)
+_FONTS = {
+    "": ("F1", "Helvetica", "helvetica"),
+    "B": ("F2", "Helvetica-Bold", "helveticaB"),
+    "I": ("F3", "Helvetica-Oblique", "helveticaI"),
+}
+
+# Cada cuántas filas escritas se informa el avance de la exportación
+EXPORT_PROGRESS_ROWS = 200
+
+
+def _escape_pdf_text(texto: str) -> bytes:
+    data = texto.encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _num(valor) -> str:
+    return f"{valor:.2f}".rstrip("0").rstrip(".") or "0"
+
+
+class PDFStreamWriter:
+    """Escritor PDF que va guardando cada página en 'fileobj' apenas se completa.
+
+    Replica lo que usa el reporte de FPDF: set_font/set_text_color/set_fill_color,
+    cell(w, h, texto, borde, ln, alineación, relleno), ln(), rect() y salto de página
+    automático. Las subclases dibujan encabezado y pie en header()/footer().
+    """
+
+    def __init__(self, fileobj, title=""):
+        self._out = fileobj
+        self._offset = 0
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 7  # 1-6 reservados: catálogo, páginas, 3 fuentes, total de páginas
+        self._content = None
+        self._in_header_footer = False
+        self._anchos = _anchos_fuentes()
+        self.title = title
+
+        self.font_style = ""
+        self.font_size = 12
+        self.text_color = (0, 0, 0)
+        self.fill_color = (255, 255, 255)
+        self.x = MARGIN_MM
+        self.y = MARGIN_MM
+        self.last_h = 0
+        self.c_margin = MARGIN_MM / 10
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    # -----------------------------------------------------------------
+    # Estado de dibujo
+    # -----------------------------------------------------------------
+    @property
+    def page_no(self) -> int:
+        return len(self._page_ids) + (1 if self._content is not None else 0)
+
+    def set_font(self, style="", size=None):
+        self.font_style = style
+        if size is not None:
+            self.font_size = size
+
+    def set_text_color(self, r, g, b):
+        self.text_color = (r, g, b)
+
+    def set_fill_color(self, r, g, b):
+        self.fill_color = (r, g, b)
+
+    def get_string_width(self, texto: str) -> float:
+        anchos = self._anchos.get(_FONTS[self.font_style][2], {})
+        unidades = sum(anchos.get(chr(b), 500) for b in texto.encode("cp1252", errors="replace"))
+        return unidades * self.font_size / 1000 / _PT_PER_MM
+
+    # -----------------------------------------------------------------
+    # Primitivas
+    # -----------------------------------------------------------------
+    def _emit(self, linea: str):
+        self._content.append(linea.encode("latin-1") if isinstance(linea, str) else linea)
+
+    def _pt(self, x_mm, y_mm):
+        """mm desde la esquina superior izquierda -> puntos PDF (origen abajo a la izquierda)."""
+        return x_mm * _PT_PER_MM, (PAGE_HEIGHT_MM - y_mm) * _PT_PER_MM
+
+    @staticmethod
+    def _rgb(color):
+        return " ".join(_num(c / 255) for c in color)
+
+    def rect(self, x, y, w, h, style="F"):
+        px, py = self._pt(x, y + h)
+        op = "f" if style == "F" else "S"
+        self._emit(f"{self._rgb(self.fill_color)} rg {_num(px)} {_num(py)} "
+                   f"{_num(w * _PT_PER_MM)} {_num(h * _PT_PER_MM)} re {op}")
+
+    def _line(self, x1, y1, x2, y2):
+        a, b = self._pt(x1, y1)
+        c, d = self._pt(x2, y2)
+        self._emit(f"{_num(a)} {_num(b)} m {_num(c)} {_num(d)} l S")
+
+    def _text(self, x, y_baseline, texto):
+        px, py = self._pt(x, y_baseline)
+        self._content.append(
+            f"BT /{_FONTS[self.font_style][0]} {_num(self.font_size)} Tf {self._rgb(self.text_color)} rg "
+            f"{_num(px)} {_num(py)} Td (".encode("latin-1") + _escape_pdf_text(texto) + b") Tj ET"
+        )
+
+    def cell(self, w, h=0, texto="", border=0, ln=0, align="L", fill=False):
+        """Celda como FPDF.cell: w=0 llega hasta el margen derecho; ln=1 pasa a la línea siguiente."""
+        if (not self._in_header_footer and self._content is not None
+                and self.y + h > PAGE_HEIGHT_MM - BOTTOM_MARGIN_MM):
+            x = self.x
+            self.add_page()
+            self.x = x
+        if w == 0:
+            w = PAGE_WIDTH_MM - MARGIN_MM - self.x
+
+        if fill:
+            self.rect(self.x, self.y, w, h, "F")
+        if border == 1:
+            px, py = self._pt(self.x, self.y + h)
+            self._emit(f"{_num(px)} {_num(py)} {_num(w * _PT_PER_MM)} {_num(h * _PT_PER_MM)} re S")
+        elif border:
+            if "L" in border:
+                self._line(self.x, self.y, self.x, self.y + h)
+            if "T" in border:
+                self._line(self.x, self.y, self.x + w, self.y)
+            if "R" in border:
+                self._line(self.x + w, self.y, self.x + w, self.y + h)
+            if "B" in border:
+                self._line(self.x, self.y + h, self.x + w, self.y + h)
+
+        texto = str(texto)
+        if texto:
+            ancho = self.get_string_width(texto)
+            if align == "R":
+                dx = w - self.c_margin - ancho
+            elif align == "C":
+                dx = (w - ancho) / 2
+            else:
+                dx = self.c_margin
+            self._text(self.x + dx, self.y + 0.5 * h + 0.3 * self.font_size / _PT_PER_MM, texto)
+
+        self.last_h = h
+        if ln:
+            self.x = MARGIN_MM
+            self.y += h
+        else:
+            self.x += w
+
+    def ln(self, h=None):
+        self.x = MARGIN_MM
+        self.y += self.last_h if h is None else h
+
+    def total_pages_mark(self, x, y_baseline):
+        """Dibuja el total de páginas (se conoce al cerrar) en la posición indicada."""
+        px, py = self._pt(x, y_baseline)
+        self._emit(f"q {self._rgb(self.text_color)} rg 1 0 0 1 {_num(px)} {_num(py)} cm /TP Do Q")
+
+    # -----------------------------------------------------------------
+    # Páginas
+    # -----------------------------------------------------------------
+    def header(self):
+        pass
+
+    def footer(self):
+        pass
+
+    def add_page(self):
+        """Cierra la página actual (pie + escritura a disco) y abre una nueva con su encabezado."""
+        estado = (self.font_style, self.font_size, self.text_color, self.fill_color)
+        if self._content is not None:
+            self._finish_page()
+        self._content = [b"0.57 w 0 0 0 RG"]
+        self.x, self.y = MARGIN_MM, MARGIN_MM
+        self._in_header_footer = True
+        self.header()
+        self._in_header_footer = False
+        # Como FPDF, el contenido sigue con la fuente y colores que tenía antes del salto
+        self.font_style, self.font_size, self.text_color, self.fill_color = estado
+
+    def _finish_page(self):
+        self._in_header_footer = True
+        self.footer()
+        self._in_header_footer = False
+
+        contenido = zlib.compress(b"\n".join(self._content))
+        self._content = None
+        content_id = self._new_object(
+            f"<< /Length {len(contenido)} /Filter /FlateDecode >>\nstream\n".encode("latin-1")
+            + contenido + b"\nendstream"
+        )
+        page_id = self._new_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(PAGE_WIDTH_MM * _PT_PER_MM)} "
+            f"{_num(PAGE_HEIGHT_MM * _PT_PER_MM)}] /Resources << /Font << /F1 3 0 R /F2 4 0 R /F3 5 0 R >> "
+            f"/XObject << /TP 6 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        self._page_ids.append(page_id)
+
+    # -----------------------------------------------------------------
+    # Archivo
+    # -----------------------------------------------------------------
+    def _write(self, data: bytes):
+        self._out.write(data)
+        self._offset += len(data)
+
+    def _write_object(self, obj_id, body):
+        if isinstance(body, str):
+            body = body.encode("latin-1")
+        self._offsets[obj_id] = self._offset
+        self._write(f"{obj_id} 0 obj\n".encode("latin-1") + body + b"\nendobj\n")
+
+    def _new_object(self, body):
+        obj_id = self._next_id
+        self._next_id += 1
+        self._write_object(obj_id, body)
+        return obj_id
+
+    def close(self):
+        """Termina la última página y escribe las estructuras finales (páginas, fuentes, xref)."""
+        if self._content is None and not self._page_ids:
+            self.add_page()
+        if self._content is not None:
+            self._finish_page()
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>")
+        for obj_id, (_, base_font, _) in zip((3, 4, 5), _FONTS.values()):
+            self._write_object(obj_id, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} "
+                                       f"/Encoding /WinAnsiEncoding >>")
+        total = f"BT /F3 8 Tf 0 0 Td ({len(self._page_ids)}) Tj ET".encode("latin-1")
+        self._write_object(6, f"<< /Type /XObject /Subtype /Form /BBox [0 -5 100 20] "
+                              f"/Resources << /Font << /F3 5 0 R >> >> /Length {len(total)} >>\nstream\n"
+                              .encode("latin-1") + total + b"\nendstream")
+        info_id = self._new_object(b"<< /Title (" + _escape_pdf_text(self.title) + b") /Producer (app-tienda) >>")
+
+        xref_offset = self._offset
+        lineas = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, self._next_id):
+            lineas.append(f"{self._offsets[obj_id]:010d} 00000 n \n")
+        lineas.append(f"trailer\n<< /Size {self._next_id} /Root 1 0 R /Info {info_id} 0 R >>\n"
+                      f"startxref\n{xref_offset}\n%%EOF\n")
+        self._write("".join(lineas).encode("latin-1"))
+
+
+class ReporteEjecutivoPDF(PDFStreamWriter):
+    """Mismo formato que PDFReportGenerator (encabezado, secciones y tablas), escrito por páginas."""
+
+    def __init__(self, fileobj, title, date_range, rate_info):
+        super().__init__(fileobj, title)
+        self.date_range = date_range
+        self.rate_info = rate_info
+        self.add_page()
+        self.write_header()
+
+    def header(self):
+        # Logo o título principal
+        self.set_font('B', 15)
+        self.set_text_color(52, 73, 94)
+        self.cell(0, 5, 'INVERSIONES MARTINEZ', 0, 1, 'L')
+
+        # Línea de separación
+        self.ln(2)
+        self.set_fill_color(52, 73, 94)
+        self.rect(MARGIN_MM, self.y, PAGE_WIDTH_MM - 2 * MARGIN_MM, 0.5, 'F')
+        self.ln(3)
+
+    def footer(self):
+        self.y = PAGE_HEIGHT_MM - 15
+        self.set_font('I', 8)
+        self.set_text_color(127, 140, 141)
+        # "Página n/" termina en el centro y el total (XObject) empieza ahí
+        etiqueta = f'Página {self.page_no}/'
+        centro = PAGE_WIDTH_MM / 2
+        self.x = centro - self.get_string_width(etiqueta)
+        self._text(self.x, self.y + 5 + 0.3 * 8 / _PT_PER_MM, etiqueta)
+        self.total_pages_mark(centro, self.y + 5 + 0.3 * 8 / _PT_PER_MM)
+        self.x = MARGIN_MM
+        self.cell(0, 10, 'Generado por Sistema de Gestión Martinez', 0, 0, 'R')
+
+    def write_header(self):
+        self.set_font('B', 16)
+        self.set_text_color(22, 160, 133)
+        self.cell(0, 8, self.title, 0, 1, 'L')
+
+        self.set_font('', 11)
+        self.set_text_color(100, 100, 100)
+        self.cell(0, 6, f'Período: {self.date_range}', 0, 1, 'L')
+        self.cell(0, 6, self.rate_info, 0, 1, 'L')
+        self.ln(5)
+
+    def title_section(self, title):
+        self.set_font('B', 12)
+        self.set_fill_color(236, 240, 241)
+        self.set_text_color(52, 73, 94)
+        # Como en FPDF, el salto de línea inicial del título solo baja el cursor
+        if title.startswith("\n"):
+            title = title.lstrip("\n")
+        self.cell(0, 7, title, 0, 1, 'L', 1)
+        self.ln(1)
+
+    def write_table(self, header, rows, col_widths, align='L', on_rows=None):
+        """Escribe una tabla consumiendo 'rows' (cualquier iterable) fila por fila."""
+        # Cabecera
+        self.set_font('B', 9)
+        self.set_fill_color(52, 73, 94)
+        self.set_text_color(255, 255, 255)
+        for i, h in enumerate(header):
+            self.cell(col_widths[i], 7, h, 1, 0, 'C', 1)
+        self.ln()
+
+        # Filas de datos
+        self.set_font('', 9)
+        self.set_text_color(0, 0, 0)
+        fill = False
+        written = 0
+        for row in rows:
+            self.set_fill_color(*((236, 240, 241) if fill else (255, 255, 255)))
+            for i, item in enumerate(row):
+                if item is None:
+                    item = ''
+                # Alineación a la derecha para montos
+                cell_align = 'R' if i in (len(row) - 1, len(row) - 2) else align
+                self.cell(col_widths[i], 6, str(item), 'LR', 0, cell_align, fill)
+            self.ln()
+            fill = not fill
+            written += 1
+            if on_rows is not None and written % EXPORT_PROGRESS_ROWS == 0:
+                on_rows(EXPORT_PROGRESS_ROWS)
+        if on_rows is not None and written % EXPORT_PROGRESS_ROWS:
+            on_rows(written % EXPORT_PROGRESS_ROWS)
+        # Línea de cierre
+        self.cell(sum(col_widths), 0, '', 'T', 1, 'L')
+        self.ln(3)
+
+
+def resumen_para_pdf(conn, date_start: str, date_end: str, date_range_str: str = None) -> dict:
+    """Resumen del período con la forma que espera exportar_reporte_pdf().
+
+    Es lo mismo que muestra la pantalla de Resumen Ejecutivo (totales desde
+    ResumenDiario, tasa vigente al final del período), para exportar sin la GUI.
+    """
+    totals = resumen_ejecutivo(conn, date_start, date_end)
+    tasa_general, tasa_fecha = tasa_vigente(conn, f"{date_end} 23:59:59")
+    total_bs = sum(data["Bs"] for data in totals.values())
+    total_usd = sum(data["USD"] for data in totals.values())
+    return {
+        "totals": totals,
+        "grand_total": ("TOTAL GENERAL (NETO)", f"Bs. {total_bs:,.2f}", f"$ {total_usd:,.2f}"),
+        "date_range_str": date_range_str or f"{date_start} al {date_end}",
+        "tasa_general": tasa_general,
+        "tasa_fecha": tasa_fecha,
+    }
+
+
+def exportar_reporte_pdf(conn, path, summary, date_start, date_end, tarea=None) -> dict:
+    """[API Pública] Escribe el reporte ejecutivo del período en 'path' sin cargarlo en memoria.
+
+    'summary' es el resumen ya mostrado (totals, grand_total, date_range_str, tasa_general,
+    tasa_fecha). El detalle se lee del cursor por bloques y cada página va al disco al
+    completarse. Se escribe en 'path.part' y se renombra al terminar: si la tarea se
+    cancela o falla, no queda un PDF a medias. 'tarea' (lector_reportes.TareaReporte)
+    recibe el avance con las páginas por segundo.
+
+    Devuelve {"paginas", "filas", "segundos", "paginas_por_segundo"}.
+    """
+    if not PDF_STREAMING_AVAILABLE:
+        raise RuntimeError("La librería 'fpdf2' no está instalada (pip install fpdf2).")
+
+    inicio = time.perf_counter()
+    total_rows = sum(contar_detalle(conn, date_start, date_end).values())
+    rates = LineaTasas.cargar(conn)
+    rate_info = f"Tasa de BCV: 1$ = Bs. {summary['tasa_general']:,.4f} (Fecha: {summary['tasa_fecha']})"
+    temp_path = f"{path}.part"
+    written = [0]
+
+    try:
+        with open(temp_path, "wb") as f:
+            pdf = ReporteEjecutivoPDF(f, "Reporte Ejecutivo de Transacciones", summary["date_range_str"], rate_info)
+
+            def on_rows(n):
+                written[0] += n
+                if tarea is None:
+                    return
+                segundos = time.perf_counter() - inicio
+                pps = pdf.page_no / segundos if segundos > 0 else 0.0
+                tarea.progress(written[0], total_rows,
+                               f"Página {pdf.page_no:,} · {pps:,.1f} páginas/s · "
+                               f"{written[0]:,} de {total_rows:,} filas")
+
+            # I. Resumen Económico
+            pdf.title_section("I. Resumen Económico del Período")
+            summary_rows = [(concepto, f"Bs. {data['Bs']:,.2f}", f"$ {data['USD']:,.2f}")
+                            for concepto, data in summary["totals"].items()]
+            summary_rows += [("", "", ""), tuple(summary["grand_total"])]
+            pdf.write_table(["CONCEPTO", "TOTAL BS.", "TOTAL USD ($)"], summary_rows, [80, 55, 55])
+
+            # II. Ventas y Devoluciones
+            pdf.title_section("\nII. Movimientos de Ventas y Devoluciones")
+            pdf.write_table(["ID Venta", "Fecha/Hora", "Estado", "Monto Total (Bs)", "Monto Total (USD)"],
+                            iter_detalle_ventas(conn, date_start, date_end),
+                            [20, 40, 30, 50, 50], on_rows=on_rows)
+
+            # III. Avances de Efectivo
+            pdf.title_section("\nIII. Movimientos de Avance de Efectivo")
+            pdf.write_table(["ID", "Fecha/Hora", "Estado", "Entregado (Bs)", "Comisión (Bs)",
+                             "Entregado (USD)", "Comisión (USD)"],
+                            iter_detalle_avances(conn, date_start, date_end, rates),
+                            [10, 30, 20, 30, 30, 30, 30], on_rows=on_rows)
+
+            # IV. Recargas Telefónicas
+            pdf.title_section("\nIV. Movimientos de Recargas Telefónicas")
+            pdf.write_table(["ID", "Fecha/Hora", "Número", "Estado", "Monto Base", "Comisión", "Total Bs."],
+                            iter_detalle_recargas(conn, date_start, date_end),
+                            [10, 35, 25, 20, 30, 25, 30], on_rows=on_rows)
+
+            pdf.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "paginas": pdf.page_no,
+        "filas": written[0],
+        "segundos": segundos,
+        "paginas_por_segundo": pdf.page_no / segundos if segundos > 0 else 0.0,
+    }
+
+
+# ===================================================================
+# --- EXPORTACIÓN DE DATOS (CSV / JSON LINES) ---
+# ===================================================================
+
+# Conjunto -> (columnas, tabla principal, alias, consulta). {rango} filtra la tabla
+# principal por el período; las columnas salen en el mismo orden que el SELECT.
+CONJUNTOS_DATOS = {
+    "ventas": (
+        ("id", "fecha", "hora", "metodo_pago", "estado", "total_venta", "monto_total_bs", "tasa_bcv"),
+        "Ventas", "",
+        """
+        SELECT id, fecha, hora, metodo_pago, estado, total_venta, monto_total_bs, tasa_bcv
+        FROM Ventas
+        WHERE {rango}
+        ORDER BY id
+        """,
+    ),
+    "venta_detalle": (
+        ("id", "venta_id", "fecha", "hora", "producto_id", "nombre", "cantidad",
+         "precio_unitario", "costo_unitario", "subtotal"),
+        "Ventas", "v",
+        """
+        SELECT d.id, d.venta_id, v.fecha, v.hora, d.producto_id, d.nombre, d.cantidad,
+               d.precio_unitario, d.costo_unitario, d.subtotal
+        FROM Ventas v
+        JOIN VentaDetalle d ON d.venta_id = v.id
+        WHERE {rango}
+        ORDER BY v.id, d.id
+        """,
+    ),
+    "avances": (
+        ("id", "fecha_hora", "metodo_pago", "estado", "monto_entregado", "comision", "monto_total", "tasa_bcv"),
+        "AvancesEfectivo", "",
+        """
+        SELECT id, fecha_hora, metodo_pago, estado, monto_entregado, comision, monto_total,
+               {tasa_avance}
+        FROM AvancesEfectivo
+        WHERE {rango}
+        ORDER BY id
+        """,
+    ),
+    "recargas": (
+        ("id", "fecha_hora", "numero", "estado", "monto_base", "comision", "monto_total", "tasa_bcv"),
+        "RecargasTelefonicas", "",
+        """
+        SELECT id, fecha_hora, numero, estado, monto_base, comision, monto_total,
+               {tasa_recarga}
+        FROM RecargasTelefonicas
+        WHERE {rango}
+        ORDER BY id
+        """,
+    ),
+    "tasas_bcv": (
+        ("id", "fecha_registro", "tasa"),
+        "TasasBCV", "",
+        """
+        SELECT id, fecha_registro, tasa
+        FROM TasasBCV
+        WHERE {rango}
+        ORDER BY id
+        """,
+    ),
+}
+
+# Formato -> extensión del archivo
+FORMATOS_DATOS = {"csv": "csv", "jsonl": "jsonl"}
+
+
+def _consulta_conjunto(conjunto: str, date_start: str, date_end: str):
+    """SQL y parámetros del conjunto para el período (fechas inclusive, 'AAAA-MM-DD').
+
+    Los id crecen con la fecha de registro, así que se recorre por id el tramo entre el
+    primer y el último id del período (que el índice de fecha da al instante) y la fecha
+    se vuelve a comprobar fila por fila con '+' (sin índice). Así SQLite entrega las filas
+    en orden sin ordenar antes todo el período en un B-tree temporal.
+    """
+    columnas, tabla, alias, sql = CONJUNTOS_DATOS[conjunto]
+    if tabla == "TasasBCV":
+        # fecha_registro es 'AAAA-MM-DD HH:MM:SS': rango semiabierto para usar el índice
+        filtro = "{c}fecha_registro >= ? AND {c}fecha_registro < date(?, '+1 day')"
+        params = (date_start, date_end)
+    elif date_start != date_end:
+        filtro, params = "{c}fecha BETWEEN ? AND ?", (date_start, date_end)
+    else:
+        filtro, params = "{c}fecha = ?", (date_start,)
+
+    prefijo = f"{alias}." if alias else ""
+    en_indice = filtro.format(c="")
+    rango = (f"{prefijo}id BETWEEN (SELECT MIN(id) FROM {tabla} WHERE {en_indice}) "
+             f"AND (SELECT MAX(id) FROM {tabla} WHERE {en_indice}) "
+             f"AND {filtro.format(c='+' + prefijo)}")
+    sql = sql.format(
+        rango=rango,
+        tasa_avance=RATE_ASOF_SQL.format(col="AvancesEfectivo.fecha_hora"),
+        tasa_recarga=RATE_ASOF_SQL.format(col="RecargasTelefonicas.fecha_hora"),
+    )
+    return columnas, sql, params * 3
+
+
+def nombre_archivo_datos(conjunto: str, formato: str, date_start: str, date_end: str,
+                         comprimir: bool = False) -> str:
+    """Nombre de archivo por defecto, p. ej. 'ventas_2024-01-01_2024-12-31.csv.gz'."""
+    return f"{conjunto}_{date_start}_{date_end}.{FORMATOS_DATOS[formato]}" + (".gz" if comprimir else "")
+
+
+def exportar_datos(conn, conjunto: str, formato: str, path: str, date_start: str, date_end: str,
+                   comprimir: bool = False, tarea=None) -> dict:
+    """[API Pública] Exporta un conjunto (ver CONJUNTOS_DATOS) del período a CSV o JSON Lines.
+
+    Las filas se leen del cursor por bloques y se escriben a medida que llegan, así que la
+    memoria no depende del tamaño del período. Con 'comprimir' la salida va en gzip. El
+    CSV lleva BOM UTF-8 para que Excel muestre bien los acentos. Igual que el PDF, se
+    escribe en 'path.part' y se renombra al terminar.
+
+    Devuelve {"filas", "bytes", "segundos"}.
+    """
+    if conjunto not in CONJUNTOS_DATOS:
+        raise ValueError(f"Conjunto de datos desconocido: {conjunto}")
+    if formato not in FORMATOS_DATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+
+    inicio = time.perf_counter()
+    columnas, sql, params = _consulta_conjunto(conjunto, date_start, date_end)
+    total_rows = None
+    if tarea is not None:
+        total_rows = conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    temp_path = f"{path}.part"
+    encoding = "utf-8-sig" if formato == "csv" else "utf-8"
+    written = 0
+
+    try:
+        if comprimir:
+            f = gzip.open(temp_path, "wt", encoding=encoding, newline="", compresslevel=6)
+        else:
+            f = open(temp_path, "w", encoding=encoding, newline="")
+        with f:
+            if formato == "csv":
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(columnas)
+                escribir = writer.writerows
+            else:
+                def escribir(filas):
+                    f.writelines(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + "\n"
+                                 for fila in filas)
+
+            while True:
+                filas = cursor.fetchmany(DETALLE_FILAS_POR_BLOQUE)
+                if not filas:
+                    break
+                escribir(filas)
+                written += len(filas)
+                if tarea is not None:
+                    tarea.progress(written, total_rows, f"{conjunto}: {written:,} de {total_rows:,} filas")
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    return {"filas": written, "bytes": os.path.getsize(path), "segundos": time.perf_counter() - inicio}
+
+
+def exportar_datos_periodo(conn, carpeta: str, formato: str, date_start: str, date_end: str,
+                           comprimir: bool = False, conjuntos=None, tarea=None) -> dict:
+    """[API Pública] Exporta varios conjuntos del período a 'carpeta', un archivo por conjunto.
+
+    Por defecto exporta todos los de CONJUNTOS_DATOS. Devuelve {ruta: estadísticas}.
+    """
+    resultados = {}
+    for conjunto in conjuntos or CONJUNTOS_DATOS:
+        path = os.path.join(carpeta, nombre_archivo_datos(conjunto, formato, date_start, date_end, comprimir))
+        resultados[path] = exportar_datos(conn, conjunto, formato, path, date_start, date_end, comprimir, tarea)
+    return resultados
@@ -0,0 +1,153 @@
+# importacion_productos.py (CARGA DE PRODUCTOS DESDE CSV, SIN GUI)
+#
+# Para cargar o actualizar muchos productos (lista de un proveedor, inventario
+# inicial) sin pasar uno por uno por "Agregar Producto". Usa las mismas reglas que
+# module_inventario: precio de compra = precio del bulto / unidades, precio de
+# venta por margen sobre la venta, stock en unidades = bultos * unidades por bulto.
+#
+# Columnas del archivo (encabezado obligatorio; separador ',', ';' o tabulador):
+#   codigo_barras, nombre, descripcion (opcional), stock_bultos, unidades_por_bulto,
+#   precio_bulto, porcentaje_ganancia
+# Se acepta coma decimal ("12,50"). La importación es todo o nada: si alguna fila
+# no es válida no se guarda ninguna y se informan todas las filas con error.
+
+import csv
+import datetime
+import sqlite3
+
+COLUMNAS_IMPORTACION = ("codigo_barras", "nombre", "descripcion", "stock_bultos",
+                        "unidades_por_bulto", "precio_bulto", "porcentaje_ganancia")
+COLUMNAS_OBLIGATORIAS = tuple(c for c in COLUMNAS_IMPORTACION if c != "descripcion")
+
+
+class ErrorImportacion(Exception):
+    """El archivo tiene filas inválidas; 'errores' es la lista de (línea, mensaje)."""
+
+    def __init__(self, errores):
+        super().__init__(f"{len(errores)} fila(s) con errores")
+        self.errores = errores
+
+
+def calcular_precios(precio_bulto: float, unidades_por_bulto: float, porcentaje_ganancia: float) -> tuple[float, float]:
+    """(precio_compra, precio_venta) por unidad, con la fórmula de margen de venta del inventario."""
+    if unidades_por_bulto <= 0:
+        raise ValueError("Las unidades por bulto deben ser mayores que cero.")
+    if porcentaje_ganancia >= 100:
+        raise ValueError("El porcentaje de ganancia debe ser menor que 100.")
+    precio_compra = precio_bulto / unidades_por_bulto
+    precio_venta = precio_compra / ((100 - porcentaje_ganancia) / 100.0)
+    return precio_compra, precio_venta
+
+
+def _numero(texto, campo):
+    try:
+        return float(str(texto).strip().replace(",", "."))
+    except ValueError:
+        raise ValueError(f"'{campo}' debe ser un número válido (valor: '{texto}').")
+
+
+def leer_productos_csv(path: str) -> list[dict]:
+    """Lee y valida el archivo. Devuelve las filas normalizadas o lanza ErrorImportacion."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        muestra = f.read(4096)
+        f.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        lector = csv.DictReader(f, dialect=dialecto)
+
+        faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in (lector.fieldnames or [])]
+        if faltantes:
+            raise ErrorImportacion([(1, f"Faltan columnas: {', '.join(faltantes)}")])
+
+        productos, errores, vistos = [], [], set()
+        for fila in lector:
+            linea = lector.line_num
+            try:
+                codigo = (fila["codigo_barras"] or "").strip()
+                nombre = (fila["nombre"] or "").strip()
+                if not codigo or not nombre:
+                    raise ValueError("'codigo_barras' y 'nombre' son obligatorios.")
+                if codigo in vistos:
+                    raise ValueError(f"Código de barras repetido en el archivo: {codigo}")
+                vistos.add(codigo)
+
+                datos = {c: _numero(fila[c], c) for c in COLUMNAS_OBLIGATORIAS[2:]}
+                if datos["stock_bultos"] < 0:
+                    raise ValueError("'stock_bultos' no puede ser negativo.")
+                if datos["porcentaje_ganancia"] < 0:
+                    raise ValueError("'porcentaje_ganancia' no puede ser negativo.")
+                precio_compra, precio_venta = calcular_precios(
+                    datos["precio_bulto"], datos["unidades_por_bulto"], datos["porcentaje_ganancia"])
+                if precio_venta <= 0:
+                    raise ValueError("El precio de venta calculado es cero o negativo.")
+            except ValueError as e:
+                errores.append((linea, str(e)))
+                continue
+
+            productos.append({
+                "codigo_barras": codigo,
+                "nombre": nombre,
+                "descripcion": (fila.get("descripcion") or "").strip(),
+                "precio_compra": precio_compra,
+                "precio_venta": precio_venta,
+                **datos,
+            })
+
+    if errores:
+        raise ErrorImportacion(errores)
+    return productos
+
+
+def importar_productos(conn, productos: list[dict], actualizar: bool = False) -> dict:
+    """[API Pública] Guarda los productos en una sola transacción (hace commit).
+
+    Los códigos nuevos se insertan. Los existentes se omiten, salvo con 'actualizar':
+    entonces se actualizan nombre, descripción y precios (como "Editar Producto") y
+    sus 'stock_bultos' se suman al stock (como "Añadir Stock").
+
+    Devuelve {"insertados", "actualizados", "omitidos"}.
+    """
+    fecha = datetime.date.today().strftime("%Y-%m-%d")
+    resultado = {"insertados": 0, "actualizados": 0, "omitidos": 0}
+    cursor = conn.cursor()
+    try:
+        for p in productos:
+            cursor.execute("SELECT id, stock_bultos FROM Productos WHERE codigo_barras = ?", (p["codigo_barras"],))
+            existente = cursor.fetchone()
+
+            if existente is None:
+                if p["stock_bultos"] <= 0:
+                    raise ValueError(f"Producto nuevo {p['codigo_barras']}: 'stock_bultos' debe ser mayor que cero.")
+                cursor.execute("""
+                    INSERT INTO Productos (codigo_barras, nombre, descripcion, precio_compra, precio_venta, stock, fecha_registro, stock_bultos, unidades_por_bulto, precio_bulto, porcentaje_ganancia)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (p["codigo_barras"], p["nombre"], p["descripcion"], p["precio_compra"], p["precio_venta"],
+                      int(p["stock_bultos"] * p["unidades_por_bulto"]), fecha,
+                      p["stock_bultos"], p["unidades_por_bulto"], p["precio_bulto"], p["porcentaje_ganancia"]))
+                resultado["insertados"] += 1
+            elif actualizar:
+                producto_id, stock_bultos = existente
+                total_bultos = (stock_bultos or 0) + p["stock_bultos"]
+                cursor.execute("""
+                    UPDATE Productos SET
+                        nombre = ?, descripcion = ?, precio_compra = ?, precio_venta = ?, stock = ?,
+                        stock_bultos = ?, unidades_por_bulto = ?, precio_bulto = ?, porcentaje_ganancia = ?
+                    WHERE id = ?
+                """, (p["nombre"], p["descripcion"], p["precio_compra"], p["precio_venta"],
+                      int(total_bultos * p["unidades_por_bulto"]), total_bultos,
+                      p["unidades_por_bulto"], p["precio_bulto"], p["porcentaje_ganancia"], producto_id))
+                resultado["actualizados"] += 1
+            else:
+                resultado["omitidos"] += 1
+        conn.commit()
+    except (sqlite3.Error, ValueError):
+        conn.rollback()
+        raise
+    return resultado
+
+
+def importar_productos_csv(conn, path: str, actualizar: bool = False) -> dict:
+    """[API Pública] Lee, valida e importa un archivo CSV de productos (ver encabezado del módulo)."""
+    return importar_productos(conn, leer_productos_csv(path), actualizar)
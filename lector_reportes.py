@@ -0,0 +1,235 @@
+# lector_reportes.py (CONSULTAS DE REPORTES EN SEGUNDO PLANO, CANCELABLES)
+#
+# Recargar un reporte, cambiar el período del resumen o exportar un PDF grande
+# corría en el hilo de Tk y la ventana dejaba de redibujarse hasta terminar.
+# Ahora esos trabajos corren en un hilo lector con su propia conexión (en WAL las
+# lecturas no esperan a las escrituras del DBExecutor, así que un reporte largo
+# tampoco demora un cobro). El resultado, el avance y las filas por bloques llegan
+# al hilo de Tk con el mismo esquema que DBExecutor (cola + after()).
+#
+# Cada trabajo pertenece a un canal ("ventas", "resumen", "exportar_pdf", ...): una
+# solicitud nueva en el mismo canal cancela la anterior y lo que esta aún no haya
+# entregado se descarta. La cancelación también interrumpe la consulta SQL en
+# curso mediante el progress handler de SQLite.
+
+import queue
+import sqlite3
+import threading
+import time
+
+# Cada cuánto el hilo de Tk revisa si hay entregas pendientes (ms)
+TK_POLL_INTERVAL_MS = 25
+
+# Intervalo mínimo entre dos avisos de avance de una misma tarea (s)
+PROGRESS_MIN_INTERVAL_S = 0.1
+
+# Cada cuántas instrucciones de SQLite se revisa si la tarea fue cancelada
+SQLITE_CANCEL_CHECK_OPCODES = 20000
+
+
+class TareaCancelada(Exception):
+    """La tarea fue cancelada o reemplazada por una solicitud más nueva."""
+
+
+class TareaReporte:
+    """Tarea en curso: la función del trabajo la usa para avisar avance y entregar filas."""
+
+    def __init__(self, lector, canal, on_success, on_error, on_progress, on_chunk):
+        self.canal = canal
+        self._lector = lector
+        self._cancelled = threading.Event()
+        self._on_success = on_success
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._on_chunk = on_chunk
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancela la tarea. Sus callbacks pendientes ya no se ejecutan."""
+        self._cancelled.set()
+
+    def check(self):
+        """Lanza TareaCancelada si la tarea fue cancelada (llamar entre pasos largos)."""
+        if self._cancelled.is_set():
+            raise TareaCancelada(self.canal)
+
+    def progress(self, actual, total=None, texto=""):
+        """Informa el avance a on_progress(actual, total, texto). Los avisos muy seguidos se omiten."""
+        self.check()
+        if self._on_progress is None:
+            return
+        ahora = time.monotonic()
+        final = total is not None and actual >= total
+        if not final and ahora - self._last_progress < PROGRESS_MIN_INTERVAL_S:
+            return
+        self._last_progress = ahora
+        self._lector._post(self, self._on_progress, (actual, total, texto))
+
+    def emit(self, filas):
+        """Entrega un bloque de filas a on_chunk(filas) en el hilo de Tk."""
+        self.check()
+        if self._on_chunk is not None and filas:
+            self._lector._post(self, self._on_chunk, (list(filas),))
+
+
+class LectorReportes:
+    """Ejecuta trabajos de solo lectura en un hilo propio, uno a la vez.
+
+    Un trabajo es una función fn(conn, tarea, *args). Al terminar se cierra la
+    transacción de lectura (commit; rollback si falla o se cancela).
+    """
+
+    def __init__(self, connect):
+        # 'connect' es una función sin argumentos que abre la conexión del hilo
+        self._connect = connect
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._by_channel = {}
+        self._lock = threading.Lock()
+        self._running = None
+        self._thread = None
+        self._tk_root = None
+
+    # -----------------------------------------------------------------
+    # Ciclo de vida
+    # -----------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="report-reader", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout=5):
+        """Cancela todo lo pendiente y detiene el hilo."""
+        if self._thread is None:
+            return
+        with self._lock:
+            tareas, self._by_channel = list(self._by_channel.values()), {}
+        for tarea in tareas:
+            tarea.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def attach_tk(self, widget):
+        """Conecta la entrega de callbacks al bucle de Tk (una sola vez por proceso)."""
+        if self._tk_root is not None:
+            return
+        self._tk_root = widget.winfo_toplevel()
+        self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+
+    # -----------------------------------------------------------------
+    # API de envío
+    # -----------------------------------------------------------------
+    def submit(self, canal, fn, *args, on_success=None, on_error=None,
+               on_progress=None, on_chunk=None) -> TareaReporte:
+        """Encola un trabajo en 'canal' y cancela el anterior del mismo canal."""
+        tarea = TareaReporte(self, canal, on_success, on_error, on_progress, on_chunk)
+        with self._lock:
+            anterior = self._by_channel.get(canal)
+            self._by_channel[canal] = tarea
+        if anterior is not None:
+            anterior.cancel()
+        self._jobs.put((tarea, fn, args))
+        return tarea
+
+    def cancel(self, canal):
+        """Cancela la tarea en curso (o en cola) del canal, si la hay."""
+        with self._lock:
+            tarea = self._by_channel.pop(canal, None)
+        if tarea is not None:
+            tarea.cancel()
+
+    def busy(self, canal) -> bool:
+        with self._lock:
+            return canal in self._by_channel
+
+    # -----------------------------------------------------------------
+    # Hilo de trabajo
+    # -----------------------------------------------------------------
+    def _run(self):
+        try:
+            conn = self._connect()
+            conn.set_progress_handler(self._interrupt_cancelled, SQLITE_CANCEL_CHECK_OPCODES)
+        except Exception as e:
+            print(f"LectorReportes: no se pudo abrir la base de datos: {e}")
+            conn = None
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            tarea, fn, args = job
+            if tarea.cancelled:
+                continue
+
+            self._running = tarea
+            try:
+                if conn is None:
+                    raise sqlite3.OperationalError("Base de datos no disponible")
+                result = fn(conn, tarea, *args)
+                tarea.check()
+                conn.commit()
+            except Exception as e:
+                if conn is not None:
+                    conn.rollback()
+                if not tarea.cancelled:
+                    self._post(tarea, tarea._on_error, (e,), final=True)
+            else:
+                self._post(tarea, tarea._on_success, (result,), final=True)
+            finally:
+                self._running = None
+
+        if conn is not None:
+            conn.close()
+
+    def _interrupt_cancelled(self):
+        # Un valor distinto de cero aborta la consulta en curso ("interrupted")
+        tarea = self._running
+        return 1 if tarea is not None and tarea.cancelled else 0
+
+    def _finish(self, tarea):
+        with self._lock:
+            if self._by_channel.get(tarea.canal) is tarea:
+                del self._by_channel[tarea.canal]
+
+    # -----------------------------------------------------------------
+    # Entrega en el hilo de Tk
+    # -----------------------------------------------------------------
+    def _post(self, tarea, callback, args, final=False):
+        if self._tk_root is None:
+            # Sin Tk (scripts, línea de comandos) se entrega desde el hilo lector
+            self._deliver(tarea, callback, args, final)
+        else:
+            self._results.put((tarea, callback, args, final))
+
+    def _deliver(self, tarea, callback, args, final):
+        if final:
+            self._finish(tarea)
+        if tarea.cancelled:
+            return
+        if callback is None:
+            if final and isinstance(args[0], Exception):
+                print(f"Error en tarea de reporte '{tarea.canal}': {args[0]}")
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error en callback de reporte '{tarea.canal}': {e}")
+
+    def _poll_tk(self):
+        while True:
+            try:
+                tarea, callback, args, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(tarea, callback, args, final)
+        try:
+            self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+        except Exception:
+            # La ventana principal ya fue destruida
+            self._tk_root = None
@@ -3,8 +3,9 @@
 import customtkinter as ctk
 from tkinter import messagebox, Toplevel, simpledialog
 import sys 
+import time
 
-from utils import verify_password, check_license_key, check_license_file, create_license_file, setup_db 
+from utils import verify_password, check_license_key, check_license_file, create_license_file, setup_db, close_db, get_db_executor 
 
 from module_inventario import InventarioModule
 from module_reportes import ReportesModule
@@ -12,6 +13,8 @@ from module_ventas import VentasModule
 from module_consulta_precio import ConsultaPrecioModule
 from module_avance_efectivo import AvanceEfectivoModule
 from module_bcv_rate import BCVRateModule 
+from servicio_tasa import get_rate_service
+from tasa_web import get_rate_fetcher
 from module_recarga_telefonica import RecargaTelefonicaModule
 from module_devolucion import DevolucionModule
 from module_exportacion_reportes import ExportacionReportesModule
@@ -241,8 +244,40 @@ class CajaMenu(MenuPageBase):
 # --- 2. CLASE PRINCIPAL DE LA APLICACIÓN (CONTROLADOR) ---
 # ===================================================================
 
+# Pantallas de la aplicación. Cada una se construye la primera vez que se muestra
+# (show_frame) o, después del primer dibujo, durante los ratos libres del bucle de Tk.
+FRAME_CLASSES = {
+    "StartPage": StartPage,
+    "AdministracionMenu": AdministracionMenu,
+    "CajaMenu": CajaMenu,
+    "InventarioModule": InventarioModule,
+    "ReportesModule": ReportesModule,
+    "VentasModule": VentasModule,
+    "ConsultaPrecioModule": ConsultaPrecioModule,
+    "AvanceEfectivoModule": AvanceEfectivoModule,
+    "BCVRateModule": BCVRateModule,
+    "RecargaTelefonicaModule": RecargaTelefonicaModule,
+    "DevolucionModule": DevolucionModule,
+    "Exportacion": ExportacionReportesModule,
+}
+
+# Orden de precarga: primero lo que usa la caja, al final las pantallas de administración.
+# Una tupla vacía desactiva la precarga (cada pantalla se construye al abrirla).
+PREWARM_ORDER = (
+    "CajaMenu", "VentasModule", "ConsultaPrecioModule", "DevolucionModule",
+    "AvanceEfectivoModule", "RecargaTelefonicaModule",
+    "AdministracionMenu", "BCVRateModule", "InventarioModule", "ReportesModule", "Exportacion",
+)
+# Espera tras el primer dibujo antes de precargar, y pausa entre una pantalla y la siguiente (ms)
+PREWARM_START_DELAY_MS = 500
+PREWARM_INTERVAL_MS = 50
+# Consulta de la tasa BCV: cada hora y, si todos los proveedores fallan, reintento a los 5 minutos (ms)
+BCV_UPDATE_INTERVAL_MS = 3600000
+BCV_RETRY_ON_FAILURE_MS = 300000
+
 class MainApplication(ctk.CTk):
     def __init__(self, *args, **kwargs):
+        self._started_at = time.perf_counter()
         super().__init__(*args, **kwargs)
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
@@ -253,12 +288,15 @@ class MainApplication(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
 
         self.admin_logged_in = False 
+        self._bcv_retry_id = None
         
         self.db_conn = setup_db() 
         if self.db_conn is None:
             messagebox.showerror("Error Crítico", "No se pudo inicializar la base de datos. Cerrando aplicación.")
             self.after(100, self.on_closing)
             return
+        # Los resultados del hilo de base de datos se entregan en este bucle de Tk
+        get_db_executor(self)
 
         self.sidebar_frame = ctk.CTkFrame(self, width=250, corner_radius=0, fg_color="#2C3E50") 
         self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
@@ -318,34 +356,61 @@ class MainApplication(ctk.CTk):
         self.main_content_frame.grid_rowconfigure(0, weight=1)
         self.main_content_frame.grid_columnconfigure(0, weight=1)
         
+        # Solo las pantallas ya construidas (ver get_frame)
         self.frames = {}
-        
-        frames_list = {
-            "StartPage": StartPage,
-            "AdministracionMenu": AdministracionMenu,
-            "CajaMenu": CajaMenu,
-            "InventarioModule": InventarioModule,
-            "ReportesModule": ReportesModule,
-            "VentasModule": VentasModule,
-            "ConsultaPrecioModule": ConsultaPrecioModule,
-            "AvanceEfectivoModule": AvanceEfectivoModule,
-            "BCVRateModule": BCVRateModule,
-            "RecargaTelefonicaModule": RecargaTelefonicaModule,
-            "DevolucionModule": DevolucionModule,
-            "Exportacion": ExportacionReportesModule,
-        }
-
-        for name, F_class in frames_list.items():
-            frame = F_class(self.main_content_frame, self) 
-            self.frames[name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self._prewarm_pending = list(PREWARM_ORDER)
 
         self.show_frame("StartPage")
         
         self.load_initial_bcv_rate() 
-        self.start_bcv_auto_update() 
-        
         self.protocol("WM_DELETE_WINDOW", self.on_closing) 
+        self.after_idle(self._on_first_paint)
+
+    def get_frame(self, page_name):
+        """Devuelve la pantalla 'page_name', construyéndola si todavía no existe."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = FRAME_CLASSES[page_name](self.main_content_frame, self)
+            self.frames[page_name] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+            # Una pantalla recién creada queda encima: se baja hasta que se muestre
+            frame.lower()
+        return frame
+
+    def _on_first_paint(self):
+        print(f"Arranque: primera pantalla lista en {(time.perf_counter() - self._started_at) * 1000:.0f} ms")
+        # La consulta de la tasa importa requests/bs4 en su hilo: mejor después de pintar
+        self.start_bcv_auto_update()
+        if self._prewarm_pending:
+            self.after(PREWARM_START_DELAY_MS, self._prewarm_next)
+
+    def _prewarm_next(self):
+        """Construye una pantalla pendiente por vez, dejando que Tk atienda eventos entre una y otra."""
+        while self._prewarm_pending:
+            page_name = self._prewarm_pending.pop(0)
+            if page_name in self.frames:
+                continue
+            # La pantalla se construye oculta mientras el usuario trabaja: el foco (un
+            # escaneo, una clave a medio escribir) no se debe ir a sus campos.
+            # Cada pantalla toma el foco en show_frame (reset_focus/focus_barcode_entry).
+            foco = self._focused_widget()
+            try:
+                self.get_frame(page_name)
+            except Exception as e:
+                # Se reintentará al abrirla desde el menú
+                print(f"Precarga de '{page_name}' omitida: {e}")
+            if foco is not None and self._focused_widget() is not foco:
+                foco.focus_set()
+            self.after(PREWARM_INTERVAL_MS, self._prewarm_next)
+            return
+        print(f"Arranque: todas las pantallas listas en {(time.perf_counter() - self._started_at) * 1000:.0f} ms")
+
+    def _focused_widget(self):
+        try:
+            return self.focus_get()
+        except KeyError:
+            # focus_get() falla si el foco está en un widget interno de Tk (p. ej. un menú desplegable)
+            return None
 
     def on_closing(self):
         ventas_module = self.frames.get("VentasModule")
@@ -353,9 +418,11 @@ class MainApplication(ctk.CTk):
         if ventas_module and hasattr(ventas_module, 'handle_app_close_event'):
             if ventas_module.handle_app_close_event():
                 self.destroy()
+                close_db()
             return
         
         self.destroy()
+        close_db()
 
     def show_frame(self, page_name):
         current_frame_name = self.get_current_frame_name()
@@ -369,7 +436,7 @@ class MainApplication(ctk.CTk):
                     "No puede salir del módulo de Ventas con productos en el carrito.\n"
                     "Debe finalizar la venta o **CANCELAR COMPRA** primero."
                 )
-                self.frames["VentasModule"].tkraise() 
+                ventas_module.tkraise() 
                 return 
 
         if page_name == "VentasModule":
@@ -390,7 +457,7 @@ class MainApplication(ctk.CTk):
         if is_leaving_admin and self.admin_logged_in:
             self.admin_logged_in = False
 
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
         
         if hasattr(frame, 'reset_focus'):
@@ -426,37 +493,45 @@ class MainApplication(ctk.CTk):
         else:
             self.bcv_rate_display.configure(text="Bs. N/D")
 
-    def get_latest_rate_from_module(self):
-        bcv_module = self.frames.get("BCVRateModule")
-        if bcv_module and hasattr(bcv_module, 'get_latest_rate_from_db'): 
-            return bcv_module.get_latest_rate_from_db() 
-        return None
-
     def refresh_bcv_rate_from_db(self):
-        latest_rate = self.get_latest_rate_from_module()
-        self.update_sidebar_bcv_rate(latest_rate)
+        # Si la tasa cambió, el servicio notifica al sidebar (y a los demás suscriptores)
+        get_rate_service().refresh_from_db()
         
     def load_initial_bcv_rate(self):
-        self.refresh_bcv_rate_from_db()
+        rate_service = get_rate_service()
+        rate_service.subscribe(self.update_sidebar_bcv_rate)
+        self.update_sidebar_bcv_rate(rate_service.get())
 
     def start_bcv_auto_update(self):
         self.update_bcv_rate()
-        
-        UPDATE_INTERVAL_MS = 3600000 
-        self.after(UPDATE_INTERVAL_MS, self.start_bcv_auto_update)
+        self.after(BCV_UPDATE_INTERVAL_MS, self.start_bcv_auto_update)
 
     def update_bcv_rate(self):
-        tasa_scraped = BCVRateModule.get_current_rate_api()
-        
+        # La consulta web corre en segundo plano; la caja sigue operativa aunque el BCV no responda
+        get_rate_fetcher(self).request(self._on_scheduled_bcv_rate)
+
+    def _on_scheduled_bcv_rate(self, tasa_scraped):
         if tasa_scraped is not None:
-            bcv_module = self.frames.get("BCVRateModule")
-            if bcv_module:
-                bcv_module.check_and_update_rate_scheduled(tasa_scraped)
+            # Se compara y guarda desde el servicio: la pantalla de Tasa BCV solo se
+            # refresca si ya fue construida
+            get_rate_service().save_if_changed(tasa_scraped, on_done=self._refresh_bcv_frame)
             
             self.refresh_bcv_rate_from_db()
             
         else:
             self.refresh_bcv_rate_from_db() 
+            # Todos los proveedores fallaron: se reintenta antes de la próxima hora
+            if self._bcv_retry_id is None:
+                self._bcv_retry_id = self.after(BCV_RETRY_ON_FAILURE_MS, self._retry_bcv_rate)
+
+    def _refresh_bcv_frame(self, tasa):
+        bcv_module = self.frames.get("BCVRateModule")
+        if bcv_module is not None:
+            bcv_module.show_scheduled_rate(tasa)
+
+    def _retry_bcv_rate(self):
+        self._bcv_retry_id = None
+        self.update_bcv_rate()
 
 
 # ⭐ PUNTO DE ENTRADA MODIFICADO
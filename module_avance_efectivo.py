@@ -3,7 +3,7 @@
 import customtkinter as ctk
 import datetime
 import sqlite3
-from utils import setup_db, DB_NAME 
+from utils import get_connection, get_db_executor, get_timestamp_columns, DB_NAME 
 from tkinter import Toplevel # Necesario para asegurar la correcta herencia de Toplevel
 
 # ===================================================================
@@ -167,7 +167,8 @@ class AvanceEfectivoModule(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self.conn = setup_db()
+        self.conn = get_connection()
+        self.db = get_db_executor(self)
         
         self.create_widgets()
 
@@ -285,7 +286,7 @@ class AvanceEfectivoModule(ctk.CTkFrame):
         if monto_entregado is None:
             return
 
-        fecha_hora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        fecha_hora, fecha, fecha_epoch = get_timestamp_columns(datetime.datetime.now())
         modal_master = self.controller 
 
         # --- Confirmación (MODAL MODERNIZADO) ---
@@ -305,14 +306,13 @@ class AvanceEfectivoModule(ctk.CTkFrame):
             if not CustomAskYesNoDialog.show(modal_master, "Confirmar Cancelación", confirm_msg):
                 return
 
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO AvancesEfectivo (monto_entregado, comision, monto_total, metodo_pago, fecha_hora, estado)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (monto_entregado, comision, monto_total, metodo_pago, fecha_hora, estado))
-            self.conn.commit()
+        def insert_job(conn):
+            conn.execute("""
+                INSERT INTO AvancesEfectivo (monto_entregado, comision, monto_total, metodo_pago, fecha_hora, estado, fecha, fecha_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (monto_entregado, comision, monto_total, metodo_pago, fecha_hora, estado, fecha, fecha_epoch))
 
+        def on_success(_):
             # --- Generar Reporte de Confirmación ---
             reporte_resumido = (
                 f"ESTADO: {estado}\n"
@@ -328,11 +328,13 @@ class AvanceEfectivoModule(ctk.CTkFrame):
                                 'info')
             self._reset_fields()
 
-        except Exception as e:
+        def on_error(e):
             # ⭐ MODAL DE ERROR MODERNIZADO
-            self.conn.rollback()
             CustomMessageDialog(modal_master, "Error DB", f"Error al registrar el avance: {e}", 'error')
 
+        # El INSERT corre en el hilo de DB; el reporte se muestra al confirmarse
+        self.db.submit(insert_job, on_success=on_success, on_error=on_error)
+
     def concretar_avance(self):
         self._register_advance('Concretado')
 
@@ -1,15 +1,10 @@
 import customtkinter as ctk
 import sqlite3
-import datetime
-import requests
-from bs4 import BeautifulSoup
 from tkinter import ttk, messagebox 
-from utils import setup_db, DB_NAME 
-import urllib3 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning) 
-
-# URL Oficial del BCV
-BCV_RATE_URL = "https://www.bcv.org.ve/" 
+from utils import get_connection, DB_NAME 
+from servicio_tasa import get_rate_service
+from tasa_web import fetch_bcv_rate, get_rate_fetcher
+from proveedores_tasa import get_rate_pipeline
 
 # --- ESTILOS DE FUENTE Y COLORES ---
 FONT_SIZE_ACCESSIBLE = 18 
@@ -23,7 +18,8 @@ class BCVRateModule(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller # Controlador MainApplication
-        self.conn = setup_db()
+        self.conn = get_connection()
+        self.rate_fetcher = get_rate_fetcher(self)
         self.current_automatic_rate = None
         
         self.button_font = ctk.CTkFont(size=18, weight="bold")
@@ -149,8 +145,6 @@ class BCVRateModule(ctk.CTkFrame):
         
         self.rate_tree.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
         vsb.grid(row=1, column=1, sticky='ns', pady=(0, 10))
-        
-        self.rate_entry.focus_set()
 
 
     # ===================================================================
@@ -161,34 +155,12 @@ class BCVRateModule(ctk.CTkFrame):
 
     @staticmethod
     def get_current_rate_api():
-        """[API Pública] Obtiene la tasa de cambio actual del BCV desde la web."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        try:
-            response = requests.get(BCV_RATE_URL, headers=headers, timeout=10, verify=False)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            rate_container = soup.find('div', id='dolar') 
+        """[API Pública] Obtiene la tasa de cambio actual del BCV desde la web.
 
-            if rate_container:
-                rate_tag = rate_container.find('strong')
-
-                if rate_tag:
-                    rate_text = rate_tag.text.strip().replace(',', '.')
-                    tasa = float(rate_text)
-                    return tasa
-                return None
-            return None
-
-        except requests.exceptions.RequestException as e:
-            print(f"BCV API ERROR: No se pudo conectar/obtener la tasa. {e}")
-            return None
-        except ValueError:
-            print("BCV API ERROR: El valor extraído no es un número válido.")
-            return None
+        Bloquea hasta que responde la página: desde la interfaz se usa
+        get_rate_fetcher().request(), que consulta en segundo plano.
+        """
+        return fetch_bcv_rate()
 
     # ⭐ FUNCIÓN CLAVE: Ahora es pública para que main_app la pueda consultar
     def get_latest_rate_from_db(self):
@@ -204,10 +176,6 @@ class BCVRateModule(ctk.CTkFrame):
             print(f"Error al obtener la última tasa de la DB: {e}")
             return None
             
-    # Función para uso interno del módulo (comparación)
-    def _get_latest_db_rate(self):
-        return self.get_latest_rate_from_db()
-
 
     # ===================================================================
     # --- MÉTODOS PARA ACTUALIZACIÓN PROGRAMADA Y UI (MODIFICADO) ---
@@ -224,93 +192,61 @@ class BCVRateModule(ctk.CTkFrame):
         # Color rojo oscuro para error
         self.auto_rate_label.configure(text="Error al obtener tasa.", text_color="#D35400")
     
-    def check_and_update_rate_scheduled(self, new_tasa: float):
+    def show_scheduled_rate(self, tasa):
         """
-        Llamado por el scheduler. Compara la nueva tasa con la última guardada.
-        Si hay un cambio, actualiza la UI y guarda la tasa (genera reporte).
+        Llamado por el scheduler después de comparar y, si cambió, guardar la tasa
+        (ver ServicioTasaBCV.save_if_changed). Solo refresca la pantalla.
         """
-        
-        latest_db_rate = self._get_latest_db_rate()
-        
-        should_save = True
-        
-        if latest_db_rate is not None:
-            # Comparamos si la diferencia absoluta es menor a una tolerancia pequeña (para floats)
-            if abs(new_tasa - latest_db_rate) < 0.000001:
-                should_save = False
-            else:
-                should_save = True
-        
-        # Siempre actualizamos el display dentro del módulo con el valor raspado
-        self._update_ui_display(new_tasa)
-        
-        # Guarda solo si hubo un cambio (genera reporte de actualización)
-        if should_save:
-            print(f"BCV Auto Update: Tasa cambiada de {latest_db_rate} a {new_tasa}. Guardando nuevo registro.")
-            # La función _save_rate_to_db ahora notifica al controlador para que actualice el sidebar
-            self._save_rate_to_db(new_tasa, "Web (BCV Auto)", silent=True)
-        else:
-            print(f"BCV Auto Update: Tasa sin cambio ({new_tasa}). No se generó nuevo registro (reporte).")
+        self._update_ui_display(tasa)
+        self.load_historical_rates()
 
     # ===================================================================
     # --- FUNCIONES DE BOTÓN (SE MANTIENEN IGUAL) ---
     # ===================================================================
     
-    def fetch_automatic_rate(self):
+    def fetch_automatic_rate(self, on_rate=None):
         """
-        [Botón] Obtiene la tasa usando la API y actualiza la UI, mostrando modal si hay error.
+        [Botón] Obtiene la tasa en segundo plano y actualiza la UI, mostrando modal si hay error.
+        on_rate(tasa) se llama en el hilo de Tk solo si la consulta tuvo éxito.
         """
         self.auto_rate_label.configure(text="Cargando...", text_color="#F39C12")
-        self.update_idletasks()
-        
-        tasa = self.get_current_rate_api() # Llama al @staticmethod
 
-        if tasa is not None:
-            self._update_ui_display(tasa)
-            return tasa
-        else:
-            self._handle_api_error_ui()
-            messagebox.showerror("Error BCV", "Fallo al obtener la tasa oficial. Revise la conexión o el HTML del BCV.")
-            return None
+        def on_done(tasa):
+            if tasa is not None:
+                self._update_ui_display(tasa)
+                if on_rate is not None:
+                    on_rate(tasa)
+            else:
+                self._handle_api_error_ui()
+                messagebox.showerror("Error BCV", "Fallo al obtener la tasa oficial. Revise la conexión o el HTML del BCV.")
+
+        self.rate_fetcher.request(on_done)
         
     def fetch_and_save_automatic_rate(self):
         """[Botón] Obtiene la tasa de la web usando la API y la guarda en la base de datos."""
-        tasa = self.fetch_automatic_rate()
-        if tasa is not None:
-            self._save_rate_to_db(tasa, "Web (BCV Manual)", silent=False) 
+        def save(tasa):
+            # Si respondió un proveedor de respaldo, el mensaje lo indica
+            proveedor = get_rate_pipeline().ultimo_proveedor or "BCV"
+            source = "Web (BCV Manual)" if proveedor == "BCV" else f"Respaldo: {proveedor}"
+            self._save_rate_to_db(tasa, source)
+
+        self.fetch_automatic_rate(on_rate=save)
 
     # ===================================================================
     # --- FUNCIONES DE BASE DE DATOS (LÓGICA INTACTA) ---
     # ===================================================================
     
-    def _save_rate_to_db(self, tasa: float, source: str, silent=False):
-        """Guarda la tasa de cambio en la base de datos y notifica al controlador."""
-        try:
-            fecha_registro = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor = self.conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO TasasBCV (tasa, fecha_registro)
-                VALUES (?, ?)
-            """, (tasa, fecha_registro))
-            
-            self.conn.commit()
-            
-            # ⭐ NOTIFICACIÓN AL CONTROLADOR (LÓGICA INTACTA)
-            if self.controller and hasattr(self.controller, 'refresh_bcv_rate_from_db'):
-                self.controller.refresh_bcv_rate_from_db()
-
-            if not silent: 
-                messagebox.showinfo("Éxito", f"Tasa de cambio guardada ({source}): 1$ = Bs. {tasa:,.4f}")
-            
+    def _save_rate_to_db(self, tasa: float, source: str):
+        """Guarda la tasa de cambio (hilo de DB); el servicio la publica al confirmarse."""
+        def on_success(_):
+            # ⭐ NOTIFICACIÓN: sidebar, totales y consulta de precio están suscritos al servicio
+            messagebox.showinfo("Éxito", f"Tasa de cambio guardada ({source}): 1$ = Bs. {tasa:,.4f}")
             self.load_historical_rates()
-            
-        except Exception as e:
-            self.conn.rollback()
-            if silent:
-                print(f"ERROR DB [Auto Update]: Error al guardar la tasa: {e}")
-            else:
-                messagebox.showerror("Error DB", f"Error al guardar la tasa: {e}")
+
+        def on_error(e):
+            messagebox.showerror("Error DB", f"Error al guardar la tasa: {e}")
+
+        get_rate_service().save(tasa, on_success=on_success, on_error=on_error)
                 
     def save_manual_rate(self):
         """Procesa y guarda la tasa ingresada manualmente."""
@@ -327,7 +263,7 @@ class BCVRateModule(ctk.CTkFrame):
                 return
             
             # La llamada a _save_rate_to_db manejará la notificación al controlador
-            self._save_rate_to_db(tasa, "Manual", silent=False)
+            self._save_rate_to_db(tasa, "Manual")
             self.rate_entry.delete(0, ctk.END)
             
         except ValueError:
@@ -2,31 +2,46 @@
 
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
-from utils import setup_db, DB_NAME 
+from utils import get_connection, DB_NAME 
+from catalogo import get_catalog
+from servicio_tasa import get_rate_service
 
 class ConsultaPrecioModule(ctk.CTkFrame):
     
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self.conn = setup_db()
+        self.conn = get_connection()
+        self.catalog = get_catalog()
+        self.rate_service = get_rate_service()
+        # Precio en USD del producto mostrado (None si no hay producto en pantalla)
+        self.current_price_usd = None
         self.create_widgets()
-        self.focus_barcode_entry() 
+        self.rate_service.subscribe(self._on_rate_changed)
 
     # =====================================================================================
-    # ⭐ MÉTODO: OBTENER TASA BCV (Lógica inalterada)
+    # ⭐ MÉTODO: PRECIO EN BS (la tasa viene de servicio_tasa, sin consultar la DB)
     # =====================================================================================
-    def _get_bcv_rate(self) -> float:
-        """Obtiene la última tasa BCV registrada en la base de datos."""
+    def _render_bs_price(self):
+        """Dibuja el precio en Bs. del producto mostrado con la tasa vigente."""
+        tasa_bcv = self.rate_service.get(1.0)
+        precio_bs = self.current_price_usd * tasa_bcv
+        
+        formatted_bs = "N/A"
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
-            result = cursor.fetchone()
-            return result[0] if result else 1.0 
-        except sqlite3.Error as e:
-            print(f"Error DB al obtener tasa BCV: {e}")
-            return 1.0
+            formatted_bs_str = "{:,.2f}".format(precio_bs)
+            formatted_bs = formatted_bs_str.replace(",", "_TEMP_").replace(".", ",").replace("_TEMP_", ".")
+        except:
+            formatted_bs = f"{precio_bs:.2f}"
+        
+        self.precio_bs_label.configure(text=f"Bs. {formatted_bs}", text_color="#F87171")
+        
+        if tasa_bcv == 1.0:
+            self.precio_bs_label.configure(text="Bs. N/A (Tasa no disponible)", text_color="#FFD700")
+
+    def _on_rate_changed(self, tasa):
+        if self.current_price_usd is not None:
+            self._render_bs_price()
 
     def create_widgets(self):
         # Configuración del Grid principal para ser completamente responsive
@@ -108,6 +123,7 @@ class ConsultaPrecioModule(ctk.CTkFrame):
         self.after(0, self.barcode_entry.focus_set)
         
     def reset_display(self, message="ESPERANDO CÓDIGO..."):
+        self.current_price_usd = None
         self.nombre_label.configure(text=message, text_color="#FFFFFF")
         self.precio_label.configure(text="$0.00", text_color="#10B981")
         self.precio_bs_label.configure(text="Bs. 0.00", text_color="#F87171") 
@@ -127,31 +143,18 @@ class ConsultaPrecioModule(ctk.CTkFrame):
         self.focus_barcode_entry()
 
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT nombre, precio_venta FROM Productos WHERE codigo_barras = ?", (barcode,))
-            data = cursor.fetchone()
+            product = self.catalog.get(barcode)
 
-            if data:
-                nombre, precio_venta = data
-                
-                tasa_bcv = self._get_bcv_rate()
-                precio_bs = precio_venta * tasa_bcv
-                
-                formatted_bs = "N/A"
-                try:
-                    formatted_bs_str = "{:,.2f}".format(precio_bs)
-                    formatted_bs = formatted_bs_str.replace(",", "_TEMP_").replace(".", ",").replace("_TEMP_", ".")
-                except:
-                    formatted_bs = f"{precio_bs:.2f}"
+            if product is not None:
+                nombre, precio_venta = product.nombre, product.precio_venta
                 
                 self.nombre_label.configure(text=nombre, text_color="#FFFFFF")
                 self.precio_label.configure(text=f"${precio_venta:.2f}", text_color="#10B981")
-                self.precio_bs_label.configure(text=f"Bs. {formatted_bs}", text_color="#F87171")
-                
-                if tasa_bcv == 1.0:
-                    self.precio_bs_label.configure(text="Bs. N/A (Tasa no disponible)", text_color="#FFD700")
+                self.current_price_usd = precio_venta
+                self._render_bs_price()
 
             else:
+                self.current_price_usd = None
                 self.nombre_label.configure(text=f"¡PRODUCTO NO ENCONTRADO! ({barcode})", text_color="#EF4444") 
                 self.precio_label.configure(text="N/D", text_color="#EF4444")
                 self.precio_bs_label.configure(text="N/D", text_color="#EF4444") 
@@ -3,12 +3,58 @@
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog, ttk 
 import sqlite3
-import datetime
-import json
 import re
 
 # Importamos las utilidades
-from utils import setup_db, DB_NAME, verify_password 
+from utils import get_connection, get_db_executor, DB_NAME, verify_password, insert_sale_record 
+from catalogo import get_catalog
+from servicio_tasa import get_rate_service
+from carrito import CarritoModel, patch_cart_tree
+
+# --- TRABAJO DE BASE DE DATOS (se ejecuta en el hilo de DBExecutor) ---
+def _process_return_job(conn, return_items, total_devolucion, metodo_reembolso):
+    """Suma las unidades devueltas al inventario y registra la 'Devolucion'."""
+    cursor = conn.cursor()
+    return_details = []
+    
+    # --- LÓGICA DE SUMA AL INVENTARIO (INVERSA A VENTA) ---
+    for item_id, item_data in return_items:
+        cantidad_devuelta = item_data['cantidad']
+        
+        cursor.execute("SELECT nombre, stock, stock_bultos, unidades_por_bulto, precio_compra FROM Productos WHERE id = ?", (item_id,))
+        result = cursor.fetchone()
+        
+        if not result: raise Exception(f"Producto ID {item_id} no encontrado en DB.")
+        nombre, stock_actual, stock_bultos_actual, unidades_por_bulto, precio_compra = result
+        
+        # Aumentar stock de unidades
+        nuevo_stock = stock_actual + cantidad_devuelta
+        
+        # Aumentar stock de bultos (si aplica)
+        if unidades_por_bulto and unidades_por_bulto > 0:
+            aumento_bulto = cantidad_devuelta / unidades_por_bulto
+            nuevo_stock_bulto = stock_bultos_actual + aumento_bulto
+            cursor.execute(
+                "UPDATE Productos SET stock = ?, stock_bultos = ? WHERE id = ?", 
+                (nuevo_stock, nuevo_stock_bulto, item_id)
+            )
+        else:
+            cursor.execute(
+                "UPDATE Productos SET stock = ? WHERE id = ?", 
+                (nuevo_stock, item_id)
+            )
+        
+        return_details.append({
+            'id': item_id, 'nombre': nombre, 'cantidad': cantidad_devuelta,
+            'precio_u': item_data['precio'], 'costo_u': precio_compra,
+            'subtotal': item_data['precio'] * item_data['cantidad']
+        })
+    # ------------------------------------------------------------------
+    
+    # Registrar la transacción como "Devolucion"
+    insert_sale_record(conn, return_details, total_devolucion, metodo_reembolso, "Devolucion")
+    return total_devolucion
+
 
 # --- CLASE: VENTANA MODAL DE AUTENTICACIÓN (DISEÑO SOBRIO) ---
 # Reutilizamos la clase del módulo de ventas para consistencia.
@@ -91,25 +137,23 @@ class DevolucionModule(ctk.CTkFrame):
         super().__init__(parent) 
         self.controller = controller
         
-        self.conn = setup_db()
-        self.return_cart = {} # Carrito de productos a devolver
+        self.conn = get_connection()
+        self.db = get_db_executor(self)
+        self.catalog = get_catalog()
+        self.rate_service = get_rate_service()
+        self.return_cart = CarritoModel() # Carrito de productos a devolver
         self.final_return_total = 0.0 
+        # Mientras la devolución se registra en segundo plano el carrito queda bloqueado
+        self.return_in_progress = False
         
         self.create_widgets()
+        # Cada cambio del carrito parchea solo su fila del Treeview
+        self.return_cart.add_listener(lambda evento, product_id, item: patch_cart_tree(self.return_tree, evento, product_id, item))
         self.update_totals() 
-        self.focus_barcode_entry()
+        # Los totales en Bs. solo se recalculan cuando cambia la tasa
+        self.rate_service.subscribe(lambda tasa: self.update_totals())
 
     # MÉTODOS DE UTILIDAD
-    def _get_bcv_rate(self) -> float:
-        """Obtiene la última tasa BCV registrada, usando la misma lógica que Ventas."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
-            result = cursor.fetchone()
-            return result[0] if result else 1.0 
-        except sqlite3.Error as e:
-            print(f"Error DB al obtener tasa BCV: {e}")
-            return 1.0
 
     def focus_barcode_entry(self):
         """Establece el foco en la entrada de código de barras."""
@@ -128,10 +172,10 @@ class DevolucionModule(ctk.CTkFrame):
 
     def update_totals(self):
         """Calcula y actualiza el total a devolver en USD y Bs."""
-        subtotal_usd = sum(item['precio'] * item['cantidad'] for item in self.return_cart.values())
+        subtotal_usd = self.return_cart.subtotal
         self.final_return_total = subtotal_usd 
         
-        tasa_bcv = self._get_bcv_rate()
+        tasa_bcv = self.rate_service.get(1.0)
         total_bs_to_return = self.final_return_total * tasa_bcv
         
         # Actualización de Labels
@@ -332,9 +376,7 @@ class DevolucionModule(ctk.CTkFrame):
     
     def clear_return_cart(self):
         """Limpia el carrito de devolución y actualiza totales."""
-        self.return_cart = {}
-        for item in self.return_tree.get_children():
-            self.return_tree.delete(item)
+        self.return_cart.clear()
         self.update_totals()
         self.return_method_var.set(self.return_methods[0])
         self.focus_barcode_entry()
@@ -345,6 +387,8 @@ class DevolucionModule(ctk.CTkFrame):
 
     def add_product_to_return_cart(self):
         """Busca el producto por código de barras y lo agrega al carrito de devolución."""
+        if self.return_in_progress:
+            return
         barcode = self.barcode_entry.get().strip()
         self.barcode_entry.delete(0, ctk.END) 
         
@@ -353,28 +397,18 @@ class DevolucionModule(ctk.CTkFrame):
             return
 
         try:
-            cursor = self.conn.cursor()
-            # Solo necesitamos ID, nombre y precio de venta
-            cursor.execute(
-                "SELECT id, nombre, precio_venta FROM Productos WHERE codigo_barras = ?", 
-                (barcode,)
-            )
-            data = cursor.fetchone()
+            # Solo necesitamos ID, nombre y precio de venta (desde la caché del catálogo)
+            product = self.catalog.get(barcode)
 
-            if not data:
+            if product is None:
                 messagebox.showerror("Producto No Encontrado", f"Producto con código '{barcode}' no existe en el inventario.")
                 self.focus_barcode_entry()
                 return
             
-            product_id, name, price = data
+            product_id, name, price = product.id, product.nombre, product.precio_venta
             
             # Siempre agregamos 1 unidad por escaneo. Si quiere más, debe escanear más veces
-            if product_id in self.return_cart:
-                self.return_cart[product_id]['cantidad'] += 1
-            else:
-                self.return_cart[product_id] = {'nombre': name, 'precio': price, 'cantidad': 1, 'id_db': product_id}
-                
-            self.update_return_display()
+            self.return_cart.add(product_id, name, price)
             self.update_totals() 
 
         except sqlite3.Error as e:
@@ -384,35 +418,25 @@ class DevolucionModule(ctk.CTkFrame):
             
         self.focus_barcode_entry()
 
-    def update_return_display(self):
-        """Actualiza la visualización del Treeview con el carrito de devolución."""
-        for item in self.return_tree.get_children():
-            self.return_tree.delete(item)
-        
-        for id_db, item in self.return_cart.items():
-            subtotal = item['precio'] * item['cantidad']
-            self.return_tree.insert('', 'end', 
-                                  iid=id_db, 
-                                  values=(item['id_db'], item['nombre'], f"{item['precio']:.2f}", item['cantidad'], f"{subtotal:.2f}"),
-                                  tags=(id_db,))
-
-
     def remove_item_from_return_cart(self):
         """Remueve un producto seleccionado del carrito (Requiere autenticación)."""
+        if self.return_in_progress:
+            return
         selected_item = self.return_tree.focus()
         if not selected_item:
             messagebox.showwarning("Selección Requerida", "Debe seleccionar un producto de la devolución para remover.")
             return
 
         def remove_authenticated():
+            if self.return_in_progress:
+                return
             try:
                 # El valor [0] es el 'ID_Producto'
                 item_id = int(self.return_tree.item(selected_item, 'values')[0]) 
                 if item_id in self.return_cart:
                     nombre_producto = self.return_cart[item_id]['nombre']
                     if messagebox.askyesno("Confirmar", f"¿Desea eliminar TODAS las unidades de '{nombre_producto}' de la lista de devolución?"):
-                        del self.return_cart[item_id]
-                        self.update_return_display()
+                        self.return_cart.remove(item_id)
                         self.update_totals() 
                         messagebox.showinfo("Producto Removido", f"Producto '{nombre_producto}' removido de la devolución.")
                     else:
@@ -431,6 +455,8 @@ class DevolucionModule(ctk.CTkFrame):
 
     def confirm_return(self):
         """Confirma la devolución, actualiza el inventario y registra la transacción."""
+        if self.return_in_progress:
+            return
         if not self.return_cart:
             messagebox.showwarning("Devolución Vacía", "El carrito de devolución está vacío. Agregue productos para concretar.")
             return
@@ -446,69 +472,26 @@ class DevolucionModule(ctk.CTkFrame):
             return 
 
         def process_return():
-            """Función ejecutada tras la autenticación."""
-            try:
-                cursor = self.conn.cursor()
-                return_details = []
-                
-                # --- LÓGICA DE SUMA AL INVENTARIO (INVERSA A VENTA) ---
-                for item_id, item_data in self.return_cart.items():
-                    cantidad_devuelta = item_data['cantidad']
-                    
-                    cursor.execute("SELECT nombre, stock, stock_bultos, unidades_por_bulto FROM Productos WHERE id = ?", (item_id,))
-                    result = cursor.fetchone()
-                    
-                    if not result: raise Exception(f"Producto ID {item_id} no encontrado en DB.")
-                    nombre, stock_actual, stock_bultos_actual, unidades_por_bulto = result
-                    
-                    # Aumentar stock de unidades
-                    nuevo_stock = stock_actual + cantidad_devuelta
-                    
-                    # Aumentar stock de bultos (si aplica)
-                    if unidades_por_bulto and unidades_por_bulto > 0:
-                        aumento_bulto = cantidad_devuelta / unidades_por_bulto
-                        nuevo_stock_bulto = stock_bultos_actual + aumento_bulto
-                        cursor.execute(
-                            "UPDATE Productos SET stock = ?, stock_bultos = ? WHERE id = ?", 
-                            (nuevo_stock, nuevo_stock_bulto, item_id)
-                        )
-                    else:
-                        cursor.execute(
-                            "UPDATE Productos SET stock = ? WHERE id = ?", 
-                            (nuevo_stock, item_id)
-                        )
-                    
-                    return_details.append({
-                        'id': item_id, 'nombre': nombre, 'cantidad': cantidad_devuelta,
-                        'precio_u': item_data['precio'], 'subtotal': item_data['precio'] * item_data['cantidad']
-                    })
-                # ------------------------------------------------------------------
-                
-                total_devolucion = self.final_return_total
-                estado = "Devolucion" # Nuevo estado para el registro
-                detalle_json = json.dumps(return_details) 
-                tasa_bcv = self._get_bcv_rate()
-                monto_total_bs = total_devolucion * tasa_bcv
-                now = datetime.datetime.now()
-                fecha_str = now.strftime("%Y-%m-%d")
-                hora_str = now.strftime("%H:%M:%S")
-
-                # Registrar la transacción como "Devolucion"
-                cursor.execute("""
-                    INSERT INTO Ventas (
-                        fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle, metodo_pago, estado
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (fecha_str, hora_str, total_devolucion, monto_total_bs, tasa_bcv, detalle_json, metodo_reembolso, estado))
-                
-                self.conn.commit()
-                
+            """Función ejecutada tras la autenticación (el registro corre en el hilo de DB)."""
+            if self.return_in_progress or not self.return_cart:
+                return
+
+            def on_success(total_devolucion):
+                self.return_in_progress = False
                 messagebox.showinfo("Devolución Exitosa", f"Devolución de ${total_devolucion:.2f} concretada. Inventario actualizado. Reembolso: {metodo_reembolso}.")
                 self.clear_return_cart()
-                
-            except Exception as e:
-                self.conn.rollback()
-                messagebox.showerror("Error DB", f"No se pudo registrar la devolución. Error: {e}")
+
+            def on_error(error):
+                self.return_in_progress = False
+                messagebox.showerror("Error DB", f"No se pudo registrar la devolución. Error: {error}")
+
+            self.return_in_progress = True
+            self.db.submit(
+                _process_return_job,
+                [(item_id, dict(item_data)) for item_id, item_data in self.return_cart.items()],
+                self.final_return_total, metodo_reembolso,
+                on_success=on_success, on_error=on_error
+            )
 
         # La devolución debe ser autorizada por un administrador
         DevolucionAdminAuthWindow(self.master.master, process_return)
@@ -516,6 +499,8 @@ class DevolucionModule(ctk.CTkFrame):
 
     def cancel_return_confirm(self):
         """Confirma la cancelación de la devolución actual."""
+        if self.return_in_progress:
+            return
         if not self.return_cart:
             messagebox.showwarning("Devolución Vacía", "El carrito de devolución ya está vacío.")
             return
@@ -525,6 +510,6 @@ class DevolucionModule(ctk.CTkFrame):
             f"¿Está seguro que desea **CANCELAR** la devolución actual de ${self.final_return_total:.2f}?\n"
         )
 
-        if confirm:
+        if confirm and not self.return_in_progress:
             self.clear_return_cart()
             messagebox.showinfo("Cancelado", "Devolución cancelada y carrito vaciado.")
\ No newline at end of file
@@ -4,53 +4,18 @@ from tkinter import messagebox, ttk, Toplevel, filedialog
 import sqlite3
 import datetime
 import calendar 
+import importlib.util
 import os 
 
-# Importación del calendario
-try:
-    from tkcalendar import Calendar
-    CALENDAR_INSTALLED = True
-except ImportError:
-    CALENDAR_INSTALLED = False
-    messagebox.showerror("Error de Dependencia", 
-                         "La librería 'tkcalendar' no está instalada.\n"
-                         "Por favor, instale la dependencia usando: pip install tkcalendar")
-    # Clase simulada (Mock)
-    class Calendar:
-        def __init__(self, *args, **kwargs): pass
-        def pack(self, *args, **kwargs): pass
-        def selection_get(self): return datetime.date.today()
-
-# Importación de la librería PDF (fpdf2)
-try:
-    from fpdf import FPDF 
-    PDF_INSTALLED = True # Bandera de estado de la dependencia
-except ImportError:
-    PDF_INSTALLED = False
-    # Definición de la clase Mock (simulada) para evitar fallos si no está instalada fpdf2
-    class FPDF:
-        def __init__(self, *args, **kwargs): pass
-        def set_font(self, *args): pass
-        def cell(self, *args, **kwargs): pass
-        def add_page(self): pass
-        def set_fill_color(self, *args): pass
-        def set_text_color(self, *args): pass
-        def output(self, *args): pass
-        def rect(self, *args): pass
-        def ln(self, *args): pass
-        def get_y(self): return 0
+# El calendario (tkcalendar, que carga babel) se importa al abrir el primer CalendarModal.
+# Si no está instalado, el botón de calendario lo avisa al usarse.
+CALENDAR_INSTALLED = importlib.util.find_spec("tkcalendar") is not None
 
 # Asume que 'utils.py' contiene la configuración de la DB
-from utils import setup_db, DB_NAME 
-# Importamos el módulo de tasas para acceder a la lógica de DB (TasasBCV)
-try:
-    from module_bcv_rate import BCVRateModule 
-except ImportError:
-    # Clase mock si no existe para evitar el crash
-    class MockBCVRateModule:
-        def __init__(self, *args, **kwargs): pass
-        def get_latest_rate_from_db(self): return None
-    BCVRateModule = MockBCVRateModule
+from utils import get_connection, get_report_reader, DB_NAME 
+from consultas_reportes import tasa_vigente, resumen_ejecutivo, CONCEPTOS_RESUMEN
+# El PDF se escribe por páginas a medida que se leen las filas (fpdf2 solo aporta las métricas de fuente)
+from exportadores import exportar_reporte_pdf, exportar_datos_periodo, PDF_STREAMING_AVAILABLE
 
 
 # --- ESTILOS DE FUENTE Y COLORES (CONSISTENTES) ---
@@ -61,6 +26,18 @@ RED_ERROR = "#D35400"
 GREEN_SUCCESS = "#27AE60"
 FONT_SIZE_ACCESSIBLE = 18
 
+# Canales del hilo lector: una solicitud nueva reemplaza a la anterior del mismo canal
+SUMMARY_CHANNEL = "resumen_ejecutivo"
+EXPORT_CHANNEL = "exportar_pdf"
+
+# Formatos de "Exportar Datos": etiqueta -> (formato, comprimido con gzip)
+DATA_EXPORT_FORMATS = {
+    "CSV": ("csv", False),
+    "CSV (gzip)": ("csv", True),
+    "JSON Lines": ("jsonl", False),
+    "JSON Lines (gzip)": ("jsonl", True),
+}
+
 # ===================================================================
 # --- CLASE DE VENTANA MODAL PARA CALENDARIO ---
 # ===================================================================
@@ -97,6 +74,7 @@ class CalendarModal(ctk.CTkToplevel):
                      font=ctk.CTkFont(size=FONT_SIZE_ACCESSIBLE, weight="bold")).pack(pady=(10, 5))
 
         # TkCalendar widget 
+        from tkcalendar import Calendar
         self.cal = Calendar(calendar_container, 
                             selectmode='day',
                             year=initial_date.year, 
@@ -117,95 +95,6 @@ class CalendarModal(ctk.CTkToplevel):
         self.callback(selected_date)
         self.destroy()
 
-# ===================================================================
-# --- CLASE HELPER PARA GENERACIÓN DE PDF ---
-# ===================================================================
-
-class PDFReportGenerator(FPDF):
-    """Clase personalizada para generar reportes con formato profesional."""
-
-    def __init__(self, title, date_range, rate_info):
-        super().__init__('P', 'mm', 'A4')
-        self.title = title
-        self.date_range = date_range
-        self.rate_info = rate_info
-        
-        self.WIDTH = 210 
-        self.HEIGHT = 297 
-        self.MARGIN = 10
-        
-        self.set_auto_page_break(auto=True, margin=15)
-        self.add_page()
-        self.write_header()
-
-    def header(self):
-        # Logo o título principal
-        self.set_font('Arial', 'B', 15)
-        self.set_text_color(52, 73, 94) 
-        self.cell(0, 5, 'INVERSIONES MARTINEZ', 0, 1, 'L')
-        
-        # Línea de separación
-        self.ln(2)
-        self.set_fill_color(52, 73, 94)
-        self.rect(self.MARGIN, self.get_y(), self.WIDTH - 2 * self.MARGIN, 0.5, 'F')
-        self.ln(3)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(127, 140, 141) 
-        self.cell(0, 10, f'Página {self.page_no()}/{{nb}}', 0, 0, 'C')
-        self.set_x(self.MARGIN)
-        self.cell(0, 10, 'Generado por Sistema de Gestión Martinez', 0, 0, 'R')
-
-    def write_header(self):
-        self.set_font('Arial', 'B', 16)
-        self.set_text_color(22, 160, 133) 
-        self.cell(0, 8, self.title, 0, 1, 'L')
-        
-        self.set_font('Arial', '', 11)
-        self.set_text_color(100, 100, 100)
-        self.cell(0, 6, f'Período: {self.date_range}', 0, 1, 'L')
-        self.cell(0, 6, self.rate_info, 0, 1, 'L')
-        self.ln(5)
-    
-    def title_section(self, title):
-        self.set_font('Arial', 'B', 12)
-        self.set_fill_color(236, 240, 241) 
-        self.set_text_color(52, 73, 94)
-        self.cell(0, 7, title, 0, 1, 'L', 1)
-        self.ln(1)
-
-    def write_table(self, header, data, col_widths, align='L'):
-        # Cabecera
-        self.set_font('Arial', 'B', 9)
-        self.set_fill_color(52, 73, 94) 
-        self.set_text_color(255, 255, 255)
-        for i, h in enumerate(header):
-            self.cell(col_widths[i], 7, h, 1, 0, 'C', 1)
-        self.ln()
-
-        # Filas de datos
-        self.set_font('Arial', '', 9)
-        self.set_text_color(0, 0, 0)
-        fill = False
-        for row in data:
-            self.set_fill_color(236, 240, 241) if fill else self.set_fill_color(255, 255, 255)
-            for i, item in enumerate(row):
-                if item is None: item = ''
-                
-                # Alineación a la derecha para montos
-                if i in [len(row)-1, len(row)-2]:
-                    self.cell(col_widths[i], 6, str(item), 'LR', 0, 'R', fill)
-                else:
-                    self.cell(col_widths[i], 6, str(item), 'LR', 0, align, fill)
-            self.ln()
-            fill = not fill
-        # Línea de cierre
-        self.cell(sum(col_widths), 0, '', 'T', 1, 'L')
-        self.ln(3)
-
-
 # ===================================================================
 # --- CLASE PRINCIPAL: ExportacionReportesModule (Resumen Ejecutivo) ---
 # ===================================================================
@@ -215,8 +104,9 @@ class ExportacionReportesModule(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self.conn = setup_db() 
-        self.bcv_rate_module = BCVRateModule(parent=self, controller=None)
+        self.conn = get_connection() 
+        self.reader = get_report_reader(self)
+        self.export_in_progress = False
         self.current_summary_data = {} 
         self.current_date_range = ("", "") 
         today_str = datetime.date.today().strftime("%Y-%m-%d") 
@@ -261,6 +151,45 @@ class ExportacionReportesModule(ctk.CTkFrame):
                       height=40,
                       font=ctk.CTkFont(size=FONT_SIZE_ACCESSIBLE, weight="bold")
                       ).pack(side="left")
+
+        # Exportación de los movimientos para contabilidad (CSV / JSON Lines)
+        self.data_format_menu = ctk.CTkOptionMenu(action_frame,
+                                                  values=list(DATA_EXPORT_FORMATS),
+                                                  fg_color=TEAL_SOBRIO,
+                                                  button_color=TEAL_SOBRIO,
+                                                  height=40,
+                                                  width=170)
+        self.data_format_menu.set("CSV")
+        self.data_format_menu.pack(side="left", padx=(20, 5))
+
+        ctk.CTkButton(action_frame, 
+                      text="🗂 Exportar Datos", 
+                      command=self.export_data,
+                      fg_color=TEAL_SOBRIO,
+                      hover_color="#1ABC9C",
+                      height=40,
+                      font=ctk.CTkFont(size=FONT_SIZE_ACCESSIBLE, weight="bold")
+                      ).pack(side="left")
+
+        # Avance de la exportación (visible solo mientras se genera el PDF)
+        self.export_progress_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        self.export_progress_frame.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        self.export_progress_frame.grid_columnconfigure(1, weight=1)
+        self.export_progress_label = ctk.CTkLabel(self.export_progress_frame, text="",
+                                                  font=ctk.CTkFont(size=14), text_color=DARK_BLUE_SOBRIO)
+        self.export_progress_label.grid(row=0, column=0, padx=(0, 10), sticky="w")
+        self.export_progress_bar = ctk.CTkProgressBar(self.export_progress_frame, progress_color=GREEN_SUCCESS)
+        self.export_progress_bar.grid(row=0, column=1, sticky="ew")
+        self.export_progress_bar.set(0)
+        ctk.CTkButton(self.export_progress_frame,
+                      text="✖ Cancelar",
+                      command=self.cancel_export,
+                      fg_color=RED_ERROR,
+                      hover_color="#E67E22",
+                      width=110,
+                      height=30
+                      ).grid(row=0, column=2, padx=(10, 0))
+        self.export_progress_frame.grid_remove()
                       
         # ----------------------------------------------------------------------
         # --- Panel de Opciones de Filtro (Fecha y Período) ---
@@ -390,7 +319,9 @@ class ExportacionReportesModule(ctk.CTkFrame):
     def _open_calendar_modal(self, date_type):
         """Abre la ventana modal del calendario para seleccionar una fecha (Inicio o Fin)."""
         if not CALENDAR_INSTALLED:
-            messagebox.showerror("Error", "La librería 'tkcalendar' no está instalada.")
+            messagebox.showerror("Error de Dependencia", 
+                                 "La librería 'tkcalendar' no está instalada.\n"
+                                 "Por favor, instale la dependencia usando: pip install tkcalendar")
             return
 
         period = self.period_combobox.get()
@@ -462,35 +393,16 @@ class ExportacionReportesModule(ctk.CTkFrame):
             self.date_display_label.configure(text=date_obj.strftime("%B %Y"))
             
 
-    def _get_rate_for_date(self, date_time_str: str) -> tuple[float, str]:
-        """Obtiene la tasa BCV más reciente anterior o igual a la fecha/hora dada."""
+    def _get_rate_for_date(self, date_time_str: str, conn=None, rates=None) -> tuple[float, str]:
+        """Obtiene la tasa BCV más reciente anterior o igual a la fecha/hora dada.
+
+        'conn' permite usarla desde el hilo de DB (por defecto, la conexión compartida).
+        'rates' es una LineaTasas ya cargada: para muchas fechas se carga una sola vez.
+        """
         try:
-            transaction_dt = datetime.datetime.strptime(date_time_str, "%Y-%m-%d %H:%M:%S")
-            transaction_date_str = transaction_dt.strftime("%Y-%m-%d %H:%M:%S")
-            
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT tasa, fecha_registro 
-                FROM TasasBCV 
-                WHERE fecha_registro <= ?
-                ORDER BY fecha_registro DESC 
-                LIMIT 1
-            """, (transaction_date_str,))
-            
-            result = cursor.fetchone()
-            if result:
-                return float(result[0]), str(result[1])
-            
-            # Si no hay tasa anterior, buscar la más reciente en general (podría ser posterior)
-            latest_rate = self.bcv_rate_module.get_latest_rate_from_db()
-            if latest_rate:
-                 cursor.execute("SELECT fecha_registro FROM TasasBCV ORDER BY fecha_registro DESC LIMIT 1")
-                 latest_date_result = cursor.fetchone()
-                 latest_date = latest_date_result[0] if latest_date_result else "N/D"
-                 return float(latest_rate), f"{latest_date} (Más Reciente)"
-                 
-            return 0.0, "N/A (Sin tasa en DB)"
-        
+            if rates is None:
+                return tasa_vigente(conn or self.conn, date_time_str)
+            return rates.tasa_en(date_time_str)
         except Exception:
             return 0.0, "ERROR"
 
@@ -542,97 +454,43 @@ class ExportacionReportesModule(ctk.CTkFrame):
 
 
     def load_summary_data(self):
-        """Carga y calcula los datos del resumen ejecutivo para el período seleccionado."""
-        
+        """Pide al hilo lector el resumen ejecutivo del período seleccionado.
+
+        Si llega otra solicitud (otro período, Recargar) antes de que termine, la
+        anterior se cancela y su resultado se descarta.
+        """
         for item in self.summary_tree.get_children():
             self.summary_tree.delete(item)
             
         date_start, date_end, date_range_str = self._get_filter_dates()
         self.current_date_range = (date_start, date_end) 
-
-        # Tasa usada para la conversión del total (se usa la tasa del final del período)
-        tasa_general, tasa_fecha = self._get_rate_for_date(f"{date_end} 23:59:59")
         self.current_summary_data = {} 
-        
-        totals = {
-            "Ventas (Neto)": {"Bs": 0.0, "USD": 0.0},
-            "Devoluciones": {"Bs": 0.0, "USD": 0.0},
-            "Avances de Efectivo (Monto Entregado)": {"Bs": 0.0, "USD": 0.0},
-            "Ganancia Avances (Comisión)": {"Bs": 0.0, "USD": 0.0},
-            "Recargas Telefónicas (Monto Base)": {"Bs": 0.0, "USD": 0.0},
-            "Ganancia Recargas (Comisión)": {"Bs": 0.0, "USD": 0.0},
-        }
-
-        query_date_filter = "fecha BETWEEN ? AND ?" if date_start != date_end else "fecha = ?"
-        params = (date_start, date_end) if date_start != date_end else (date_start,)
-
-        # 1. Ventas y Devoluciones (Tabla Ventas)
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT estado, monto_total_bs, total_venta
-                FROM Ventas
-                WHERE {query_date_filter} AND estado IN ('Completada', 'Devolucion')
-            """, params)
-            
-            for estado, monto_bs, monto_usd in cursor.fetchall():
-                if estado == 'Completada':
-                    totals["Ventas (Neto)"]["Bs"] += (monto_bs if monto_bs is not None else 0.0)
-                    totals["Ventas (Neto)"]["USD"] += (monto_usd if monto_usd is not None else 0.0)
-                elif estado == 'Devolucion':
-                    # Las devoluciones restan montos
-                    totals["Devoluciones"]["Bs"] -= (monto_bs if monto_bs is not None else 0.0)
-                    totals["Devoluciones"]["USD"] -= (monto_usd if monto_usd is not None else 0.0)
-        except Exception:
-            pass
+        self.rate_info_label.configure(text=f"Cargando resumen de {date_range_str}…")
 
+        self.reader.submit(
+            SUMMARY_CHANNEL, self._summary_job, date_start, date_end,
+            on_success=lambda result: self._show_summary(date_range_str, *result),
+            on_error=lambda e: self.rate_info_label.configure(text=f"Error al cargar el resumen: {e}"),
+        )
 
-        # 2. Avances de Efectivo (Tabla AvancesEfectivo)
-        query_date_filter_adv = "substr(fecha_hora, 1, 10) BETWEEN ? AND ?" if date_start != date_end else "substr(fecha_hora, 1, 10) = ?"
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT fecha_hora, monto_entregado, comision
-                FROM AvancesEfectivo
-                WHERE {query_date_filter_adv} AND estado = 'Concretado'
-            """, params)
-
-            for fecha_hora, monto_entregado, comision in cursor.fetchall():
-                # Nota: Se usa la tasa del momento de la transacción para la conversión a USD
-                rate_adv, _ = self._get_rate_for_date(fecha_hora)
-                
-                totals["Avances de Efectivo (Monto Entregado)"]["Bs"] += monto_entregado
-                totals["Avances de Efectivo (Monto Entregado)"]["USD"] += (monto_entregado / rate_adv) if rate_adv > 0 else 0.0
-                
-                totals["Ganancia Avances (Comisión)"]["Bs"] += comision
-                totals["Ganancia Avances (Comisión)"]["USD"] += (comision / rate_adv) if rate_adv > 0 else 0.0
-                
-        except Exception:
-            pass
+    def _summary_job(self, conn, tarea, date_start, date_end):
+        """Trabajo del hilo lector: totales del período y tasa de referencia (sin widgets)."""
+        # Tasa usada para la conversión del total (se usa la tasa del final del período)
+        tasa_general, tasa_fecha = self._get_rate_for_date(f"{date_end} 23:59:59", conn=conn)
 
-        # 3. Recargas Telefónicas (Tabla RecargasTelefonicas)
-        query_date_filter_rec = "substr(fecha_hora, 1, 10) BETWEEN ? AND ?" if date_start != date_end else "substr(fecha_hora, 1, 10) = ?"
+        # Totales por concepto desde ResumenDiario (a lo sumo un renglón por día,
+        # concepto y método de pago)
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT fecha_hora, monto_base, comision
-                FROM RecargasTelefonicas
-                WHERE {query_date_filter_rec} AND estado = 'Concretado'
-            """, params)
-
-            for fecha_hora, monto_base, comision in cursor.fetchall():
-                # Nota: Se usa la tasa del momento de la transacción para la conversión a USD
-                rate_rec, _ = self._get_rate_for_date(fecha_hora)
-                
-                totals["Recargas Telefónicas (Monto Base)"]["Bs"] += monto_base
-                totals["Recargas Telefónicas (Monto Base)"]["USD"] += (monto_base / rate_rec) if rate_rec > 0 else 0.0
-                
-                totals["Ganancia Recargas (Comisión)"]["Bs"] += comision
-                totals["Ganancia Recargas (Comisión)"]["USD"] += (comision / rate_rec) if rate_rec > 0 else 0.0
-                
-        except Exception:
-            pass
+            totals = resumen_ejecutivo(conn, date_start, date_end)
+        except sqlite3.OperationalError:
+            raise  # Incluye la interrupción por cancelación
+        except Exception as e:
+            print(f"Error al calcular el resumen ejecutivo: {e}")
+            totals = {concepto: {"Bs": 0.0, "USD": 0.0} for concepto in CONCEPTOS_RESUMEN}
+        return totals, tasa_general, tasa_fecha
 
+    def _show_summary(self, date_range_str, totals, tasa_general, tasa_fecha):
+        """Muestra el resumen en el Treeview y lo guarda para la exportación (hilo de Tk)."""
 
         # --- Mostrar Resultados en Treeview y Guardar Datos ---
         total_bs_general = 0.0
@@ -677,77 +535,13 @@ class ExportacionReportesModule(ctk.CTkFrame):
         self.summary_tree.tag_configure('oddrow', background="#DDE3E9")
 
 
-    def _fetch_detailed_transactions(self, date_start, date_end):
-        """Obtiene los datos detallados de las transacciones para el período."""
-        detailed_data = {
-            "Ventas": [], 
-            "Avances": [], 
-            "Recargas": []
-        }
-        
-        query_date_filter = "fecha BETWEEN ? AND ?" if date_start != date_end else "fecha = ?"
-        params = (date_start, date_end) if date_start != date_end else (date_start,)
-        
-        # 1. Ventas y Devoluciones
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT id, fecha, hora, estado, monto_total_bs, total_venta
-                FROM Ventas
-                WHERE {query_date_filter}
-                ORDER BY fecha DESC, hora DESC
-            """, params)
-            
-            for id, fecha, hora, estado, monto_bs, monto_usd in cursor.fetchall():
-                detailed_data["Ventas"].append((id, f"{fecha} {hora}", estado, 
-                                                 f"Bs. {monto_bs:,.2f}", f"$ {monto_usd:,.2f}"))
-        except Exception: pass
-
-        # 2. Avances de Efectivo
-        query_date_filter_adv = "substr(fecha_hora, 1, 10) BETWEEN ? AND ?" if date_start != date_end else "substr(fecha_hora, 1, 10) = ?"
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT id, fecha_hora, monto_entregado, comision, estado
-                FROM AvancesEfectivo
-                WHERE {query_date_filter_adv}
-                ORDER BY fecha_hora DESC
-            """, params)
-
-            for id, fecha_hora, monto_entregado, comision, estado in cursor.fetchall():
-                rate, _ = self._get_rate_for_date(fecha_hora)
-                monto_usd = (monto_entregado / rate) if rate > 0 and monto_entregado else 0.0
-                comision_usd = (comision / rate) if rate > 0 and comision else 0.0
-                
-                detailed_data["Avances"].append((id, fecha_hora, estado, 
-                                                  f"Bs. {monto_entregado:,.2f}", f"Bs. {comision:,.2f}", 
-                                                  f"$ {monto_usd:,.2f}", f"$ {comision_usd:,.2f}"))
-        except Exception: pass
-
-        # 3. Recargas Telefónicas
-        query_date_filter_rec = "substr(fecha_hora, 1, 10) BETWEEN ? AND ?" if date_start != date_end else "substr(fecha_hora, 1, 10) = ?"
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"""
-                SELECT id, fecha_hora, numero, monto_base, comision, monto_total, estado
-                FROM RecargasTelefonicas
-                WHERE {query_date_filter_rec}
-                ORDER BY fecha_hora DESC
-            """, params)
-
-            for id, fecha_hora, numero, monto_base, comision, monto_total, estado in cursor.fetchall():
-                detailed_data["Recargas"].append((id, fecha_hora, numero, estado, 
-                                                   f"Bs. {monto_base:,.2f}", f"Bs. {comision:,.2f}", 
-                                                   f"Bs. {monto_total:,.2f}"))
-        except Exception: pass
-        
-        return detailed_data
-
-
     def export_to_pdf(self):
         """
         Genera el reporte PDF y utiliza filedialog.asksaveasfilename() 
         para permitir al usuario elegir la ubicación de guardado (ventana nativa de Windows).
+
+        La ruta se pide primero; la consulta de transacciones y el armado del PDF
+        corren en el hilo lector con barra de avance y se pueden cancelar.
         """
         
         if not self.current_summary_data:
@@ -755,58 +549,16 @@ class ExportacionReportesModule(ctk.CTkFrame):
              return
         
         # FIX: Verificar la bandera de instalación de FPDF
-        if not PDF_INSTALLED:
+        if not PDF_STREAMING_AVAILABLE:
              messagebox.showerror("Error de Dependencia", 
                                  "La librería 'fpdf2' no está instalada y es necesaria para exportar a PDF.\n"
                                  "Por favor, instale la dependencia usando: pip install fpdf2")
              return
 
-        date_start, date_end = self.current_date_range
-        
-        # 1. Obtener datos detallados y configurar PDF
-        detailed_data = self._fetch_detailed_transactions(date_start, date_end)
-        
-        report_title = "Reporte Ejecutivo de Transacciones"
-        date_range_str = self.current_summary_data["date_range_str"]
-        tasa_general = self.current_summary_data["tasa_general"]
-        tasa_fecha = self.current_summary_data["tasa_fecha"]
-        rate_info = f"Tasa de BCV: 1$ = Bs. {tasa_general:,.4f} (Fecha: {tasa_fecha})"
-        
-        pdf = PDFReportGenerator(report_title, date_range_str, rate_info)
-        pdf.alias_nb_pages() 
-        
-        # 2. Agregar contenido
-        
-        # I. Resumen Económico
-        pdf.title_section("I. Resumen Económico del Período")
-        summary_header = ["CONCEPTO", "TOTAL BS.", "TOTAL USD ($)"]
-        summary_data = []
-        for concepto, data in self.current_summary_data["totals"].items():
-            summary_data.append((concepto, f"Bs. {data['Bs']:,.2f}", f"$ {data['USD']:,.2f}"))
-        summary_data.append(("", "", ""))
-        summary_data.append(self.current_summary_data["grand_total"])
-        pdf.write_table(summary_header, summary_data, [80, 55, 55])
-        
-        # II. Ventas y Devoluciones
-        pdf.title_section("\nII. Movimientos de Ventas y Devoluciones")
-        sales_header = ["ID Venta", "Fecha/Hora", "Estado", "Monto Total (Bs)", "Monto Total (USD)"]
-        sales_data = detailed_data["Ventas"]
-        pdf.write_table(sales_header, sales_data, [20, 40, 30, 50, 50])
-        
-        # III. Avances de Efectivo
-        pdf.title_section("\nIII. Movimientos de Avance de Efectivo")
-        advances_header = ["ID", "Fecha/Hora", "Estado", "Entregado (Bs)", "Comisión (Bs)", "Entregado (USD)", "Comisión (USD)"]
-        advances_data = detailed_data["Avances"]
-        pdf.write_table(advances_header, advances_data, [10, 30, 20, 30, 30, 30, 30])
-        
-        # IV. Recargas Telefónicas
-        pdf.title_section("\nIV. Movimientos de Recargas Telefónicas")
-        recharges_header = ["ID", "Fecha/Hora", "Número", "Estado", "Monto Base", "Comisión", "Total Bs."]
-        recharges_data = detailed_data["Recargas"]
-        pdf.write_table(recharges_header, recharges_data, [10, 35, 25, 20, 30, 25, 30])
-
-        
-        # 3. Diálogo de guardado
+        if self.export_in_progress:
+            return
+
+        # 1. Diálogo de guardado
         date_tag = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         default_filename = f"Reporte_Ejecutivo_{date_tag}.pdf"
 
@@ -822,12 +574,85 @@ class ExportacionReportesModule(ctk.CTkFrame):
             # El usuario canceló la operación
             return
 
-        try:
-            # 💡 CORRECCIÓN APLICADA: Se elimina el argumento 'F' para evitar el error de 3 argumentos
-            pdf.output(full_path) 
-            
-            messagebox.showinfo("Éxito", f"Reporte guardado exitosamente en: \n{full_path}")
-            
-        except Exception as e:
+        # 2. Consultar y armar el PDF en el hilo lector (la ventana sigue respondiendo)
+        date_start, date_end = self.current_date_range
+        self.export_in_progress = True
+        self._show_export_progress(0, None, "Consultando transacciones…")
+
+        def on_success(path):
+            self._hide_export_progress()
+            messagebox.showinfo("Éxito", f"Reporte guardado exitosamente en: \n{path}")
+
+        def on_error(e):
+            self._hide_export_progress()
             messagebox.showerror("Error al guardar PDF", 
-                                 f"No se pudo guardar el archivo. Verifique que no esté abierto o pruebe otra ubicación.\n\nDetalle del Error: {e}")
\ No newline at end of file
+                                 f"No se pudo guardar el archivo. Verifique que no esté abierto o pruebe otra ubicación.\n\nDetalle del Error: {e}")
+
+        self.reader.submit(
+            EXPORT_CHANNEL, self._export_pdf_job, date_start, date_end,
+            dict(self.current_summary_data), full_path,
+            on_success=on_success, on_error=on_error, on_progress=self._show_export_progress,
+        )
+
+    def export_data(self):
+        """Exporta los movimientos del período (ventas, detalle de ventas, avances, recargas
+        y tasas BCV) a una carpeta, un archivo por conjunto, en el formato elegido.
+
+        Igual que el PDF, corre en el hilo lector con barra de avance y se puede cancelar.
+        """
+        if not self.current_summary_data:
+             messagebox.showwarning("Advertencia", "Recargue el resumen antes de exportar.")
+             return
+
+        if self.export_in_progress:
+            return
+
+        carpeta = filedialog.askdirectory(title="Carpeta para los archivos de datos")
+        if not carpeta:
+            return
+
+        formato, comprimir = DATA_EXPORT_FORMATS[self.data_format_menu.get()]
+        date_start, date_end = self.current_date_range
+        self.export_in_progress = True
+        self._show_export_progress(0, None, "Consultando movimientos…")
+
+        def on_success(resultados):
+            self._hide_export_progress()
+            filas = sum(stats["filas"] for stats in resultados.values())
+            archivos = "\n".join(os.path.basename(path) for path in resultados)
+            messagebox.showinfo("Éxito", f"Se exportaron {filas:,} registros en {carpeta}:\n\n{archivos}")
+
+        def on_error(e):
+            self._hide_export_progress()
+            messagebox.showerror("Error al exportar datos", 
+                                 f"No se pudieron guardar los archivos. Verifique la carpeta elegida.\n\nDetalle del Error: {e}")
+
+        self.reader.submit(
+            EXPORT_CHANNEL, self._export_data_job, carpeta, formato, date_start, date_end, comprimir,
+            on_success=on_success, on_error=on_error, on_progress=self._show_export_progress,
+        )
+
+    def cancel_export(self):
+        """Cancela la exportación en curso (el archivo no se escribe)."""
+        self.reader.cancel(EXPORT_CHANNEL)
+        self._hide_export_progress()
+
+    def _show_export_progress(self, actual, total, texto):
+        self.export_progress_frame.grid()
+        self.export_progress_label.configure(text=texto)
+        self.export_progress_bar.set(actual / total if total else 0)
+
+    def _hide_export_progress(self):
+        self.export_in_progress = False
+        self.export_progress_frame.grid_remove()
+
+    def _export_pdf_job(self, conn, tarea, date_start, date_end, summary, full_path):
+        """Trabajo del hilo lector: escribe el PDF página a página mientras recorre las transacciones."""
+        stats = exportar_reporte_pdf(conn, full_path, summary, date_start, date_end, tarea)
+        print(f"PDF exportado: {stats['paginas']} páginas, {stats['filas']} filas "
+              f"en {stats['segundos']:.1f} s ({stats['paginas_por_segundo']:.0f} páginas/s)")
+        return full_path
+
+    def _export_data_job(self, conn, tarea, carpeta, formato, date_start, date_end, comprimir):
+        """Trabajo del hilo lector: escribe un archivo por conjunto de datos a medida que lee el cursor."""
+        return exportar_datos_periodo(conn, carpeta, formato, date_start, date_end, comprimir, tarea=tarea)
@@ -6,7 +6,8 @@ import sqlite3
 import datetime
 import re 
 
-from utils import setup_db, verify_password, DB_NAME 
+from utils import get_connection, verify_password, DB_NAME 
+from catalogo import get_catalog
 
 # ===================================================================
 # --- NUEVA CLASE: VENTANA MODAL DE AUTENTICACIÓN (InventoryAdminAuthWindow) ---
@@ -307,6 +308,7 @@ class ProductFormWindow(ctk.CTkToplevel):
                   data['porcentaje_ganancia']))
                 
             self.conn.commit()
+            get_catalog().invalidate()
             messagebox.showinfo("Éxito", f"Producto '{data['nombre']}' añadido correctamente.\nPrecio Venta por Unidad: ${precio_venta:.2f}")
             
             self.load_callback() 
@@ -643,6 +645,7 @@ class ProductEditWindow(ctk.CTkToplevel):
                   self.product_id))
                 
             self.conn.commit()
+            get_catalog().invalidate()
             messagebox.showinfo("Éxito", f"Producto '{data['nombre']}' (ID: {self.product_id}) actualizado correctamente.\nNuevo Stock Total: {stock_unidades_total} unidades.")
             
             self.load_callback() 
@@ -796,6 +799,7 @@ class StockAddWindow(ctk.CTkToplevel):
             """, (new_total_unidades, new_total_bultos, self.product_id))
                 
             self.conn.commit()
+            get_catalog().invalidate()
             messagebox.showinfo("Éxito", f"Stock de '{self.product_data['nombre']}' actualizado correctamente.\nBultos añadidos: {new_bulks}\nNuevo Stock Total (Bultos): {new_total_bultos:.2f}")
             
             self.load_callback() 
@@ -908,6 +912,7 @@ class BarcodeDeleteWindow(ctk.CTkToplevel):
             cursor = self.conn.cursor()
             cursor.execute("DELETE FROM Productos WHERE id = ?", (product_id,))
             self.conn.commit()
+            get_catalog().invalidate()
             messagebox.showinfo("Éxito", f"Producto '{nombre}' eliminado correctamente.")
             self.load_callback() 
             self.destroy()
@@ -925,7 +930,7 @@ class InventarioModule(ctk.CTkFrame):
         super().__init__(parent)
         self.controller = controller
         
-        self.conn = setup_db()
+        self.conn = get_connection()
         
         # Helper para manejar la apariencia en modo oscuro/claro para colores no-CTk
         self.current_mode = ctk.get_appearance_mode() 
@@ -5,7 +5,7 @@ import datetime
 import sqlite3
 from tkinter import Toplevel # Necesario para asegurar la correcta herencia de Toplevel
 # Asumimos que utils.py está en el mismo directorio.
-from utils import setup_db, DB_NAME 
+from utils import setup_db, get_connection, get_db_executor, get_timestamp_columns 
 
 # ===================================================================
 # --- 1. CLASES: VENTANAS MODALES MODERNAS (CTKTOPLEVEL) ---
@@ -171,7 +171,8 @@ class RecargaTelefonicaModule(ctk.CTkFrame):
         super().__init__(parent)
         self.controller = controller
         # Se conecta a la DB al iniciar el módulo
-        self.conn = setup_db() 
+        self.conn = get_connection() 
+        self.db = get_db_executor(self)
         
         self.create_widgets()
 
@@ -307,16 +308,15 @@ class RecargaTelefonicaModule(ctk.CTkFrame):
             return
 
         estado = 'Concretado'
-        fecha_hora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        fecha_hora, fecha, fecha_epoch = get_timestamp_columns(datetime.datetime.now())
 
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO RecargasTelefonicas (numero, monto_base, comision, monto_total, fecha_hora, estado)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (numero_completo, monto_base, comision, monto_total, fecha_hora, estado))
-            self.conn.commit()
+        def insert_job(conn):
+            conn.execute("""
+                INSERT INTO RecargasTelefonicas (numero, monto_base, comision, monto_total, fecha_hora, estado, fecha, fecha_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (numero_completo, monto_base, comision, monto_total, fecha_hora, estado, fecha, fecha_epoch))
 
+        def on_success(_):
             reporte_resumido = (
                 f"ESTADO: {estado}\n"
                 f"Número: {numero_completo}\n"
@@ -330,9 +330,11 @@ class RecargaTelefonicaModule(ctk.CTkFrame):
                                 'info')
             self._reset_fields()
 
-        except Exception as e:
-            self.conn.rollback()
+        def on_error(e):
             CustomMessageDialog(modal_master, "Error DB", f"Error al registrar la recarga: {e}", 'error')
+
+        # El INSERT corre en el hilo de DB; el reporte se muestra al confirmarse
+        self.db.submit(insert_job, on_success=on_success, on_error=on_error)
             
     def realizar_recarga(self):
         self._register_recharge()
@@ -373,6 +375,6 @@ class RecargaTelefonicaApp(ctk.CTk):
 
 if __name__ == "__main__":
     # Asegura la configuración inicial de la DB
-    setup_db(DB_NAME) 
+    setup_db() 
     app = RecargaTelefonicaApp()
     app.mainloop()
\ No newline at end of file
@@ -2,9 +2,9 @@
 
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog, ttk
+import datetime
 import sqlite3
-import json
-from utils import setup_db, DB_NAME
+from utils import get_connection, get_report_reader, DB_NAME
 
 # --- ESTILOS DE FUENTE Y COLORES (CONSISTENTES) ---
 DARK_BLUE_SOBRIO = "#34495E"
@@ -19,15 +19,193 @@ SIZE_CONFIGS = {
 }
 DEFAULT_SIZE = "Grande" # Usamos el tamaño accesible como predeterminado
 
+# Métodos de pago que registran Ventas y Avance de Efectivo (las recargas no guardan método)
+SALES_PAYMENT_METHODS = ["Efectivo", "Divisa", "Punto de Venta", "Biopago", "Pago Móvil"]
+ADVANCE_PAYMENT_METHODS = ["Punto de Venta", "Pago Móvil", "BioPago"]
+ALL_METHODS = "Todos"
+
+# Hasta cuántos días un rango de fechas se busca por el índice de fecha. Más allá conviene
+# recorrer por id descendente (los ids siguen el orden de las fechas) y cortar en la página
+DATE_INDEX_MAX_DAYS = 31
+
+# Filas por página de los reportes y qué tan cerca del final (fracción visible) se pide la siguiente
+REPORT_PAGE_SIZE = 200
+LOAD_MORE_THRESHOLD = 0.9
+# Filas que se insertan en el árbol por vuelta del bucle de Tk
+ROWS_PER_TICK = 50
+
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue") 
 
+
+class PaginadorReporte:
+    """Llena un Treeview por páginas a medida que el usuario se desplaza hacia abajo.
+
+    Antes cada reporte hacía fetchall() de todo el historial e insertaba una fila de
+    Treeview por registro. Ahora se pide una página con paginación por clave
+    ("WHERE id < último id mostrado ORDER BY id DESC LIMIT n", sobre los índices
+    (estado, id)) y la siguiente solo cuando la barra llega cerca del final.
+
+    La consulta corre en el hilo lector de reportes (canal propio: recargar cancela la
+    página que estaba en camino) y las filas se insertan en bloques de ROWS_PER_TICK
+    con after(), para que la ventana siga redibujándose.
+
+    page_query(before_id, limit) arma (consulta, parámetros) en el hilo de Tk (id en
+    la primera columna); insert_row(index, row) agrega una fila al árbol.
+    """
+
+    def __init__(self, tree, scrollbar, page_query, insert_row, reader, canal,
+                 on_status=None, on_error=None, page_size=REPORT_PAGE_SIZE):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page_query = page_query
+        self.insert_row = insert_row
+        self.reader = reader
+        self.canal = canal
+        self.on_status = on_status
+        self.on_error = on_error
+        self.page_size = page_size
+        self._generation = 0
+        self._last_id = None
+        self._loaded = 0
+        self._exhausted = False
+        self._loading = False
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    def reset(self):
+        """Vacía el árbol y pide la primera página (al abrir, filtrar o recargar)."""
+        self._generation += 1
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._last_id = None
+        self._loaded = 0
+        self._exhausted = False
+        self._loading = False
+        self.load_more()
+
+    def load_more(self):
+        """Pide la siguiente página al hilo lector (si no hay otra en camino)."""
+        if self._exhausted or self._loading:
+            return
+        self._loading = True
+        self._set_status("Cargando…")
+        generation = self._generation
+        query, params = self.page_query(self._last_id, self.page_size)
+        self.reader.submit(
+            self.canal, _fetch_rows_job, query, params,
+            on_success=lambda rows: self._insert_chunk(generation, rows, 0),
+            on_error=lambda e: self._on_page_error(generation, e),
+        )
+
+    def _insert_chunk(self, generation, rows, start):
+        if generation != self._generation:
+            return  # Llegó tarde: el reporte se recargó mientras se insertaba
+        end = min(start + ROWS_PER_TICK, len(rows))
+        for row in rows[start:end]:
+            self.insert_row(self._loaded, row)
+            self._loaded += 1
+        if end < len(rows):
+            self.tree.after(1, self._insert_chunk, generation, rows, end)
+            return
+
+        if rows:
+            self._last_id = rows[-1][0]
+        self._exhausted = len(rows) < self.page_size
+        self._loading = False
+        suffix = "" if self._exhausted else " (desplace hacia abajo para ver más)"
+        self._set_status(f"{self._loaded:,} registros mostrados{suffix}")
+
+    def _on_page_error(self, generation, error):
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._set_status("")
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def _set_status(self, text):
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self._exhausted and not self._loading and float(last) >= LOAD_MORE_THRESHOLD:
+            # Si la página no llena la vista, el nuevo yscrollcommand vuelve a pedir la siguiente
+            self.load_more()
+
+
+def _fetch_rows_job(conn, tarea, query, params):
+    """Trabajo del hilo lector: ejecuta la consulta de una página."""
+    return conn.execute(query, params).fetchall()
+
+
+def report_filter_conditions(filters, date_column, method_column=None, amount_column=None):
+    """Convierte los filtros de rango de una pestaña en condiciones SQL parametrizadas.
+
+    'filters' viene de ReportesModule._read_range_filters(): desde/hasta (YYYY-MM-DD),
+    metodo y monto_min/monto_max (None = sin filtro). Devuelve (condiciones, parámetros,
+    con_fecha); 'con_fecha' indica que la fecha ya decide cómo se recorre la tabla.
+
+    Un rango corto se busca por los índices (fecha, estado) / (metodo_pago, fecha) y
+    se ordena solo esa parte. En un rango largo o abierto, el "+" deja la fecha fuera
+    de los índices: SQLite recorre por id descendente y corta al llenar la página,
+    en vez de ordenar todo el rango. El monto se filtra sobre las filas elegidas.
+    """
+    conditions, params = [], []
+    desde, hasta = filters.get("desde"), filters.get("hasta")
+    narrowed = bool(desde and hasta) and (
+        datetime.date.fromisoformat(hasta) - datetime.date.fromisoformat(desde)
+    ).days < DATE_INDEX_MAX_DAYS
+    date_term = date_column if narrowed else f"+{date_column}"
+    if desde:
+        conditions.append(f"{date_term} >= ?")
+        params.append(desde)
+    if hasta:
+        conditions.append(f"{date_term} <= ?")
+        params.append(hasta)
+    if method_column and filters.get("metodo"):
+        conditions.append(f"{method_column} = ?")
+        params.append(filters["metodo"])
+    if amount_column and filters.get("monto_min") is not None:
+        conditions.append(f"{amount_column} >= ?")
+        params.append(filters["monto_min"])
+    if amount_column and filters.get("monto_max") is not None:
+        conditions.append(f"{amount_column} <= ?")
+        params.append(filters["monto_max"])
+    return conditions, params, bool(desde or hasta)
+
+
+def status_condition(status, column, dated):
+    """Condición de estado. Con filtro de fecha, el "+" evita que SQLite elija el índice
+    (estado, id) y recorra todo el historial de ese estado buscando las fechas."""
+    if status in ("Todas", "Todos"):
+        return [], []
+    return [f"+{column} = ?" if dated else f"{column} = ?"], [status]
+
+
+def keyset_page_query(base_query, conditions, params, before_id, limit, id_column="id"):
+    """Arma la consulta de una página: filtros + "id < before_id" + ORDER BY id DESC LIMIT."""
+    conditions = list(conditions)
+    params = list(params)
+    if before_id is not None:
+        conditions.append(f"{id_column} < ?")
+        params.append(before_id)
+    query = base_query
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {id_column} DESC LIMIT ?"
+    params.append(limit)
+    return query, params
+
+
 class ReportesModule(ctk.CTkFrame):
     
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self.conn = setup_db()
+        self.conn = get_connection()
+        self.reader = get_report_reader(self)
         
         self.current_size = DEFAULT_SIZE # Variable de estado para el tamaño actual
         
@@ -67,6 +245,14 @@ class ReportesModule(ctk.CTkFrame):
         self._create_advance_filter_frame(self.advance_tab)
         self._create_advance_tree(self.advance_tab) # Crea el Treeview (sin estilo inicial)
 
+        # --- 3. Pestaña de Recarga Telefónica ---
+        self.recharge_tab = self.tab_view.add("Recarga Telefónica")
+        self.recharge_tab.grid_columnconfigure(0, weight=1)
+        self.recharge_tab.grid_rowconfigure(1, weight=1)
+
+        self._create_recharge_filter_frame(self.recharge_tab)
+        self._create_recharge_tree(self.recharge_tab)
+
     # ===================================================================
     # --- LÓGICA DE ESTILO DINÁMICO (NUEVO) ---
     # ===================================================================
@@ -151,8 +337,11 @@ class ReportesModule(ctk.CTkFrame):
                                                     height=35)
         self.sales_size_option.grid(row=1, column=1, padx=10, pady=5, sticky="w")
 
+        # 3. Fecha, método de pago y monto (Fila 2)
+        self.sales_range_filters = self._create_range_filters(filter_frame, SALES_PAYMENT_METHODS, "Monto ($)", self.load_sales_reports)
 
-        # 3. Botón Recargar (Columna 3, abarca 2 filas)
+
+        # 4. Botón Recargar (Columna 3, abarca 3 filas)
         ctk.CTkButton(filter_frame, 
                       text="🔄 Recargar Reporte", 
                       command=self.load_sales_reports,
@@ -162,7 +351,63 @@ class ReportesModule(ctk.CTkFrame):
                       text_color=DARK_BLUE_SOBRIO,
                       hover_color="#CCD1D1",
                       height=50 # Altura mejorada
-                      ).grid(row=0, column=3, rowspan=2, padx=(10, 0), pady=5, sticky="e")
+                      ).grid(row=0, column=3, rowspan=3, padx=(10, 0), pady=5, sticky="e")
+
+    def _create_range_filters(self, filter_frame, methods, amount_label, reload_command):
+        """Fila de filtros Desde/Hasta, Método de pago y Monto mín./máx. (Enter aplica)."""
+        frame = ctk.CTkFrame(filter_frame, fg_color="transparent")
+        frame.grid(row=2, column=0, columnspan=3, padx=(10, 5), pady=5, sticky="w")
+        font = ctk.CTkFont(size=16)
+        apply = lambda event=None: reload_command()
+        widgets = {}
+
+        column = 0
+        for key, label, width in (("desde", "Desde (AAAA-MM-DD):", 130), ("hasta", "Hasta:", 130)):
+            ctk.CTkLabel(frame, text=label, font=font, text_color=DARK_BLUE_SOBRIO).grid(row=0, column=column, padx=(0, 5))
+            widgets[key] = ctk.CTkEntry(frame, width=width, height=35, placeholder_text="AAAA-MM-DD")
+            widgets[key].grid(row=0, column=column + 1, padx=(0, 15))
+            widgets[key].bind("<Return>", apply)
+            column += 2
+
+        if methods:
+            ctk.CTkLabel(frame, text="Método:", font=font, text_color=DARK_BLUE_SOBRIO).grid(row=0, column=column, padx=(0, 5))
+            widgets["metodo"] = ctk.StringVar(value=ALL_METHODS)
+            ctk.CTkOptionMenu(frame, values=[ALL_METHODS] + methods, variable=widgets["metodo"],
+                              command=apply, width=170, height=35).grid(row=0, column=column + 1, padx=(0, 15))
+            column += 2
+
+        ctk.CTkLabel(frame, text=f"{amount_label}:", font=font, text_color=DARK_BLUE_SOBRIO).grid(row=0, column=column, padx=(0, 5))
+        for key, placeholder in (("monto_min", "mín."), ("monto_max", "máx.")):
+            column += 1
+            widgets[key] = ctk.CTkEntry(frame, width=90, height=35, placeholder_text=placeholder)
+            widgets[key].grid(row=0, column=column, padx=(0, 5))
+            widgets[key].bind("<Return>", apply)
+        return widgets
+
+    def _read_range_filters(self, widgets):
+        """Lee y valida los filtros de rango. Lanza ValueError con un mensaje para el usuario."""
+        filters = {}
+        for key in ("desde", "hasta"):
+            text = widgets[key].get().strip()
+            if text:
+                try:
+                    text = datetime.datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+                except ValueError:
+                    raise ValueError(f"La fecha '{text}' no es válida. Use el formato AAAA-MM-DD.")
+            filters[key] = text or None
+        if filters["desde"] and filters["hasta"] and filters["desde"] > filters["hasta"]:
+            filters["desde"], filters["hasta"] = filters["hasta"], filters["desde"]
+
+        method = widgets["metodo"].get() if "metodo" in widgets else ALL_METHODS
+        filters["metodo"] = None if method == ALL_METHODS else method
+
+        for key in ("monto_min", "monto_max"):
+            text = widgets[key].get().strip().replace(",", ".")
+            try:
+                filters[key] = float(text) if text else None
+            except ValueError:
+                raise ValueError(f"El monto '{text}' no es un número válido.")
+        return filters
 
     def _create_sales_tree(self, master):
         # NOTA: La configuración de estilo 'Report.Treeview' se maneja ahora en apply_treeview_style(self, size_name)
@@ -196,89 +441,94 @@ class ReportesModule(ctk.CTkFrame):
         
         vsb = ttk.Scrollbar(master, orient="vertical", command=self.report_tree.yview)
         vsb.grid(row=1, column=0, sticky='nse', padx=15, pady=(0, 15))
-        self.report_tree.configure(yscrollcommand=vsb.set)
 
-    # LÓGICA: _format_products_for_display SE MANTIENE
-    def _format_products_for_display(self, detail_json):
-        if not detail_json:
+        self.sales_status_label = ctk.CTkLabel(master, text="", font=ctk.CTkFont(size=14), text_color=DARK_BLUE_SOBRIO)
+        self.sales_status_label.grid(row=2, column=0, sticky='w', padx=20, pady=(0, 10))
+        self.sales_pages = PaginadorReporte(
+            self.report_tree, vsb, self._sales_page_query, self._insert_sales_row, self.reader, "reporte_ventas",
+            on_status=lambda text: self.sales_status_label.configure(text=text),
+            on_error=lambda e: messagebox.showerror("Error DB", f"Error al cargar reportes de ventas: {e}"),
+        )
+
+    # Los productos llegan ya concatenados desde VentaDetalle (sin decodificar JSON por fila)
+    def _format_products_for_display(self, productos):
+        if not productos:
             return "Sin Detalle"
-        try:
-            products = json.loads(detail_json)
-            formatted = ", ".join([f"{p['nombre']} ({p['cantidad']})" for p in products])
-            return formatted if len(formatted) < 80 else formatted[:77] + "..."
-        except:
-            return "Error de Formato"
+        return productos if len(productos) < 80 else productos[:77] + "..."
 
-    # LÓGICA: load_sales_reports SE MANTIENE
     def load_sales_reports(self, event=None):
-        for item in self.report_tree.get_children():
-            self.report_tree.delete(item)
-
-        status = self.sales_filter_var.get()
-        
-        query = """
+        try:
+            self._sales_filters = self._read_range_filters(self.sales_range_filters)
+        except ValueError as e:
+            messagebox.showwarning("Filtro inválido", str(e))
+            return
+        self._configure_status_tags(self.report_tree)
+        self.sales_pages.reset()
+
+    def _sales_page_query(self, before_id, limit):
+        filters = self._sales_filters
+        conditions, params, dated = report_filter_conditions(filters, "v.fecha", "v.metodo_pago", "v.total_venta")
+        status_conditions, status_params = status_condition(self.sales_filter_var.get(), "v.estado", dated)
+        conditions, params = status_conditions + conditions, status_params + params
+        page_query, params = keyset_page_query("""
+            SELECT v.id, v.fecha, v.hora, v.total_venta, v.monto_total_bs, v.tasa_bcv, v.metodo_pago, v.estado
+            FROM Ventas v
+        """, conditions, params, before_id, limit, id_column="v.id")
+        # Los productos se concatenan solo para las filas de la página (no para todo el rango ordenado)
+        query = f"""
             SELECT 
-                id, fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle, metodo_pago, estado 
-            FROM Ventas
+                p.id, p.fecha, p.hora, p.total_venta, p.monto_total_bs, p.tasa_bcv,
+                (SELECT group_concat(d.nombre || ' (' || d.cantidad || ')', ', ')
+                 FROM VentaDetalle d WHERE d.venta_id = p.id) AS productos,
+                p.metodo_pago, p.estado 
+            FROM ({page_query}) p
+            ORDER BY p.id DESC
         """
-        params = []
+        return query, params
+
+    def _insert_sales_row(self, i, row):
+        report_id, fecha, hora, total_venta, monto_total_bs, tasa_bcv, productos, metodo_pago, estado = row
+        
+        total_venta = total_venta if total_venta is not None else 0.0
+        monto_total_bs = monto_total_bs if monto_total_bs is not None else 0.0
+        tasa_bcv = tasa_bcv if tasa_bcv is not None else 0.0
         
-        if status != "Todas":
-            query += " WHERE estado = ?"
-            params.append(status)
+        status_tag = 'completed' if estado == 'Completada' else 'cancelled'
+        stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow' 
         
-        query += " ORDER BY id DESC" 
+        monto_usd_str = f"$ {total_venta:,.2f}" 
         
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            reports = cursor.fetchall()
-            
-            for i, row in enumerate(reports): 
-                report_id, fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle_json, metodo_pago, estado = row
-                
-                total_venta = total_venta if total_venta is not None else 0.0
-                monto_total_bs = monto_total_bs if monto_total_bs is not None else 0.0
-                tasa_bcv = tasa_bcv if tasa_bcv is not None else 0.0
-                
-                status_tag = 'completed' if estado == 'Completada' else 'cancelled'
-                stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow' 
-                
-                monto_usd_str = f"$ {total_venta:,.2f}" 
-                
-                try:
-                    formatted_bs_str = "{:,.2f}".format(monto_total_bs).replace(",", "_TEMP_").replace(".", ",").replace("_TEMP_", ".")
-                    monto_bs_str = f"Bs. {formatted_bs_str}"
-                except:
-                    monto_bs_str = f"Bs. {monto_total_bs:,.2f}"
-                
-                tasa_bcv_str = f"{tasa_bcv:,.4f}" 
-                
-                productos_str = self._format_products_for_display(detalle_json)
-                
-                self.report_tree.insert('', 'end', 
-                                        iid=report_id, 
-                                        values=(
-                                            report_id, 
-                                            fecha, 
-                                            hora, 
-                                            monto_usd_str,      
-                                            monto_bs_str,       
-                                            tasa_bcv_str,       
-                                            metodo_pago, 
-                                            estado, 
-                                            productos_str
-                                        ),
-                                        tags=(stripe_tag, status_tag,)) 
-            
-            # Definición de colores para tags (LÓGICA INTACTA)
-            self.report_tree.tag_configure('evenrow', background=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
-            self.report_tree.tag_configure('oddrow', background='#EBEBEB' if ctk.get_appearance_mode() == "Light" else '#2E2E2E')
-            self.report_tree.tag_configure('completed', background='#B5EAD7', foreground='black') 
-            self.report_tree.tag_configure('cancelled', background='#FF9AA2', foreground='black') 
-            
-        except Exception as e:
-            messagebox.showerror("Error DB", f"Error al cargar reportes de ventas: {e}")
+            formatted_bs_str = "{:,.2f}".format(monto_total_bs).replace(",", "_TEMP_").replace(".", ",").replace("_TEMP_", ".")
+            monto_bs_str = f"Bs. {formatted_bs_str}"
+        except:
+            monto_bs_str = f"Bs. {monto_total_bs:,.2f}"
+        
+        tasa_bcv_str = f"{tasa_bcv:,.4f}" 
+        
+        productos_str = self._format_products_for_display(productos)
+        
+        self.report_tree.insert('', 'end', 
+                                iid=report_id, 
+                                values=(
+                                    report_id, 
+                                    fecha, 
+                                    hora, 
+                                    monto_usd_str,      
+                                    monto_bs_str,       
+                                    tasa_bcv_str,       
+                                    metodo_pago, 
+                                    estado, 
+                                    productos_str
+                                ),
+                                tags=(stripe_tag, status_tag,)) 
+
+    def _configure_status_tags(self, tree):
+        """Colores de filas alternas y de estado (compartidos por los tres reportes)."""
+        tree.tag_configure('evenrow', background=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
+        tree.tag_configure('oddrow', background='#EBEBEB' if ctk.get_appearance_mode() == "Light" else '#2E2E2E')
+        tree.tag_configure('completed', background='#B5EAD7', foreground='black') 
+        tree.tag_configure('cancelled', background='#FF9AA2', foreground='black') 
 
     # ===================================================================
     # --- WIDGETS Y LÓGICA DE AVANCE DE EFECTIVO ---
@@ -320,8 +570,11 @@ class ReportesModule(ctk.CTkFrame):
                                                     width=200,
                                                     height=35)
         self.advance_size_option.grid(row=1, column=1, padx=10, pady=5, sticky="w")
+
+        # 3. Fecha, método de pago y monto (Fila 2)
+        self.advance_range_filters = self._create_range_filters(filter_frame, ADVANCE_PAYMENT_METHODS, "Monto (Bs)", self.load_advance_reports)
         
-        # 3. Botón Recargar (Columna 3, abarca 2 filas)
+        # 4. Botón Recargar (Columna 3, abarca 3 filas)
         ctk.CTkButton(filter_frame, 
                       text="🔄 Recargar Reporte", 
                       command=self.load_advance_reports,
@@ -331,7 +584,7 @@ class ReportesModule(ctk.CTkFrame):
                       text_color=DARK_BLUE_SOBRIO,
                       hover_color="#CCD1D1",
                       height=50
-                      ).grid(row=0, column=3, rowspan=2, padx=(10, 0), pady=5, sticky="e")
+                      ).grid(row=0, column=3, rowspan=3, padx=(10, 0), pady=5, sticky="e")
     
     def _create_advance_tree(self, master):
         # NOTA: La configuración de estilo 'Report.Treeview' se maneja ahora en apply_treeview_style(self, size_name)
@@ -355,62 +608,49 @@ class ReportesModule(ctk.CTkFrame):
         
         vsb = ttk.Scrollbar(master, orient="vertical", command=self.advance_tree.yview)
         vsb.grid(row=1, column=0, sticky='nse', padx=15, pady=(0, 15))
-        self.advance_tree.configure(yscrollcommand=vsb.set)
-        
-    # LÓGICA: load_advance_reports SE MANTIENE 
-    def load_advance_reports(self, event=None):
-        for item in self.advance_tree.get_children():
-            self.advance_tree.delete(item)
 
-        status = self.advance_filter_var.get()
-        query = "SELECT id, fecha_hora, monto_entregado, comision, monto_total, metodo_pago, estado FROM AvancesEfectivo"
-        params = []
-        
-        if status != "Todos":
-            query += " WHERE estado = ?"
-            params.append(status)
-        
-        query += " ORDER BY id DESC" 
+        self.advance_status_label = ctk.CTkLabel(master, text="", font=ctk.CTkFont(size=14), text_color=DARK_BLUE_SOBRIO)
+        self.advance_status_label.grid(row=2, column=0, sticky='w', padx=20, pady=(0, 10))
+        self.advance_pages = PaginadorReporte(
+            self.advance_tree, vsb, self._advance_page_query, self._insert_advance_row, self.reader, "reporte_avances",
+            on_status=lambda text: self.advance_status_label.configure(text=text),
+            on_error=lambda e: messagebox.showerror("Error DB", f"Error al cargar reportes de avances de efectivo: {e}"),
+        )
         
+    def load_advance_reports(self, event=None):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            reports = cursor.fetchall()
-            
-            for i, row in enumerate(reports): 
-                report_id, fecha_hora, monto_entregado, comision, monto_total, metodo_pago, estado = row
-                
-                monto_entregado_str = f"Bs. {monto_entregado:,.2f}"
-                comision_str = f"Bs. {comision:,.2f}"
-                monto_total_str = f"Bs. {monto_total:,.2f}"
-                
-                status_tag = 'completed' if estado == 'Concretado' else 'cancelled'
-                stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow'
-                
-                self.advance_tree.insert('', 'end', 
-                                        iid=report_id, 
-                                        values=(report_id, fecha_hora, monto_entregado_str, comision_str, monto_total_str, metodo_pago, estado),
-                                        tags=(stripe_tag, status_tag,))
-
-            # Definición de colores para tags (LÓGICA INTACTA)
-            self.advance_tree.tag_configure('evenrow', background=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
-            self.advance_tree.tag_configure('oddrow', background='#EBEBEB' if ctk.get_appearance_mode() == "Light" else '#2E2E2E')
-
-            self.advance_tree.tag_configure('completed', background='#B5EAD7', foreground='black') 
-            self.advance_tree.tag_configure('cancelled', background='#FF9AA2', foreground='black') 
-
-        except Exception as e:
-            messagebox.showerror("Error DB", f"Error al cargar reportes de avances de efectivo: {e}")
-
-           # Pestaña de Recarga Telefónica
-           
-        self.recharge_tab = self.tab_view.add("Recarga Telefónica")
-        self.recharge_tab.grid_columnconfigure(0, weight=1)
-        self.recharge_tab.grid_rowconfigure(1, weight=1)
-
-        self._create_recharge_filter_frame(self.recharge_tab)
-        self._create_recharge_tree(self.recharge_tab)
-
+            self._advance_filters = self._read_range_filters(self.advance_range_filters)
+        except ValueError as e:
+            messagebox.showwarning("Filtro inválido", str(e))
+            return
+        self._configure_status_tags(self.advance_tree)
+        self.advance_pages.reset()
+
+    def _advance_page_query(self, before_id, limit):
+        filters = self._advance_filters
+        conditions, params, dated = report_filter_conditions(filters, "fecha", "metodo_pago", "monto_entregado")
+        status_conditions, status_params = status_condition(self.advance_filter_var.get(), "estado", dated)
+        conditions, params = status_conditions + conditions, status_params + params
+        query, params = keyset_page_query(
+            "SELECT id, fecha_hora, monto_entregado, comision, monto_total, metodo_pago, estado FROM AvancesEfectivo",
+            conditions, params, before_id, limit
+        )
+        return query, params
+
+    def _insert_advance_row(self, i, row):
+        report_id, fecha_hora, monto_entregado, comision, monto_total, metodo_pago, estado = row
+        
+        monto_entregado_str = f"Bs. {monto_entregado:,.2f}"
+        comision_str = f"Bs. {comision:,.2f}"
+        monto_total_str = f"Bs. {monto_total:,.2f}"
+        
+        status_tag = 'completed' if estado == 'Concretado' else 'cancelled'
+        stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow'
+        
+        self.advance_tree.insert('', 'end', 
+                                iid=report_id, 
+                                values=(report_id, fecha_hora, monto_entregado_str, comision_str, monto_total_str, metodo_pago, estado),
+                                tags=(stripe_tag, status_tag,))
 
     # ===================================================================
     # --- WIDGETS Y LÓGICA DE RECARGA TELEFÓNICA (NUEVOS MÉTODOS) ---
@@ -451,8 +691,11 @@ class ReportesModule(ctk.CTkFrame):
                                                     width=200,
                                                     height=35)
         self.recharge_size_option.grid(row=1, column=1, padx=10, pady=5, sticky="w")
+
+        # 3. Fecha, método de pago y monto (Fila 2)
+        self.recharge_range_filters = self._create_range_filters(filter_frame, None, "Monto (Bs)", self.load_recharge_reports)
         
-        # 3. Botón Recargar (Columna 3, abarca 2 filas)
+        # 4. Botón Recargar (Columna 3, abarca 3 filas)
         ctk.CTkButton(filter_frame, 
                       text="🔄 Recargar Reporte", 
                       command=self.load_recharge_reports,
@@ -462,7 +705,7 @@ class ReportesModule(ctk.CTkFrame):
                       text_color=DARK_BLUE_SOBRIO,
                       hover_color="#CCD1D1",
                       height=50
-                      ).grid(row=0, column=3, rowspan=2, padx=(10, 0), pady=5, sticky="e")
+                      ).grid(row=0, column=3, rowspan=3, padx=(10, 0), pady=5, sticky="e")
     
     def _create_recharge_tree(self, master):
         columns = ("ID", "Fecha/Hora", "Número", "Monto Base", "Comisión (15%)", "Total a Cobrar", "Estado")
@@ -484,50 +727,47 @@ class ReportesModule(ctk.CTkFrame):
         
         vsb = ttk.Scrollbar(master, orient="vertical", command=self.recharge_tree.yview)
         vsb.grid(row=1, column=0, sticky='nse', padx=15, pady=(0, 15))
-        self.recharge_tree.configure(yscrollcommand=vsb.set)
-        
-    def load_recharge_reports(self, event=None):
-        for item in self.recharge_tree.get_children():
-            self.recharge_tree.delete(item)
 
-        status = self.recharge_filter_var.get()
-        # Se asume que la tabla se llama RecargasTelefonicas
-        query = "SELECT id, fecha_hora, numero, monto_base, comision, monto_total, estado FROM RecargasTelefonicas"
-        params = []
-        
-        if status != "Todos":
-            query += " WHERE estado = ?"
-            params.append(status)
-        
-        query += " ORDER BY id DESC" 
+        self.recharge_status_label = ctk.CTkLabel(master, text="", font=ctk.CTkFont(size=14), text_color=DARK_BLUE_SOBRIO)
+        self.recharge_status_label.grid(row=2, column=0, sticky='w', padx=20, pady=(0, 10))
+        self.recharge_pages = PaginadorReporte(
+            self.recharge_tree, vsb, self._recharge_page_query, self._insert_recharge_row, self.reader, "reporte_recargas",
+            on_status=lambda text: self.recharge_status_label.configure(text=text),
+            on_error=lambda e: messagebox.showerror("Error DB", f"Error al cargar reportes de recargas: {e}"),
+        )
         
+    def load_recharge_reports(self, event=None):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            reports = cursor.fetchall()
-            
-            for i, row in enumerate(reports): 
-                # row: id, fecha_hora, numero, monto_base, comision, monto_total, estado
-                report_id, fecha_hora, numero, monto_base, comision, monto_total, estado = row
-                
-                monto_base_str = f"Bs. {monto_base:,.2f}"
-                comision_str = f"Bs. {comision:,.2f}"
-                monto_total_str = f"Bs. {monto_total:,.2f}"
-                
-                status_tag = 'completed' if estado == 'Concretado' else 'cancelled'
-                stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow'
-                
-                self.recharge_tree.insert('', 'end', 
-                                        iid=report_id, 
-                                        values=(report_id, fecha_hora, numero, monto_base_str, comision_str, monto_total_str, estado),
-                                        tags=(stripe_tag, status_tag,))
-
-            # Definición de colores para tags (Reutilizando los tags de avance)
-            self.recharge_tree.tag_configure('evenrow', background=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
-            self.recharge_tree.tag_configure('oddrow', background='#EBEBEB' if ctk.get_appearance_mode() == "Light" else '#2E2E2E')
-
-            self.recharge_tree.tag_configure('completed', background='#B5EAD7', foreground='black') 
-            self.recharge_tree.tag_configure('cancelled', background='#FF9AA2', foreground='black') 
-
-        except Exception as e:
-            messagebox.showerror("Error DB", f"Error al cargar reportes de recargas: {e}\nAsegúrese de que la tabla 'RecargasTelefonicas' exista en la base de datos.")
\ No newline at end of file
+            self._recharge_filters = self._read_range_filters(self.recharge_range_filters)
+        except ValueError as e:
+            messagebox.showwarning("Filtro inválido", str(e))
+            return
+        self._configure_status_tags(self.recharge_tree)
+        self.recharge_pages.reset()
+
+    def _recharge_page_query(self, before_id, limit):
+        filters = self._recharge_filters
+        conditions, params, dated = report_filter_conditions(filters, "fecha", amount_column="monto_base")
+        status_conditions, status_params = status_condition(self.recharge_filter_var.get(), "estado", dated)
+        conditions, params = status_conditions + conditions, status_params + params
+        query, params = keyset_page_query(
+            "SELECT id, fecha_hora, numero, monto_base, comision, monto_total, estado FROM RecargasTelefonicas",
+            conditions, params, before_id, limit
+        )
+        return query, params
+
+    def _insert_recharge_row(self, i, row):
+        # row: id, fecha_hora, numero, monto_base, comision, monto_total, estado
+        report_id, fecha_hora, numero, monto_base, comision, monto_total, estado = row
+        
+        monto_base_str = f"Bs. {monto_base:,.2f}"
+        comision_str = f"Bs. {comision:,.2f}"
+        monto_total_str = f"Bs. {monto_total:,.2f}"
+        
+        status_tag = 'completed' if estado == 'Concretado' else 'cancelled'
+        stripe_tag = 'oddrow' if i % 2 != 0 else 'evenrow'
+        
+        self.recharge_tree.insert('', 'end', 
+                                iid=report_id, 
+                                values=(report_id, fecha_hora, numero, monto_base_str, comision_str, monto_total_str, estado),
+                                tags=(stripe_tag, status_tag,))
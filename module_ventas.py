@@ -3,24 +3,78 @@
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog, ttk 
 import sqlite3
-import datetime
-import json
 import re
 
 # Importamos las utilidades, incluyendo verify_password (Lógica Intacta)
-from utils import setup_db, DB_NAME, verify_password 
-
-# --- FUNCIÓN AUXILIAR: OBTENER TASA BCV (Lógica Intacta) ---
-def get_latest_bcv_rate(conn):
-    """Obtiene la tasa BCV más reciente registrada en la base de datos TasasBCV."""
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
+from utils import get_connection, get_db_executor, DB_NAME, verify_password, insert_sale_record 
+from catalogo import get_catalog
+from servicio_tasa import get_rate_service
+from carrito import CarritoModel, patch_cart_tree
+
+
+# ===================================================================
+# --- TRABAJOS DE BASE DE DATOS (se ejecutan en el hilo de DBExecutor) ---
+# ===================================================================
+
+class StockInsuficienteError(Exception):
+    """El inventario ya no alcanza para una o más líneas del carrito al momento de cobrar.
+
+    'faltantes' es una lista de (nombre, stock_actual, cantidad_pedida); stock_actual es
+    None si el producto ya no existe.
+    """
+    def __init__(self, faltantes):
+        super().__init__("; ".join(
+            f"'{nombre}' no existe en el inventario" if stock is None
+            else f"'{nombre}' solo tiene {stock} unidades (se piden {cantidad})"
+            for nombre, stock, cantidad in faltantes
+        ))
+        self.faltantes = faltantes
+
+
+# Descuento protegido: solo afecta la fila si todavía hay stock suficiente. Los bultos
+# se descuentan en la misma sentencia (si el producto se maneja por bulto).
+_STOCK_DECREMENT_SQL = """
+    UPDATE Productos
+    SET stock = stock - :cantidad,
+        stock_bultos = CASE WHEN unidades_por_bulto > 0
+                            THEN stock_bultos - (:cantidad * 1.0 / unidades_por_bulto)
+                            ELSE stock_bultos END
+    WHERE id = :id AND stock >= :cantidad
+"""
+
+
+def _find_short_lines(conn, sale_details):
+    """Devuelve las líneas que no tienen stock suficiente (para el reporte de error)."""
+    cursor = conn.cursor()
+    faltantes = []
+    for line in sale_details:
+        cursor.execute("SELECT stock FROM Productos WHERE id = ?", (line['id'],))
         result = cursor.fetchone()
-        return result[0] if result else None
-    except Exception as e:
-        print(f"Error al obtener la última tasa BCV: {e}")
-        return None
+        if result is None or result[0] < line['cantidad']:
+            faltantes.append((line['nombre'], result[0] if result else None, line['cantidad']))
+    return faltantes
+
+
+def _finalize_sale_job(conn, sale_details, total_venta, metodo_pago):
+    """Descuenta el inventario y registra la venta como 'Completada' (una sola transacción).
+
+    BEGIN IMMEDIATE toma el bloqueo de escritura al inicio, así otra caja no puede
+    vender el mismo producto entre el chequeo y el descuento.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+    cursor.executemany(
+        _STOCK_DECREMENT_SQL,
+        [{'id': line['id'], 'cantidad': line['cantidad']} for line in sale_details]
+    )
+
+    if cursor.rowcount != len(sale_details):
+        # Alguna línea no pasó el WHERE stock >= cantidad: se deshace todo y se informa cuál
+        conn.rollback()
+        raise StockInsuficienteError(_find_short_lines(conn, sale_details))
+
+    insert_sale_record(conn, sale_details, total_venta, metodo_pago, "Completada")
+    return total_venta
 
 # ===================================================================
 # --- CLASE: VENTANA MODAL DE AUTENTICACIÓN (DISEÑO SOBRIO) ---
@@ -106,28 +160,22 @@ class VentasModule(ctk.CTkFrame):
         super().__init__(parent) 
         self.controller = controller
         
-        self.conn = setup_db()
-        self.cart = {}
+        self.conn = get_connection()
+        self.db = get_db_executor(self)
+        self.catalog = get_catalog()
+        self.rate_service = get_rate_service()
+        self.cart = CarritoModel()
         self.transaction_id_counter = 0 
         self.final_total = 0.0 
+        # Mientras el cobro se registra en segundo plano el carrito queda bloqueado
+        self.sale_in_progress = False
         
         self.create_widgets()
+        # Cada cambio del carrito parchea solo su fila del Treeview
+        self.cart.add_listener(lambda evento, product_id, item: patch_cart_tree(self.cart_tree, evento, product_id, item))
         self.update_totals() 
-        self.focus_barcode_entry()
-
-    # MÉTODOS DE LÓGICA (se mantienen SIN CAMBIOS)
-    def _get_bcv_rate(self) -> float:
-        # Lógica original...
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
-            result = cursor.fetchone()
-            if result:
-                return result[0]
-            return 1.0 
-        except sqlite3.Error as e:
-            print(f"Error DB al obtener tasa BCV: {e}")
-            return 1.0
+        # Los totales en Bs. solo se recalculan cuando cambia la tasa
+        self.rate_service.subscribe(lambda tasa: self.update_totals())
 
     def create_widgets(self):
         # ----------------------------------------------------------------------
@@ -313,11 +361,11 @@ class VentasModule(ctk.CTkFrame):
 
     def update_totals(self):
         """Calcula y actualiza los totales de la venta en USD y Bs."""
-        # Lógica original...
-        subtotal_usd = sum(item['precio'] * item['cantidad'] for item in self.cart.values())
+        # Subtotal acumulado por el modelo del carrito (no se recorre el carrito)
+        subtotal_usd = self.cart.subtotal
         self.final_total = subtotal_usd 
         
-        tasa_bcv = self._get_bcv_rate()
+        tasa_bcv = self.rate_service.get(1.0)
         total_bs = self.final_total * tasa_bcv
         
         self.subtotal_label.configure(text=f"${subtotal_usd:.2f}")
@@ -336,9 +384,7 @@ class VentasModule(ctk.CTkFrame):
 
     def clear_cart(self):
         # Lógica original...
-        self.cart = {}
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
+        self.cart.clear()
         self.update_totals()
         self.payment_method_var.set(self.payment_methods[0])
 
@@ -348,6 +394,8 @@ class VentasModule(ctk.CTkFrame):
 
     def add_product_to_cart(self):
         # Lógica original (Chequeo de stock, adición, actualización de display)...
+        if self.sale_in_progress:
+            return
         barcode = self.barcode_entry.get().strip()
         self.barcode_entry.delete(0, ctk.END) 
         
@@ -356,19 +404,17 @@ class VentasModule(ctk.CTkFrame):
             return
 
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "SELECT id, nombre, precio_venta, stock FROM Productos WHERE codigo_barras = ?", 
-                (barcode,)
-            )
-            data = cursor.fetchone()
+            # Búsqueda en la caché del catálogo (sin consultar Productos en cada escaneo)
+            product = self.catalog.get(barcode)
 
-            if not data:
+            if product is None:
                 messagebox.showerror("Producto No Encontrado", f"Producto con código '{barcode}' no existe en el inventario.")
                 self.focus_barcode_entry()
                 return
             
-            product_id, name, price, stock_actual = data
+            product_id, name, price, stock_actual, cost = (
+                product.id, product.nombre, product.precio_venta, product.stock, product.precio_compra
+            )
             
             current_cart_quantity = self.cart.get(product_id, {}).get('cantidad', 0)
             
@@ -376,12 +422,7 @@ class VentasModule(ctk.CTkFrame):
                  messagebox.showwarning("Stock Agotado", f"El producto '{name}' solo tiene {stock_actual} unidades en inventario (límite alcanzado en el carrito).")
                  return
                  
-            if product_id in self.cart:
-                self.cart[product_id]['cantidad'] += 1
-            else:
-                self.cart[product_id] = {'nombre': name, 'precio': price, 'cantidad': 1, 'id_db': product_id}
-                
-            self.update_cart_display()
+            self.cart.add(product_id, name, price, cost)
             self.update_totals() 
 
         except sqlite3.Error as e:
@@ -391,19 +432,6 @@ class VentasModule(ctk.CTkFrame):
             
         self.focus_barcode_entry()
 
-    def update_cart_display(self):
-        # Lógica original...
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        for id_db, item in self.cart.items():
-            subtotal = item['precio'] * item['cantidad']
-            self.cart_tree.insert('', 'end', 
-                                  iid=id_db, 
-                                  values=(item['id_db'], item['nombre'], f"{item['precio']:.2f}", item['cantidad'], f"{subtotal:.2f}"),
-                                  tags=(id_db,))
-
-
     def remove_item_from_cart(self):
         # Lógica original (Autenticación y remoción)...
         selected_item = self.cart_tree.focus()
@@ -418,8 +446,7 @@ class VentasModule(ctk.CTkFrame):
                 if item_id in self.cart:
                     nombre_producto = self.cart[item_id]['nombre']
                     if messagebox.askyesno("Confirmar", f"¿Desea eliminar TODAS las unidades de '{nombre_producto}' del carrito?"):
-                        del self.cart[item_id]
-                        self.update_cart_display()
+                        self.cart.remove(item_id)
                         self.update_totals() 
                         messagebox.showinfo("Producto Eliminado", f"Producto '{nombre_producto}' eliminado del carrito.")
                     else:
@@ -434,8 +461,21 @@ class VentasModule(ctk.CTkFrame):
         VentasAdminAuthWindow(self.master.master, remove_authenticated)
 
 
+    def _cart_sale_details(self):
+        """Copia del carrito en el formato de VentaDetalle (se envía al hilo de DB)."""
+        return [
+            {
+                'id': item_id, 'nombre': item_data['nombre'], 'cantidad': item_data['cantidad'], 
+                'precio_u': item_data['precio'], 'costo_u': item_data.get('costo'),
+                'subtotal': item_data['precio'] * item_data['cantidad']
+            }
+            for item_id, item_data in self.cart.items()
+        ]
+
     def finalize_sale(self):
-        # Lógica original (Actualización de stock, registro en DB)...
+        # El descuento de inventario y el registro corren en el hilo de DB (ver _finalize_sale_job)
+        if self.sale_in_progress:
+            return
         if not self.cart:
             messagebox.showwarning("Venta Vacía", "El carrito está vacío. Agregue productos para finalizar.")
             return
@@ -445,72 +485,31 @@ class VentasModule(ctk.CTkFrame):
         if not messagebox.askyesno("Confirmar Pago", f"¿El cliente ya realizó el pago por un total de ${self.final_total:.2f}?"):
             return 
 
-        try:
-            cursor = self.conn.cursor()
-            sale_details = []
-            
-            # --- LÓGICA DE CHEQUEO DE STOCK Y CÁLCULO (INTACTA) ---
-            for item_id, item_data in self.cart.items():
-                cantidad_vendida = item_data['cantidad']
-                
-                cursor.execute("SELECT nombre, stock, stock_bultos, unidades_por_bulto FROM Productos WHERE id = ?", (item_id,))
-                result = cursor.fetchone()
-                
-                if not result: raise Exception(f"Producto ID {item_id} no encontrado en DB.")
-                nombre, stock_actual, stock_bultos_actual, unidades_por_bulto = result
-                
-                if stock_actual < cantidad_vendida:
-                    messagebox.showerror("Error de Stock", f"El producto '{nombre}' solo tiene {stock_actual} unidades en inventario. Venta CANCELADA.")
-                    self.conn.rollback() 
-                    return
-
-                # --- LÓGICA DE ACTUALIZACIÓN DE INVENTARIO (UNIDAD Y BULTO) ---
-                nuevo_stock = stock_actual - cantidad_vendida
-                
-                if unidades_por_bulto and unidades_por_bulto > 0:
-                    reduccion_bulto = cantidad_vendida / unidades_por_bulto
-                    nuevo_stock_bulto = stock_bultos_actual - reduccion_bulto
-                    cursor.execute(
-                        "UPDATE Productos SET stock = ?, stock_bultos = ? WHERE id = ?", 
-                        (nuevo_stock, nuevo_stock_bulto, item_id)
-                    )
-                else:
-                    cursor.execute(
-                        "UPDATE Productos SET stock = ? WHERE id = ?", 
-                        (nuevo_stock, item_id)
-                    )
-                # ------------------------------------------------------------------
-                
-                sale_details.append({
-                    'id': item_id, 'nombre': nombre, 'cantidad': cantidad_vendida,
-                    'precio_u': item_data['precio'], 'subtotal': item_data['precio'] * item_data['cantidad']
-                })
-            # --------------------------------------------------------------------
-            
-            total_venta = self.final_total
-            estado = "Completada" 
-            detalle_json = json.dumps(sale_details) 
-            tasa_bcv = self._get_bcv_rate()
-            monto_total_bs = total_venta * tasa_bcv
-            now = datetime.datetime.now()
-            fecha_str = now.strftime("%Y-%m-%d")
-            hora_str = now.strftime("%H:%M:%S")
-
-            cursor.execute("""
-                INSERT INTO Ventas (
-                    fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle, metodo_pago, estado
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (fecha_str, hora_str, total_venta, monto_total_bs, tasa_bcv, detalle_json, metodo_pago, estado))
-            
-            self.conn.commit()
-            
-            messagebox.showinfo("Venta Exitosa", f"Venta de ${total_venta:.2f} finalizada con {metodo_pago}.")
-            self.clear_cart()
-            
-        except Exception as e:
-            self.conn.rollback()
-            messagebox.showerror("Error DB", f"No se pudo registrar la venta. Error: {e}")
+        self.sale_in_progress = True
+        self.db.submit(
+            _finalize_sale_job, self._cart_sale_details(), self.final_total, metodo_pago,
+            on_success=lambda total_venta: self._on_sale_finalized(total_venta, metodo_pago),
+            on_error=self._on_sale_failed
+        )
+
+    def _on_sale_finalized(self, total_venta, metodo_pago):
+        self.sale_in_progress = False
+        messagebox.showinfo("Venta Exitosa", f"Venta de ${total_venta:.2f} finalizada con {metodo_pago}.")
+        self.clear_cart()
+        self.focus_barcode_entry()
+
+    def _on_sale_failed(self, error):
+        self.sale_in_progress = False
+        if isinstance(error, StockInsuficienteError):
+            detalle = "\n".join(
+                f"• '{nombre}': no existe en el inventario." if stock is None
+                else f"• '{nombre}': solo tiene {stock} unidades (en carrito: {cantidad})."
+                for nombre, stock, cantidad in error.faltantes
+            )
+            messagebox.showerror("Error de Stock", f"Stock insuficiente. Venta CANCELADA.\n\n{detalle}")
+        else:
+            messagebox.showerror("Error DB", f"No se pudo registrar la venta. Error: {error}")
+        self.focus_barcode_entry()
 
 
     def cancel_sale_confirm(self):
@@ -525,41 +524,27 @@ class VentasModule(ctk.CTkFrame):
             "Esta acción registrará la compra como Cancelada para auditoría."
         )
 
-        if confirm:
+        if confirm and not self.sale_in_progress:
             self._register_cancelled_sale()
 
     def _register_cancelled_sale(self):
-        # Lógica original...
+        # Se registra para auditoría en el hilo de DB; el carrito se limpia al confirmarse
         metodo_pago = self.payment_method_var.get()
-        try:
-            cursor = self.conn.cursor()
-            sale_details = []
-            for item_id, item_data in self.cart.items():
-                sale_details.append({
-                    'id': item_id, 'nombre': item_data['nombre'], 'cantidad': item_data['cantidad'], 
-                    'precio_u': item_data['precio'], 'subtotal': item_data['precio'] * item_data['cantidad']
-                })
-            total_cancelado = self.final_total
-            estado = "Cancelada" 
-            detalle_json = json.dumps(sale_details) 
-            tasa_bcv = self._get_bcv_rate()
-            monto_total_bs = total_cancelado * tasa_bcv
-            now = datetime.datetime.now()
-            fecha_str = now.strftime("%Y-%m-%d")
-            hora_str = now.strftime("%H:%M:%S")
-            cursor.execute("""
-                INSERT INTO Ventas (
-                    fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle, metodo_pago, estado
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (fecha_str, hora_str, total_cancelado, monto_total_bs, tasa_bcv, detalle_json, metodo_pago, estado))
-            
-            self.conn.commit()
+        self.sale_in_progress = True
+
+        def on_success(_):
+            self.sale_in_progress = False
             messagebox.showinfo("Compra Cancelada", "La compra ha sido cancelada y registrada.")
             self.clear_cart()
-        except Exception as e:
-            self.conn.rollback()
-            messagebox.showerror("Error DB", f"No se pudo registrar la cancelación. Error: {e}")
+
+        def on_error(error):
+            self.sale_in_progress = False
+            messagebox.showerror("Error DB", f"No se pudo registrar la cancelación. Error: {error}")
+
+        self.db.submit(
+            insert_sale_record, self._cart_sale_details(), self.final_total, metodo_pago, "Cancelada",
+            on_success=on_success, on_error=on_error
+        )
             
     def focus_barcode_entry(self):
         # Lógica original...
@@ -584,6 +569,9 @@ class VentasModule(ctk.CTkFrame):
         # Lógica original...
         if not self.cart:
             return True 
+        if self.sale_in_progress:
+            # El cobro ya está en la cola del hilo de DB; close_db() espera a que termine
+            return True
         confirm = messagebox.askyesno(
             "⚠️ VENTA PENDIENTE - CIERRE DE APP ⚠️", 
             f"Hay una venta activa. Si cierra la aplicación ahora, se generará un reporte de **'Cierre Forzado de App'** para auditoría y la venta NO se registrará.\n\n"
@@ -598,36 +586,14 @@ class VentasModule(ctk.CTkFrame):
             return False 
 
     def register_forced_closure_report(self):
-        # Lógica original...
+        # La app se está cerrando: se espera a que el registro quede confirmado
         metodo_pago = self.payment_method_var.get()
         try:
-            cursor = self.conn.cursor()
-            sale_details = []
-            for item_id, item_data in self.cart.items():
-                sale_details.append({
-                    'id': item_id, 'nombre': item_data['nombre'], 'cantidad': item_data['cantidad'], 
-                    'precio_u': item_data['precio'], 'subtotal': item_data['precio'] * item_data['cantidad']
-                })
-            total_transaccion = self.final_total
-            estado = "Cierre Forzado de App" 
-            detalle_json = json.dumps(sale_details) 
-            tasa_bcv = self._get_bcv_rate()
-            monto_total_bs = total_transaccion * tasa_bcv
-            now = datetime.datetime.now()
-            fecha_str = now.strftime("%Y-%m-%d")
-            hora_str = now.strftime("%H:%M:%S")
-
-            cursor.execute("""
-                INSERT INTO Ventas (
-                    fecha, hora, total_venta, monto_total_bs, tasa_bcv, detalle, metodo_pago, estado
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (fecha_str, hora_str, total_transaccion, monto_total_bs, tasa_bcv, detalle_json, metodo_pago, estado))
-            
-            self.conn.commit()
+            self.db.run_sync(
+                insert_sale_record, self._cart_sale_details(), self.final_total, metodo_pago, "Cierre Forzado de App"
+            )
             self.clear_cart() 
         except Exception as e:
-            self.conn.rollback() 
             print(f"Error al registrar el reporte de cierre forzado: {e}")
             
     def synchronize_inventory_counts(self):
@@ -644,6 +610,8 @@ class VentasModule(ctk.CTkFrame):
                     count_updates += 1
             self.conn.commit()
             if count_updates > 0:
+                # Escritura en la conexión compartida: data_version no la detecta
+                self.catalog.invalidate()
                 print(f"Sincronización de inventario completada. {count_updates} productos ajustados.")
         except sqlite3.Error as e:
             self.conn.rollback()
@@ -0,0 +1,425 @@
+# proveedores_tasa.py (PROVEEDORES DE TASA CON RESPALDO, REINTENTOS Y CORTACIRCUITOS)
+#
+# La consulta automática dependía de un único proveedor (el HTML del BCV) y, si
+# fallaba, simplemente esperaba otra hora. Ahora PipelineTasas prueba los
+# proveedores en orden:
+#   1. ProveedorBCVHtml   - página oficial del BCV (div#dolar strong)
+#   2. ProveedorJSON      - fuente alterna que responde JSON (URL configurable)
+#   3. ProveedorManual    - tasa fijada a mano (variable de entorno o fijar())
+# Cada proveedor reintenta con espera exponencial + jitter y tiene su propio
+# cortacircuitos: tras varios fallos seguidos se salta durante un rato.
+# Cada intento queda registrado (latencia y resultado) en PipelineTasas.historial().
+#
+# Los proveedores web reutilizan una sesión HTTP (keep-alive) y envían
+# If-None-Match / If-Modified-Since: si la página no cambió, el servidor responde
+# 304 sin cuerpo y se reutiliza la última tasa sin parsear nada. La tasa se extrae
+# con una expresión regular sobre div#dolar; BeautifulSoup solo se usa si la
+# expresión no encuentra el bloque (por ejemplo, si el BCV cambia el marcado).
+#
+# Para pruebas y mediciones sin internet: benchmarks/servidor_tasa_local.py.
+
+import collections
+import datetime
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+
+# requests, bs4 y urllib3 se importan al hacer la primera consulta (en el hilo de
+# tasa_web), no al arrancar: juntos suman ~150 ms de importación que la caja no
+# necesita para abrir.
+
+# URL Oficial del BCV y fuente alterna (JSON). Ambas se pueden cambiar por entorno.
+BCV_RATE_URL = os.environ.get("TIENDA_BCV_URL", "https://www.bcv.org.ve/")
+ALT_RATE_URL = os.environ.get("TIENDA_TASA_ALTERNA_URL", "")
+ALT_RATE_FIELD = os.environ.get("TIENDA_TASA_ALTERNA_CAMPO", "tasa")
+MANUAL_RATE_ENV = "TIENDA_TASA_MANUAL"
+
+BCV_TIMEOUT_SECONDS = 10
+
+# Reintentos por proveedor: espera = uniforme(0, min(MAX, BASE * 2**intento))
+RETRY_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+# Cortacircuitos: tras N consultas seguidas fallidas (agotados los reintentos)
+# el proveedor se salta durante COOLDOWN segundos
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 15 * 60
+
+# Intentos que se guardan para diagnóstico
+ATTEMPT_HISTORY_SIZE = 200
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class ErrorProveedorTasa(Exception):
+    """Un proveedor no pudo entregar una tasa válida."""
+    pass
+
+
+def _validar_tasa(tasa):
+    if tasa is None or not tasa > 0:
+        raise ErrorProveedorTasa(f"Tasa inválida: {tasa!r}")
+    return tasa
+
+
+# <div ... id="dolar" ...> ... <strong> 36,51230000 </strong>: el <strong> debe estar
+# cerca (2000 caracteres) y sin otro elemento con id en medio (así no se toma el de div#euro).
+_DOLAR_RE = re.compile(
+    r'<div\b[^>]*\bid\s*=\s*["\']?dolar\b[^>]*>(?:(?!\bid\s*=).){0,2000}?<strong[^>]*>\s*([^<]*?)\s*</strong>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _a_float(texto):
+    return float(texto.strip().replace(',', '.'))
+
+
+def extraer_tasa_bcv(html: str) -> float:
+    """Extrae la tasa de div#dolar strong del HTML del BCV (regex, con BeautifulSoup de respaldo)."""
+    match = _DOLAR_RE.search(html)
+    if match:
+        try:
+            return _validar_tasa(_a_float(match.group(1)))
+        except ValueError:
+            pass
+    return extraer_tasa_bcv_soup(html)
+
+
+def extraer_tasa_bcv_soup(html: str) -> float:
+    """Extracción con BeautifulSoup (lenta: parsea el documento completo)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    rate_container = soup.find('div', id='dolar')
+    rate_tag = rate_container.find('strong') if rate_container else None
+    if rate_tag is None:
+        raise ErrorProveedorTasa("No se encontró div#dolar strong en la página del BCV.")
+    try:
+        return _validar_tasa(_a_float(rate_tag.text))
+    except ValueError:
+        raise ErrorProveedorTasa("El valor extraído no es un número válido.")
+
+
+# ===================================================================
+# --- CLIENTE HTTP (KEEP-ALIVE + PETICIONES CONDICIONALES) ---
+# ===================================================================
+
+class ClienteHTTPCondicional:
+    """Sesión persistente que recuerda ETag/Last-Modified y la huella del último cuerpo.
+
+    get() devuelve (cambio, response). cambio=False significa que la página es la
+    misma que la última confirmada con confirmar(): respondió 304, o devolvió el
+    mismo cuerpo (servidores que ignoran los validadores).
+    """
+
+    def __init__(self, verify=True):
+        self._verify = verify
+        self._session = None
+        self._etag = None
+        self._last_modified = None
+        self._huella = None
+        self._pendiente = None
+
+    @property
+    def session(self):
+        """Sesión HTTP, creada en la primera consulta."""
+        if self._session is None:
+            import requests
+            if not self._verify:
+                import urllib3
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            session = requests.Session()
+            session.headers.update(_HEADERS)
+            session.verify = self._verify
+            self._session = session
+        return self._session
+
+    def get(self, url, timeout):
+        headers = {}
+        if self._huella is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and self._huella is not None:
+            return False, response
+        response.raise_for_status()
+
+        huella = hashlib.sha1(response.content).digest()
+        # Los validadores se guardan solo cuando el llamador confirma que pudo usar el cuerpo
+        self._pendiente = (response.headers.get('ETag'), response.headers.get('Last-Modified'), huella)
+        return huella != self._huella, response
+
+    def confirmar(self):
+        """Marca el último cuerpo recibido como válido (sus validadores se usarán en el próximo get)."""
+        if self._pendiente is not None:
+            self._etag, self._last_modified, self._huella = self._pendiente
+            self._pendiente = None
+
+    def olvidar(self):
+        """Descarta los validadores (la próxima petición descarga la página completa)."""
+        self._etag = self._last_modified = self._huella = self._pendiente = None
+
+
+# ===================================================================
+# --- PROVEEDORES ---
+# ===================================================================
+
+class ProveedorTasa:
+    """Fuente de tasa. obtener() devuelve un float o lanza ErrorProveedorTasa."""
+    nombre = "base"
+    # False para fuentes locales que no ganan nada reintentando (ej. la manual)
+    reintentable = True
+
+    def disponible(self) -> bool:
+        """False si el proveedor no está configurado (se salta sin contar como fallo)."""
+        return True
+
+    def obtener(self) -> float:
+        raise NotImplementedError
+
+
+class ProveedorBCVHtml(ProveedorTasa):
+    nombre = "BCV"
+
+    def __init__(self, url=None, timeout=BCV_TIMEOUT_SECONDS):
+        self.url = url
+        self.timeout = timeout
+        # El certificado del BCV suele venir con la cadena incompleta (de ahí verify=False)
+        self._cliente = ClienteHTTPCondicional(verify=False)
+        self._ultima_tasa = None
+
+    def obtener(self) -> float:
+        import requests
+        try:
+            cambio, response = self._cliente.get(self.url or BCV_RATE_URL, self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise ErrorProveedorTasa(f"No se pudo conectar/obtener la tasa. {e}")
+
+        if not cambio and self._ultima_tasa is not None:
+            return self._ultima_tasa
+
+        tasa = extraer_tasa_bcv(response.text)
+        self._ultima_tasa = tasa
+        self._cliente.confirmar()
+        return tasa
+
+
+class ProveedorJSON(ProveedorTasa):
+    """Fuente alterna: un endpoint JSON con la tasa en 'campo' (admite rutas 'a.b.c')."""
+    nombre = "Alterna"
+
+    def __init__(self, url=None, campo=None, timeout=BCV_TIMEOUT_SECONDS):
+        self.url = url
+        self.campo = campo
+        self.timeout = timeout
+        self._cliente = ClienteHTTPCondicional()
+        self._ultima_tasa = None
+
+    def disponible(self) -> bool:
+        return bool(self.url or ALT_RATE_URL)
+
+    def obtener(self) -> float:
+        import requests
+        try:
+            cambio, response = self._cliente.get(self.url or ALT_RATE_URL, self.timeout)
+            if not cambio and self._ultima_tasa is not None:
+                return self._ultima_tasa
+            valor = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise ErrorProveedorTasa(f"Fuente alterna no disponible. {e}")
+
+        for clave in (self.campo or ALT_RATE_FIELD).split('.'):
+            if not isinstance(valor, dict) or clave not in valor:
+                raise ErrorProveedorTasa(f"La respuesta de la fuente alterna no tiene '{clave}'.")
+            valor = valor[clave]
+        try:
+            tasa = _validar_tasa(_a_float(str(valor)))
+        except ValueError:
+            raise ErrorProveedorTasa(f"Valor no numérico en la fuente alterna: {valor!r}")
+        self._ultima_tasa = tasa
+        self._cliente.confirmar()
+        return tasa
+
+
+class ProveedorManual(ProveedorTasa):
+    """Último recurso: una tasa fijada a mano (fijar() o la variable TIENDA_TASA_MANUAL)."""
+    nombre = "Manual"
+    reintentable = False
+
+    def __init__(self):
+        self._tasa = None
+
+    def fijar(self, tasa):
+        """Fija (o con None, quita) la tasa manual de respaldo."""
+        self._tasa = _validar_tasa(tasa) if tasa is not None else None
+
+    def _valor(self):
+        if self._tasa is not None:
+            return self._tasa
+        texto = os.environ.get(MANUAL_RATE_ENV, "").strip().replace(',', '.')
+        return float(texto) if texto else None
+
+    def disponible(self) -> bool:
+        try:
+            return self._valor() is not None
+        except ValueError:
+            return False
+
+    def obtener(self) -> float:
+        try:
+            return _validar_tasa(self._valor())
+        except ValueError:
+            raise ErrorProveedorTasa(f"{MANUAL_RATE_ENV} no es un número válido.")
+
+
+# ===================================================================
+# --- CORTACIRCUITOS E HISTORIAL ---
+# ===================================================================
+
+class Cortacircuitos:
+    """Abierto tras 'umbral' fallos seguidos; pasado 'espera' deja probar otra vez (semiabierto).
+
+    Un fallo es una consulta que agotó sus reintentos, no cada intento individual.
+    """
+
+    def __init__(self, umbral=BREAKER_FAILURE_THRESHOLD, espera=BREAKER_COOLDOWN_SECONDS, reloj=time.monotonic):
+        self.umbral = umbral
+        self.espera = espera
+        self._reloj = reloj
+        self.fallos = 0
+        self.abierto_desde = None
+
+    @property
+    def estado(self):
+        if self.abierto_desde is None:
+            return "cerrado"
+        if self._reloj() - self.abierto_desde >= self.espera:
+            return "semiabierto"
+        return "abierto"
+
+    def permite(self) -> bool:
+        return self.estado != "abierto"
+
+    def registrar_exito(self):
+        self.fallos = 0
+        self.abierto_desde = None
+
+    def registrar_fallo(self):
+        self.fallos += 1
+        # En semiabierto un solo fallo vuelve a abrir
+        if self.fallos >= self.umbral or self.abierto_desde is not None:
+            self.abierto_desde = self._reloj()
+
+
+IntentoTasa = collections.namedtuple(
+    "IntentoTasa", "fecha proveedor intento latencia_ms resultado tasa error"
+)
+
+
+# ===================================================================
+# --- PIPELINE ---
+# ===================================================================
+
+class PipelineTasas:
+    """Prueba los proveedores en orden hasta obtener una tasa. Seguro entre hilos."""
+
+    def __init__(self, proveedores, intentos=RETRY_ATTEMPTS, espera_base=RETRY_BASE_SECONDS,
+                 espera_max=RETRY_MAX_SECONDS, dormir=time.sleep, azar=random.uniform, **breaker_kwargs):
+        self.proveedores = list(proveedores)
+        self.intentos = intentos
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self._dormir = dormir
+        self._azar = azar
+        self._breakers = {p.nombre: Cortacircuitos(**breaker_kwargs) for p in self.proveedores}
+        self._historial = collections.deque(maxlen=ATTEMPT_HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self.ultimo_proveedor = None
+
+    def obtener_tasa(self):
+        """Devuelve la tasa del primer proveedor que responda, o None si todos fallan."""
+        for proveedor in self.proveedores:
+            if not proveedor.disponible():
+                continue
+
+            breaker = self._breakers[proveedor.nombre]
+            with self._lock:
+                permitido = breaker.permite()
+            if not permitido:
+                self._registrar(proveedor, 0, 0.0, "omitido", None, "cortacircuitos abierto")
+                continue
+
+            tasa = self._intentar(proveedor, breaker)
+            if tasa is not None:
+                self.ultimo_proveedor = proveedor.nombre
+                return tasa
+
+        print("Tasa BCV: ningún proveedor entregó una tasa.")
+        return None
+
+    def _intentar(self, proveedor, breaker):
+        intentos = self.intentos if proveedor.reintentable else 1
+        for intento in range(1, intentos + 1):
+            inicio = time.perf_counter()
+            try:
+                tasa = proveedor.obtener()
+            except Exception as e:
+                latencia_ms = (time.perf_counter() - inicio) * 1000
+                self._registrar(proveedor, intento, latencia_ms, "error", None, str(e))
+                print(f"Tasa BCV [{proveedor.nombre}] intento {intento}/{intentos}: {e}")
+                if intento < intentos:
+                    self._dormir(self.espera_reintento(intento))
+                    continue
+                with self._lock:
+                    breaker.registrar_fallo()
+                return None
+
+            latencia_ms = (time.perf_counter() - inicio) * 1000
+            self._registrar(proveedor, intento, latencia_ms, "ok", tasa, None)
+            with self._lock:
+                breaker.registrar_exito()
+            return tasa
+        return None
+
+    def espera_reintento(self, intento):
+        """Espera exponencial con jitter completo antes del intento 'intento + 1'."""
+        return self._azar(0, min(self.espera_max, self.espera_base * (2 ** (intento - 1))))
+
+    def _registrar(self, proveedor, intento, latencia_ms, resultado, tasa, error):
+        fecha = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._historial.append(IntentoTasa(fecha, proveedor.nombre, intento, latencia_ms, resultado, tasa, error))
+
+    def historial(self):
+        """Últimos intentos (más antiguos primero)."""
+        with self._lock:
+            return list(self._historial)
+
+    def estado_cortacircuitos(self):
+        with self._lock:
+            return {nombre: breaker.estado for nombre, breaker in self._breakers.items()}
+
+
+_pipeline = None
+_proveedor_manual = ProveedorManual()
+
+
+def get_manual_provider() -> ProveedorManual:
+    """[API Pública] Proveedor manual de respaldo (para fijar una tasa cuando la web no responde)."""
+    return _proveedor_manual
+
+
+def get_rate_pipeline() -> PipelineTasas:
+    """[API Pública] Pipeline de proveedores compartido por la app."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = PipelineTasas([ProveedorBCVHtml(), ProveedorJSON(), _proveedor_manual])
+    return _pipeline
@@ -0,0 +1,134 @@
+# servicio_tasa.py (TASA BCV EN MEMORIA CON NOTIFICACIÓN DE CAMBIOS)
+#
+# Antes, Ventas, Devolución y Consulta de Precio consultaban TasasBCV en cada
+# update_totals() (es decir, en cada escaneo). Ahora la tasa vigente vive aquí:
+# se lee de la base una sola vez y cada tasa nueva que se guarda se publica.
+# Los suscriptores (sidebar, totales, consulta de precio) solo se redibujan
+# cuando la tasa cambia de verdad.
+#
+# El guardado (manual o de la consulta horaria) también pasa por aquí, así que la
+# actualización programada no necesita construir la pantalla de Tasa BCV.
+
+import datetime
+import sqlite3
+
+from utils import get_connection, get_db_executor
+
+# Diferencias menores se consideran la misma tasa (comparación de floats)
+RATE_TOLERANCE = 0.000001
+
+
+def misma_tasa(tasa: float, anterior) -> bool:
+    """True si 'tasa' no difiere de 'anterior' (None: no hay tasa registrada)."""
+    return anterior is not None and abs(tasa - anterior) < RATE_TOLERANCE
+
+
+def ultima_tasa_registrada(conn):
+    """Última tasa de TasasBCV, o None si no hay ninguna."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
+    result = cursor.fetchone()
+    return result[0] if result else None
+
+
+def registrar_tasa(conn, tasa: float) -> str:
+    """Inserta la tasa con la fecha y hora actuales y devuelve esa fecha_registro.
+
+    No hace commit: se usa dentro de trabajos de DBExecutor o de la línea de comandos.
+    """
+    fecha_registro = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute("INSERT INTO TasasBCV (tasa, fecha_registro) VALUES (?, ?)", (tasa, fecha_registro))
+    return fecha_registro
+
+
+class ServicioTasaBCV:
+    """Tasa BCV vigente del proceso. Se usa solo desde el hilo de Tk."""
+
+    def __init__(self):
+        self._tasa = None
+        self._loaded = False
+        self._subscribers = []
+
+    def get(self, default=None):
+        """Devuelve la tasa vigente (o 'default' si no hay ninguna registrada)."""
+        if not self._loaded:
+            self.refresh_from_db()
+        return self._tasa if self._tasa is not None else default
+
+    def subscribe(self, callback):
+        """Registra callback(tasa) para cada cambio de tasa."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, tasa):
+        """Fija la tasa vigente y notifica a los suscriptores si cambió."""
+        self._loaded = True
+        if tasa is not None and misma_tasa(tasa, self._tasa):
+            return
+        if tasa is None and self._tasa is None:
+            return
+
+        self._tasa = tasa
+        for callback in list(self._subscribers):
+            try:
+                callback(tasa)
+            except Exception as e:
+                print(f"Error al notificar cambio de tasa BCV: {e}")
+
+    def refresh_from_db(self):
+        """Relee la última tasa registrada (por ejemplo, si otra instancia la guardó)."""
+        try:
+            tasa = ultima_tasa_registrada(get_connection())
+        except (sqlite3.Error, AttributeError) as e:
+            print(f"Error DB al obtener tasa BCV: {e}")
+            return
+        self.publish(tasa)
+
+    def save(self, tasa, on_success=None, on_error=None):
+        """Registra 'tasa' en TasasBCV (hilo de DB) y la publica al confirmarse.
+
+        on_success(tasa) y on_error(e) se llaman en el hilo de Tk.
+        """
+        def on_saved(_):
+            self.publish(tasa)
+            if on_success is not None:
+                on_success(tasa)
+
+        def on_failed(e):
+            if on_error is not None:
+                on_error(e)
+            else:
+                print(f"Error DB al guardar la tasa BCV: {e}")
+
+        get_db_executor().submit(registrar_tasa, tasa, on_success=on_saved, on_error=on_failed)
+
+    def save_if_changed(self, tasa, on_done=None) -> bool:
+        """Guarda 'tasa' solo si difiere de la vigente (la consulta horaria no duplica registros).
+
+        on_done(tasa) se llama al terminar, se haya guardado o no. Devuelve True si se guarda.
+        """
+        anterior = self.get()
+        if misma_tasa(tasa, anterior):
+            print(f"BCV Auto Update: Tasa sin cambio ({tasa}). No se generó nuevo registro (reporte).")
+            if on_done is not None:
+                on_done(tasa)
+            return False
+
+        print(f"BCV Auto Update: Tasa cambiada de {anterior} a {tasa}. Guardando nuevo registro.")
+        self.save(tasa, on_success=on_done)
+        return True
+
+
+_servicio = None
+
+
+def get_rate_service() -> ServicioTasaBCV:
+    """[API Pública] Servicio de tasa BCV compartido por todos los módulos."""
+    global _servicio
+    if _servicio is None:
+        _servicio = ServicioTasaBCV()
+    return _servicio
@@ -0,0 +1,132 @@
+# tasa_web.py (CONSULTA DE LA TASA BCV EN SEGUNDO PLANO)
+#
+# La consulta web (requests.get con timeout de 10 s + parseo del HTML) se hacía en
+# el hilo de Tk: al arrancar, antes del primer dibujo, y cada hora en plena venta.
+# Si la página del BCV estaba lenta o caída, la caja se congelaba.
+# Ahora la descarga corre en un hilo aparte y el resultado llega al hilo de Tk
+# con el mismo esquema que DBExecutor (cola + after()).
+#
+# Qué se consulta (BCV, fuente alterna, tasa manual, reintentos) lo decide
+# proveedores_tasa.PipelineTasas; aquí solo se mueve la consulta fuera del hilo de Tk.
+
+import queue
+import threading
+
+from proveedores_tasa import ErrorProveedorTasa, ProveedorBCVHtml, get_rate_pipeline
+
+# Cada cuánto el hilo de Tk revisa si la consulta terminó (ms)
+TK_POLL_INTERVAL_MS = 100
+
+
+def fetch_bcv_rate(url=None):
+    """Consulta solo la página del BCV (un intento) y devuelve la tasa o None. Bloquea."""
+    try:
+        return ProveedorBCVHtml(url).obtener()
+    except ErrorProveedorTasa as e:
+        print(f"BCV API ERROR: {e}")
+        return None
+
+
+class ConsultaTasaWeb:
+    """Consulta la tasa en un hilo aparte y entrega el resultado en el hilo de Tk.
+
+    Por defecto usa el pipeline de proveedores (BCV, alterna, manual).
+
+    Si llega una solicitud mientras otra consulta está en curso, no se abre una
+    segunda conexión: el callback se suma a la consulta pendiente.
+    """
+
+    def __init__(self, fetch=None):
+        # 'fetch' es una función sin argumentos que devuelve la tasa o None
+        self._fetch = fetch or (lambda: get_rate_pipeline().obtener_tasa())
+        self._results = queue.Queue()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._tk_root = None
+        self._polling = False
+
+    def attach_tk(self, widget):
+        """Entrega los resultados en el hilo de Tk. Sin Tk se llaman desde el hilo de consulta."""
+        self._tk_root = widget.winfo_toplevel()
+
+    @property
+    def in_progress(self):
+        with self._lock:
+            return bool(self._callbacks)
+
+    def request(self, callback=None) -> bool:
+        """Inicia una consulta (o se suma a la que está en curso).
+
+        callback(tasa) recibe la tasa o None si falló. Devuelve True si se inició
+        una consulta nueva.
+        """
+        with self._lock:
+            start = not self._callbacks
+            self._callbacks.append(callback)
+
+        if start:
+            threading.Thread(target=self._run, name="bcv-fetch", daemon=True).start()
+            if self._tk_root is not None and not self._polling:
+                self._polling = True
+                self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+        return start
+
+    def _run(self):
+        try:
+            tasa = self._fetch()
+        except Exception as e:
+            print(f"BCV API ERROR: Fallo inesperado en la consulta. {e}")
+            tasa = None
+
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+            if self._tk_root is not None:
+                # Dentro del lock: _poll_tk nunca ve "sin consulta y cola vacía" a mitad de la entrega
+                self._results.put((tasa, callbacks))
+                return
+
+        self._deliver(tasa, callbacks)
+
+    @staticmethod
+    def _deliver(tasa, callbacks):
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(tasa)
+            except Exception as e:
+                print(f"Error en callback de tasa BCV: {e}")
+
+    def _poll_tk(self):
+        while True:
+            try:
+                tasa, callbacks = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(tasa, callbacks)
+
+        # Solo se sigue sondeando mientras haya una consulta en curso o resultados sin entregar
+        with self._lock:
+            idle = not self._callbacks and self._results.empty()
+        if idle:
+            self._polling = False
+            return
+        try:
+            self._tk_root.after(TK_POLL_INTERVAL_MS, self._poll_tk)
+        except Exception:
+            # La ventana principal ya fue destruida
+            self._polling = False
+            self._tk_root = None
+
+
+_consulta = None
+
+
+def get_rate_fetcher(widget=None) -> ConsultaTasaWeb:
+    """[API Pública] Consulta web de la tasa BCV compartida por la app."""
+    global _consulta
+    if _consulta is None:
+        _consulta = ConsultaTasaWeb()
+    if widget is not None and _consulta._tk_root is None:
+        _consulta.attach_tk(widget)
+    return _consulta
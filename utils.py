@@ -3,6 +3,7 @@
 import sqlite3
 from tkinter import messagebox 
 import os
+import threading
 # Importar 'appdirs' para obtener la ruta de datos de la aplicación de forma multiplataforma
 try:
     from appdirs import user_local_dir
@@ -16,6 +17,10 @@ except ImportError:
 import json
 import hashlib
 import datetime
+import calendar
+
+from db_executor import DBExecutor
+from lector_reportes import LectorReportes
 
 # --- CONFIGURACIÓN DE CONSTANTES ---
 DB_NAME = "darklord.db"
@@ -113,76 +118,154 @@ def verify_password(input_password: str) -> bool:
     return input_password == ADMIN_PASSWORD_RAW
 
 
-def setup_db() -> sqlite3.Connection:
-    """Inicializa y conecta a la base de datos en la ruta fija determinada."""
-    final_db_path = get_db_path_for_connection()
-    
-    if final_db_path is None:
-        return None 
+# ===================================================================
+# --- CONEXIÓN COMPARTIDA DEL PROCESO ---
+# ===================================================================
+
+# Una sola conexión por proceso: todos los módulos reciben la misma instancia,
+# de modo que el esquema se inicializa una sola vez y la caché de páginas se comparte.
+_shared_conn = None
+_shared_conn_lock = threading.Lock()
+# Hilo dedicado para escrituras y consultas pesadas (ver db_executor.py)
+_db_executor = None
+# Hilo lector para cargar reportes y exportar sin bloquear Tk (ver lector_reportes.py)
+_report_reader = None
+
+
+# ===================================================================
+# --- PERFIL DE RENDIMIENTO (WAL + PRAGMAS) ---
+# ===================================================================
+
+# En WAL los lectores no bloquean al escritor y, con synchronous=NORMAL, un commit
+# solo escribe en el WAL (el fsync se hace en el checkpoint). Una caída de energía
+# puede perder las últimas transacciones confirmadas, pero la base nunca se corrompe.
+DB_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),          # ~16 MiB de caché de páginas (valor negativo = KiB)
+    ("mmap_size", 64 * 1024 * 1024), # lecturas vía memoria mapeada
+    ("temp_store", "MEMORY"),        # tablas temporales de ORDER BY/GROUP BY en RAM
+    ("journal_size_limit", 8 * 1024 * 1024),  # tras un checkpoint el WAL se recorta a 8 MiB
+)
+
+# Política de checkpoint: un PASSIVE periódico (no bloquea a nadie) y un TRUNCATE
+# cuando el WAL supera el límite, para que el archivo -wal no crezca sin control.
+CHECKPOINT_INTERVAL_SECONDS = 60
+CHECKPOINT_TRUNCATE_BYTES = 16 * 1024 * 1024
+
+_checkpoint_thread = None
+_checkpoint_stop = threading.Event()
+
 
+def apply_pragmas(conn, pragmas=DB_PRAGMAS):
+    """Aplica el perfil de PRAGMAs a una conexión recién abierta."""
+    for nombre, valor in pragmas:
+        conn.execute(f"PRAGMA {nombre} = {valor}")
+
+
+def _checkpoint_worker(db_path: str):
+    """Hilo en segundo plano que mantiene acotado el archivo WAL."""
+    wal_path = db_path + "-wal"
     try:
-        conn = sqlite3.connect(final_db_path) 
-        cursor = conn.cursor()
-        
-        # 1. Crear la tabla Productos
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Productos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo_barras TEXT UNIQUE NOT NULL,
-                nombre TEXT NOT NULL,
-                descripcion TEXT,
-                precio_compra REAL NOT NULL,      
-                precio_venta REAL NOT NULL,      
-                stock INTEGER NOT NULL,          
-                proveedor TEXT,
-                fecha_registro TEXT,
-                stock_bultos REAL,              
-                unidades_por_bulto REAL NOT NULL,
-                precio_bulto REAL NOT NULL,     
-                porcentaje_ganancia REAL NOT NULL 
-            )
-        """)
-
-
-        # 2. Crear la tabla Ventas
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Ventas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fecha TEXT NOT NULL,
-                hora TEXT NOT NULL,
-                total_venta REAL NOT NULL,
-                detalle TEXT,                      
-                metodo_pago TEXT,                  
-                estado TEXT NOT NULL,
-                monto_total_bs REAL,
-                tasa_bcv REAL
-            )
-        """)
-
-        # 3. Crear la tabla AvancesEfectivo
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS AvancesEfectivo (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                monto_entregado REAL NOT NULL,
-                comision REAL NOT NULL,
-                monto_total REAL NOT NULL,
-                metodo_pago TEXT NOT NULL,
-                fecha_hora TEXT NOT NULL,
-                estado TEXT NOT NULL
-            )
-        """)
-
-        # 4. Crear la tabla TasasBCV
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS TasasBCV (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tasa REAL NOT NULL,
-                fecha_registro TEXT NOT NULL
-            )
-        """)
-        
-        # 5. Crear la tabla RecargasTelefonicas
-        cursor.execute("""
+        conn = sqlite3.connect(db_path, timeout=1)
+    except sqlite3.Error as e:
+        print(f"Checkpoint: no se pudo abrir la base de datos: {e}")
+        return
+
+    try:
+        while not _checkpoint_stop.wait(CHECKPOINT_INTERVAL_SECONDS):
+            try:
+                wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+                modo = "TRUNCATE" if wal_size > CHECKPOINT_TRUNCATE_BYTES else "PASSIVE"
+                conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+            except sqlite3.Error as e:
+                # Un checkpoint ocupado no es un error grave: se reintenta en el próximo ciclo
+                print(f"Checkpoint omitido: {e}")
+    finally:
+        conn.close()
+
+
+def _start_checkpoint_thread(db_path: str):
+    global _checkpoint_thread
+    if _checkpoint_thread is not None:
+        return
+    _checkpoint_stop.clear()
+    _checkpoint_thread = threading.Thread(
+        target=_checkpoint_worker, args=(db_path,), name="wal-checkpoint", daemon=True
+    )
+    _checkpoint_thread.start()
+
+
+def _stop_checkpoint_thread():
+    global _checkpoint_thread
+    if _checkpoint_thread is None:
+        return
+    _checkpoint_stop.set()
+    _checkpoint_thread.join(timeout=5)
+    _checkpoint_thread = None
+
+
+def _create_schema(cursor):
+    """Crea las tablas base si aún no existen."""
+    # 1. Crear la tabla Productos
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codigo_barras TEXT UNIQUE NOT NULL,
+            nombre TEXT NOT NULL,
+            descripcion TEXT,
+            precio_compra REAL NOT NULL,      
+            precio_venta REAL NOT NULL,      
+            stock INTEGER NOT NULL,          
+            proveedor TEXT,
+            fecha_registro TEXT,
+            stock_bultos REAL,              
+            unidades_por_bulto REAL NOT NULL,
+            precio_bulto REAL NOT NULL,     
+            porcentaje_ganancia REAL NOT NULL 
+        )
+    """)
+
+
+    # 2. Crear la tabla Ventas
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL,
+            hora TEXT NOT NULL,
+            total_venta REAL NOT NULL,
+            detalle TEXT,                      
+            metodo_pago TEXT,                  
+            estado TEXT NOT NULL,
+            monto_total_bs REAL,
+            tasa_bcv REAL
+        )
+    """)
+
+    # 3. Crear la tabla AvancesEfectivo
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS AvancesEfectivo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            monto_entregado REAL NOT NULL,
+            comision REAL NOT NULL,
+            monto_total REAL NOT NULL,
+            metodo_pago TEXT NOT NULL,
+            fecha_hora TEXT NOT NULL,
+            estado TEXT NOT NULL
+        )
+    """)
+
+    # 4. Crear la tabla TasasBCV
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TasasBCV (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tasa REAL NOT NULL,
+            fecha_registro TEXT NOT NULL
+        )
+    """)
+    
+    # 5. Crear la tabla RecargasTelefonicas
+    cursor.execute("""
         CREATE TABLE IF NOT EXISTS RecargasTelefonicas (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             numero TEXT NOT NULL,
@@ -192,10 +275,543 @@ def setup_db() -> sqlite3.Connection:
             fecha_hora TEXT NOT NULL,
             estado TEXT NOT NULL
         )
-       """)
+    """)
+
+
+# ===================================================================
+# --- MIGRACIONES DE ESQUEMA (PRAGMA user_version) ---
+# ===================================================================
+
+def _backfill_venta_detalle(cursor):
+    """Migra el JSON histórico de Ventas.detalle a filas de VentaDetalle.
+
+    El JSON no guardaba el costo, así que se toma el precio de compra actual del
+    producto (si todavía existe). Los registros con JSON inválido se omiten.
+    """
+    read_cursor = cursor.connection.cursor()
+    read_cursor.execute("SELECT id, detalle FROM Ventas WHERE detalle IS NOT NULL AND detalle != ''")
+    
+    while True:
+        rows = read_cursor.fetchmany(500)
+        if not rows:
+            break
+        
+        lines = []
+        for venta_id, detalle_json in rows:
+            try:
+                sale_lines = []
+                for p in json.loads(detalle_json):
+                    cantidad = p.get('cantidad', 0)
+                    precio_u = p.get('precio_u', 0.0)
+                    subtotal = p.get('subtotal', precio_u * cantidad)
+                    sale_lines.append((venta_id, p.get('id'), p.get('nombre', ''), cantidad, precio_u, subtotal))
+            except (ValueError, TypeError, AttributeError):
+                print(f"Migración VentaDetalle: detalle inválido en la venta {venta_id}, se omite.")
+                continue
+            lines.extend(sale_lines)
         
+        cursor.executemany("""
+            INSERT INTO VentaDetalle (venta_id, producto_id, nombre, cantidad, precio_unitario, costo_unitario, subtotal)
+            VALUES (?, ?, ?, ?, ?, (SELECT precio_compra FROM Productos WHERE id = ?), ?)
+        """, [(v, pid, n, c, pu, pid, st) for v, pid, n, c, pu, st in lines])
+
+
+# ===================================================================
+# --- RESUMEN DIARIO (ResumenDiario) ---
+# ===================================================================
+
+# Tasa vigente en {col}: la última de TasasBCV con fecha_registro <= {col} (en empates,
+# la de mayor id) o, si no hay ninguna anterior, la última registrada.
+RATE_ASOF_SQL = """
+    COALESCE(
+        (SELECT t.tasa FROM TasasBCV t
+         WHERE t.fecha_registro <= {col}
+         ORDER BY t.fecha_registro DESC, t.id DESC LIMIT 1),
+        (SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1)
+    )
+"""
+
+# Aporte de cada movimiento al resumen: (fecha, concepto, metodo_pago, bs, usd,
+# comision_bs, comision_usd). {x} es NEW/OLD en los triggers o el nombre de la tabla
+# en la reconstrucción; {desde} es "" o "FROM tabla WHERE ...". Los estados que no
+# cuentan (ventas canceladas, avances/recargas no concretados) dan concepto NULL.
+# Avances y recargas se convierten a USD con la tasa vigente en su fecha_hora; el
+# "LIMIT -1" evita que SQLite aplane la subconsulta y busque la tasa más de una vez.
+_DAILY_SUMMARY_SOURCES = {
+    "Ventas": """
+        SELECT {x}.fecha AS fecha,
+               CASE {x}.estado WHEN 'Completada' THEN 'venta' WHEN 'Devolucion' THEN 'devolucion' END AS concepto,
+               COALESCE({x}.metodo_pago, '') AS metodo_pago,
+               COALESCE({x}.monto_total_bs, 0) AS bs,
+               COALESCE({x}.total_venta, 0) AS usd,
+               0 AS comision_bs,
+               0 AS comision_usd
+        {desde}
+    """,
+    "AvancesEfectivo": """
+        SELECT fecha, concepto, metodo_pago, bs,
+               CASE WHEN tasa > 0 THEN bs / tasa ELSE 0 END AS usd,
+               comision_bs,
+               CASE WHEN tasa > 0 THEN comision_bs / tasa ELSE 0 END AS comision_usd
+        FROM (SELECT COALESCE({x}.fecha, substr({x}.fecha_hora, 1, 10)) AS fecha,
+                     CASE WHEN {x}.estado = 'Concretado' THEN 'avance' END AS concepto,
+                     COALESCE({x}.metodo_pago, '') AS metodo_pago,
+                     {x}.monto_entregado AS bs,
+                     {x}.comision AS comision_bs,
+                     {tasa} AS tasa
+              {desde} LIMIT -1)
+    """,
+    "RecargasTelefonicas": """
+        SELECT fecha, concepto, metodo_pago, bs,
+               CASE WHEN tasa > 0 THEN bs / tasa ELSE 0 END AS usd,
+               comision_bs,
+               CASE WHEN tasa > 0 THEN comision_bs / tasa ELSE 0 END AS comision_usd
+        FROM (SELECT COALESCE({x}.fecha, substr({x}.fecha_hora, 1, 10)) AS fecha,
+                     CASE WHEN {x}.estado = 'Concretado' THEN 'recarga' END AS concepto,
+                     '' AS metodo_pago,
+                     {x}.monto_base AS bs,
+                     {x}.comision AS comision_bs,
+                     {tasa} AS tasa
+              {desde} LIMIT -1)
+    """,
+}
+
+_DAILY_SUMMARY_CONCEPTS = {"AvancesEfectivo": "avance", "RecargasTelefonicas": "recarga"}
+
+
+def _daily_summary_source(tabla, x, desde=""):
+    return _DAILY_SUMMARY_SOURCES[tabla].format(
+        x=x, desde=desde, tasa=RATE_ASOF_SQL.format(col=f"{x}.fecha_hora")
+    )
+
+
+def _daily_summary_apply_sql(tabla, x, signo):
+    """Suma (signo 1) o resta (signo -1) el aporte de la fila NEW/OLD en ResumenDiario."""
+    return f"""
+        INSERT INTO ResumenDiario (fecha, concepto, metodo_pago, total_bs, total_usd,
+                                   comision_bs, comision_usd, transacciones)
+        SELECT fecha, concepto, metodo_pago, {signo} * bs, {signo} * usd,
+               {signo} * comision_bs, {signo} * comision_usd, {signo}
+        FROM ({_daily_summary_source(tabla, x)})
+        WHERE concepto IS NOT NULL
+        ON CONFLICT (fecha, concepto, metodo_pago) DO UPDATE SET
+            total_bs = total_bs + excluded.total_bs,
+            total_usd = total_usd + excluded.total_usd,
+            comision_bs = comision_bs + excluded.comision_bs,
+            comision_usd = comision_usd + excluded.comision_usd,
+            transacciones = transacciones + excluded.transacciones;
+    """
+
+
+def _daily_summary_rebuild_sql(tabla, where):
+    """INSERT que agrega desde cero los movimientos de 'tabla' que cumplen 'where'."""
+    desde = f"FROM {tabla} WHERE {where}"
+    return f"""
+        INSERT INTO ResumenDiario (fecha, concepto, metodo_pago, total_bs, total_usd,
+                                   comision_bs, comision_usd, transacciones)
+        SELECT fecha, concepto, metodo_pago, TOTAL(bs), TOTAL(usd),
+               TOTAL(comision_bs), TOTAL(comision_usd), COUNT(*)
+        FROM ({_daily_summary_source(tabla, tabla, desde)})
+        WHERE concepto IS NOT NULL
+        GROUP BY fecha, concepto, metodo_pago
+    """
+
+
+def _daily_summary_triggers():
+    """Triggers que mantienen ResumenDiario en la misma transacción que cada escritura."""
+    triggers = []
+    for tabla in _DAILY_SUMMARY_SOURCES:
+        quitar_vacias = f"""
+            DELETE FROM ResumenDiario
+            WHERE transacciones <= 0
+              AND fecha IN (SELECT fecha FROM ({_daily_summary_source(tabla, "OLD")}));
+        """
+        triggers += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla.lower()}_ins_resumen AFTER INSERT ON {tabla}
+            BEGIN
+                {_daily_summary_apply_sql(tabla, "NEW", 1)}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla.lower()}_upd_resumen AFTER UPDATE ON {tabla}
+            BEGIN
+                {_daily_summary_apply_sql(tabla, "OLD", -1)}
+                {_daily_summary_apply_sql(tabla, "NEW", 1)}
+                {quitar_vacias}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla.lower()}_del_resumen AFTER DELETE ON {tabla}
+            BEGIN
+                {_daily_summary_apply_sql(tabla, "OLD", -1)}
+                {quitar_vacias}
+            END
+            """,
+        ]
+
+    # Una tasa nueva normalmente se registra "ahora" y no cambia la tasa vigente de
+    # ningún movimiento anterior. Solo si llega con una fecha atrasada, o si hay
+    # movimientos anteriores a la primera tasa (que usan la última registrada), se
+    # recalculan los días afectados de avances y recargas.
+    cuerpo = []
+    for tabla, concepto in _DAILY_SUMMARY_CONCEPTS.items():
+        dias = f"""
+            SELECT DISTINCT fecha FROM {tabla}
+            WHERE (fecha >= substr(NEW.fecha_registro, 1, 10) AND fecha_hora >= NEW.fecha_registro)
+               OR (fecha <= substr((SELECT MIN(fecha_registro) FROM TasasBCV), 1, 10)
+                   AND fecha_hora < (SELECT MIN(fecha_registro) FROM TasasBCV))
+        """
+        cuerpo.append(f"DELETE FROM ResumenDiario WHERE concepto = '{concepto}' AND fecha IN ({dias});")
+        cuerpo.append(_daily_summary_rebuild_sql(tabla, f"fecha IN ({dias})") + ";")
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasasbcv_ins_resumen AFTER INSERT ON TasasBCV
+        BEGIN
+            {"".join(cuerpo)}
+        END
+    """)
+    return triggers
+
+
+def _rebuild_daily_summary(cursor, fecha_desde=None, fecha_hasta=None):
+    """Recalcula ResumenDiario desde las tablas de movimientos (todo o un rango de fechas)."""
+    fecha_desde = fecha_desde or "0000-00-00"
+    fecha_hasta = fecha_hasta or "9999-99-99"
+    cursor.execute("DELETE FROM ResumenDiario WHERE fecha BETWEEN ? AND ?", (fecha_desde, fecha_hasta))
+    for tabla in _DAILY_SUMMARY_SOURCES:
+        fecha = "fecha" if tabla == "Ventas" else "COALESCE(fecha, substr(fecha_hora, 1, 10))"
+        cursor.execute(_daily_summary_rebuild_sql(tabla, f"{fecha} BETWEEN ? AND ?"), (fecha_desde, fecha_hasta))
+
+
+def rebuild_daily_summary(conn, fecha_desde=None, fecha_hasta=None):
+    """[API Pública] Reconstruye ResumenDiario (por ejemplo, tras corregir datos a mano o tasas).
+
+    Sin fechas reconstruye todo. Hace commit.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        _rebuild_daily_summary(cursor, fecha_desde, fecha_hasta)
         conn.commit()
-        return conn
-    except Exception as e:
-        print(f"Error al inicializar la base de datos: {e}")
-        return None
\ No newline at end of file
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# Cada migración es (versión, descripción, pasos). Un paso es una sentencia SQL
+# o una función que recibe el cursor. Las migraciones ya publicadas NO se editan:
+# cualquier cambio nuevo se agrega al final con la siguiente versión.
+MIGRATIONS = [
+    (1, "Columnas de fecha indexables e índices en los filtros de reportes y exportación", [
+        # Fecha y epoch propios en avances y recargas: se indexan directamente en vez
+        # de indexar la expresión substr(fecha_hora, 1, 10)
+        "ALTER TABLE AvancesEfectivo ADD COLUMN fecha TEXT",
+        "ALTER TABLE AvancesEfectivo ADD COLUMN fecha_epoch INTEGER",
+        "ALTER TABLE RecargasTelefonicas ADD COLUMN fecha TEXT",
+        "ALTER TABLE RecargasTelefonicas ADD COLUMN fecha_epoch INTEGER",
+        # Relleno de los registros históricos (misma regla que get_timestamp_columns)
+        "UPDATE AvancesEfectivo SET fecha = substr(fecha_hora, 1, 10), fecha_epoch = CAST(strftime('%s', fecha_hora) AS INTEGER)",
+        "UPDATE RecargasTelefonicas SET fecha = substr(fecha_hora, 1, 10), fecha_epoch = CAST(strftime('%s', fecha_hora) AS INTEGER)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha_estado ON Ventas(fecha, estado)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_estado_id ON Ventas(estado, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasas_fecha_registro ON TasasBCV(fecha_registro)",
+        "CREATE INDEX IF NOT EXISTS idx_avances_fecha_estado ON AvancesEfectivo(fecha, estado)",
+        "CREATE INDEX IF NOT EXISTS idx_avances_epoch ON AvancesEfectivo(fecha_epoch)",
+        "CREATE INDEX IF NOT EXISTS idx_avances_estado_id ON AvancesEfectivo(estado, id)",
+        "CREATE INDEX IF NOT EXISTS idx_recargas_fecha_estado ON RecargasTelefonicas(fecha, estado)",
+        "CREATE INDEX IF NOT EXISTS idx_recargas_epoch ON RecargasTelefonicas(fecha_epoch)",
+        "CREATE INDEX IF NOT EXISTS idx_recargas_estado_id ON RecargasTelefonicas(estado, id)",
+        # Sin estadísticas el planificador prefiere el índice de 'estado' aunque filtre poco
+        "ANALYZE",
+    ]),
+    (2, "Tabla normalizada VentaDetalle (reemplaza el JSON de Ventas.detalle)", [
+        """
+        CREATE TABLE IF NOT EXISTS VentaDetalle (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            venta_id INTEGER NOT NULL REFERENCES Ventas(id),
+            producto_id INTEGER,
+            nombre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            costo_unitario REAL,
+            subtotal REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_venta_detalle_venta ON VentaDetalle(venta_id)",
+        "CREATE INDEX IF NOT EXISTS idx_venta_detalle_producto ON VentaDetalle(producto_id)",
+        _backfill_venta_detalle,
+        "ANALYZE",
+    ]),
+    (3, "Registro de cambios de Productos para la caché del catálogo", [
+        """
+        CREATE TABLE IF NOT EXISTS CambiosCatalogo (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_ins_catalogo AFTER INSERT ON Productos
+        BEGIN
+            INSERT INTO CambiosCatalogo (producto_id) VALUES (NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_upd_catalogo
+        AFTER UPDATE OF codigo_barras, nombre, precio_venta, precio_compra, stock ON Productos
+        BEGIN
+            INSERT INTO CambiosCatalogo (producto_id) VALUES (NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_del_catalogo AFTER DELETE ON Productos
+        BEGIN
+            INSERT INTO CambiosCatalogo (producto_id) VALUES (OLD.id);
+        END
+        """,
+        # Solo se conservan los últimos ~1000 cambios; una caché más atrasada recarga todo
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_catalogo_poda AFTER INSERT ON CambiosCatalogo
+        WHEN NEW.seq % 1000 = 0
+        BEGIN
+            DELETE FROM CambiosCatalogo WHERE seq <= NEW.seq - 1000;
+        END
+        """,
+    ]),
+    (4, "Resumen diario materializado (ResumenDiario) mantenido por triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS ResumenDiario (
+            fecha TEXT NOT NULL,
+            concepto TEXT NOT NULL,
+            metodo_pago TEXT NOT NULL DEFAULT '',
+            total_bs REAL NOT NULL DEFAULT 0,
+            total_usd REAL NOT NULL DEFAULT 0,
+            comision_bs REAL NOT NULL DEFAULT 0,
+            comision_usd REAL NOT NULL DEFAULT 0,
+            transacciones INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (fecha, concepto, metodo_pago)
+        ) WITHOUT ROWID
+        """,
+        *_daily_summary_triggers(),
+        _rebuild_daily_summary,
+    ]),
+    (5, "Índices de método de pago y fecha para los filtros de reportes", [
+        "CREATE INDEX IF NOT EXISTS idx_ventas_metodo_fecha ON Ventas(metodo_pago, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_avances_metodo_fecha ON AvancesEfectivo(metodo_pago, fecha)",
+        "ANALYZE",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def insert_sale_lines(cursor, venta_id: int, sale_details: list):
+    """Registra las líneas de una venta (o devolución) en VentaDetalle.
+
+    Cada elemento de 'sale_details' es un dict con: id, nombre, cantidad,
+    precio_u, costo_u y subtotal.
+    """
+    cursor.executemany("""
+        INSERT INTO VentaDetalle (venta_id, producto_id, nombre, cantidad, precio_unitario, costo_unitario, subtotal)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (venta_id, d['id'], d['nombre'], d['cantidad'], d['precio_u'], d.get('costo_u'), d['subtotal'])
+        for d in sale_details
+    ])
+
+
+def insert_sale_record(conn, sale_details: list, total: float, metodo_pago: str, estado: str) -> int:
+    """Inserta la cabecera en Ventas (con la última tasa BCV) y sus líneas en VentaDetalle.
+
+    No hace commit: se usa dentro de trabajos de DBExecutor, que confirman la transacción.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT tasa FROM TasasBCV ORDER BY id DESC LIMIT 1")
+    result = cursor.fetchone()
+    tasa_bcv = result[0] if result else 1.0
+    now = datetime.datetime.now()
+
+    cursor.execute("""
+        INSERT INTO Ventas (
+            fecha, hora, total_venta, monto_total_bs, tasa_bcv, metodo_pago, estado
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S"), total, total * tasa_bcv, tasa_bcv, metodo_pago, estado))
+    venta_id = cursor.lastrowid
+    insert_sale_lines(cursor, venta_id, sale_details)
+    return venta_id
+
+
+def get_timestamp_columns(now: datetime.datetime) -> tuple[str, str, int]:
+    """Devuelve (fecha_hora, fecha, fecha_epoch) para insertar una transacción.
+
+    'fecha_epoch' trata la hora local como UTC, igual que strftime('%s', fecha_hora)
+    en SQLite, para que los registros nuevos y los migrados sean comparables.
+    """
+    fecha_hora = now.strftime("%Y-%m-%d %H:%M:%S")
+    fecha = now.strftime("%Y-%m-%d")
+    fecha_epoch = calendar.timegm(now.timetuple())
+    return fecha_hora, fecha, fecha_epoch
+
+
+def get_schema_version(conn) -> int:
+    """Devuelve la versión de esquema guardada en la cabecera de la base de datos."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn):
+    """Aplica en orden las migraciones pendientes, cada una en su propia transacción."""
+    current_version = get_schema_version(conn)
+    
+    for version, descripcion, pasos in MIGRATIONS:
+        if version <= current_version:
+            continue
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            for paso in pasos:
+                if callable(paso):
+                    paso(cursor)
+                else:
+                    cursor.execute(paso)
+            # PRAGMA no admite parámetros; la versión es un entero propio, no entrada del usuario
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+            print(f"Migración {version} aplicada: {descripcion}")
+        except Exception:
+            conn.rollback()
+            print(f"Error al aplicar la migración {version} ({descripcion}).")
+            raise
+
+
+def setup_db() -> sqlite3.Connection:
+    """Abre la base de datos (una sola vez por proceso) y devuelve la conexión compartida."""
+    global _shared_conn
+
+    with _shared_conn_lock:
+        if _shared_conn is not None:
+            return _shared_conn
+
+        final_db_path = get_db_path_for_connection()
+        
+        if final_db_path is None:
+            return None 
+
+        try:
+            conn = sqlite3.connect(final_db_path) 
+            apply_pragmas(conn)
+            cursor = conn.cursor()
+            _create_schema(cursor)
+            conn.commit()
+            run_migrations(conn)
+            _start_checkpoint_thread(final_db_path)
+            
+            _shared_conn = conn
+            return conn
+        except Exception as e:
+            print(f"Error al inicializar la base de datos: {e}")
+            return None
+
+
+def get_db_executor(widget=None) -> DBExecutor:
+    """[API Pública] Devuelve el hilo de base de datos del proceso (lo crea y arranca si hace falta).
+
+    Si se pasa un widget, los callbacks de los trabajos se despachan en su bucle de Tk.
+    """
+    global _db_executor
+
+    if get_connection() is None:
+        return None
+
+    with _shared_conn_lock:
+        if _db_executor is None:
+            db_path = get_db_path_for_connection()
+
+            def connect():
+                conn = sqlite3.connect(db_path)
+                apply_pragmas(conn)
+                return conn
+
+            _db_executor = DBExecutor(connect)
+            _db_executor.start()
+
+    if widget is not None:
+        _db_executor.attach_tk(widget)
+    return _db_executor
+
+
+def get_report_reader(widget=None) -> LectorReportes:
+    """[API Pública] Hilo lector de reportes del proceso (lo crea y arranca si hace falta).
+
+    Si se pasa un widget, los callbacks de las tareas se despachan en su bucle de Tk.
+    """
+    global _report_reader
+
+    if get_connection() is None:
+        return None
+
+    with _shared_conn_lock:
+        if _report_reader is None:
+            db_path = get_db_path_for_connection()
+
+            def connect():
+                conn = sqlite3.connect(db_path)
+                apply_pragmas(conn)
+                return conn
+
+            _report_reader = LectorReportes(connect)
+            _report_reader.start()
+
+    if widget is not None:
+        _report_reader.attach_tk(widget)
+    return _report_reader
+
+
+def get_connection() -> sqlite3.Connection:
+    """[API Pública] Devuelve la conexión compartida; la inicializa si es la primera llamada."""
+    if _shared_conn is not None:
+        return _shared_conn
+    return setup_db()
+
+
+def close_db():
+    """Cierra la conexión compartida (llamado al cerrar la aplicación).
+
+    Al cerrarse la última conexión SQLite hace el checkpoint final y elimina el WAL.
+    """
+    global _shared_conn, _db_executor, _report_reader
+
+    with _shared_conn_lock:
+        # Los reportes en curso se cancelan; no hace falta esperar a que terminen
+        if _report_reader is not None:
+            _report_reader.shutdown()
+            _report_reader = None
+        # Primero se terminan las escrituras pendientes del hilo de base de datos
+        if _db_executor is not None:
+            _db_executor.shutdown()
+            stats = _db_executor.stats()
+            print(
+                f"DBExecutor: {stats['completados'] + stats['fallidos']} trabajos ({stats['fallidos']} fallidos), "
+                f"cola máx. {stats['profundidad_max']}, espera prom. {stats['espera_promedio_ms']:.1f} ms, "
+                f"ejecución prom./máx. {stats['ejecucion_promedio_ms']:.1f}/{stats['ejecucion_max_ms']:.1f} ms"
+            )
+            _db_executor = None
+        _stop_checkpoint_thread()
+        if _shared_conn is not None:
+            try:
+                # Mantiene al día las estadísticas del planificador (recomendado al cerrar)
+                _shared_conn.execute("PRAGMA optimize")
+                _shared_conn.close()
+            except Exception as e:
+                print(f"Error al cerrar la base de datos: {e}")
+            _shared_conn = None
+
+
+# ===================================================================
+# --- LÍNEA DE COMANDOS ---
+# ===================================================================
+
+if __name__ == "__main__":
+    # Los comandos de mantenimiento viven en cli_app.py (se mantiene 'python utils.py rebuild-summary')
+    from cli_app import main
+    raise SystemExit(main())